@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Import-Time Benchmark Script
+
+Tracks CLI startup cost: runs `python -X importtime -c "import run"` in a
+fresh interpreter, reports the cumulative import time of run.py and the
+slowest modules it pulls in, and checks that:
+- the heavy analysis libraries (pandas, statsmodels, linearmodels, scipy,
+  matplotlib, seaborn) are not imported by `import run`
+- `python run.py --help` creates no run log and leaves the panel
+  materialization log untouched (no import-time side effects)
+
+Usage:
+    python benchmark_imports.py [--repeat 5] [--top 10] [--budget 0.3]
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+OUTPUT_DIR = ROOT / "output"
+HEAVY_MODULES = ("pandas", "statsmodels", "linearmodels", "scipy", "matplotlib", "seaborn")
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def _import_profile() -> dict[str, tuple[int, int]]:
+    """Cumulative and self import time (µs) of every module imported by `import run`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import run"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, _, module = match.groups()
+            profile.setdefault(module, (int(cumulative_us), int(self_us)))
+    return profile
+
+
+def _time_help() -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "run.py", "--help"], cwd=ROOT, capture_output=True, check=True)
+    return time.perf_counter() - t0
+
+
+def _log_state() -> tuple[set[str], int | None]:
+    panel_log = OUTPUT_DIR / "panel_materialization_log.txt"
+    run_logs = {p.name for p in OUTPUT_DIR.glob("run_log_*.txt")}
+    return run_logs, panel_log.stat().st_mtime_ns if panel_log.exists() else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLI import time")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters to time")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    parser.add_argument("--budget", type=float, default=0.3, help="Max seconds for `import run`")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"IMPORT-TIME BENCHMARK ({args.repeat} fresh interpreters)")
+    print("=" * 70)
+
+    profiles = [_import_profile() for _ in range(args.repeat)]
+    import_s = statistics.median(p["run"][0] for p in profiles) / 1e6
+    print(f"{'import run (cumulative)':28} | {import_s:7.3f}s")
+
+    before = _log_state()
+    help_s = statistics.median(_time_help() for _ in range(args.repeat))
+    after = _log_state()
+    print(f"{'python run.py --help':28} | {help_s:7.3f}s")
+
+    print()
+    print("Slowest imports (self time, last run):")
+    profile = profiles[-1]
+    for module, (cumulative_us, self_us) in sorted(profile.items(), key=lambda kv: -kv[1][1])[: args.top]:
+        print(f"  {module:40} | {self_us / 1e3:7.1f}ms self | {cumulative_us / 1e3:7.1f}ms cumulative")
+
+    heavy = sorted({m.split(".")[0] for m in profile} & set(HEAVY_MODULES))
+    new_logs = sorted(after[0] - before[0])
+    panel_log_touched = after[1] != before[1]
+
+    print()
+    ok = True
+    if heavy:
+        print(f"❌ Heavy modules imported by `import run`: {', '.join(heavy)}")
+        ok = False
+    else:
+        print("✅ No heavy modules imported by `import run`")
+    if new_logs or panel_log_touched:
+        touched = new_logs + (["panel_materialization_log.txt"] if panel_log_touched else [])
+        print(f"❌ `run.py --help` wrote log files: {', '.join(touched)}")
+        ok = False
+    else:
+        print("✅ `run.py --help` left output/ untouched")
+    if import_s > args.budget:
+        print(f"❌ `import run` took {import_s:.3f}s (budget {args.budget:.3f}s)")
+        ok = False
+    else:
+        print(f"✅ `import run` within budget ({args.budget:.3f}s)")
+    print("=" * 70)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    exit(main())
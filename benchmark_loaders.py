@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Loader Benchmark Script
+
+Compares load time and peak RSS of the raw-dataset readers before and after
+the schema-driven (column-projected, categorical-filter) reading layer.
+Each measurement runs in a fresh subprocess so peak RSS is not polluted by
+earlier runs. The dataset cache is bypassed.
+
+Usage:
+    python benchmark_loaders.py [--repeat N]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+# Each case: (label, setup code, timed code). "before" reproduces the
+# original full-width reads; "after" calls the current loaders.
+CASES = [
+    (
+        "WHO  before (all columns)",
+        "import pandas as pd; from src.data_loader import WHO_PATH",
+        "df = pd.read_csv(WHO_PATH)\n"
+        "df.groupby(['WHO Country Name', 'Measurement Year'])['PM2.5 (μg/m3)'].mean()",
+    ),
+    (
+        "WHO  after  (schema, c)",
+        "import src.data_loader as dl; dl.CSV_ENGINE = 'c'",
+        "dl.load_who_pm25.__wrapped__(print_fn=lambda *a: None)",
+    ),
+    (
+        "WHO  after  (schema, pyarrow)",
+        "import src.data_loader as dl; dl.CSV_ENGINE = 'pyarrow'",
+        "dl.load_who_pm25.__wrapped__(print_fn=lambda *a: None)",
+    ),
+    (
+        "EEA  before (all columns)",
+        "import pandas as pd; from src.data_loader import EEA_BURDEN_PATH",
+        "b = pd.read_csv(EEA_BURDEN_PATH)\n"
+        "b = b[(b['Degree Of Urbanisation'] == 'All Areas (incl.unclassified)')"
+        " & (b['Air Pollutant'] == 'PM2.5')"
+        " & (b['Health Indicator'] == 'Disability-Adjusted Life Years (DALY)')]\n"
+        "b.groupby(['Country Or Territory', 'Year'])['Value'].sum()",
+    ),
+    (
+        "EEA  after  (schema, c)",
+        "import src.data_loader as dl; dl.CSV_ENGINE = 'c'",
+        "dl.load_eea_burden.__wrapped__(print_fn=lambda *a: None)",
+    ),
+    (
+        "EEA  after  (schema, pyarrow)",
+        "import src.data_loader as dl; dl.CSV_ENGINE = 'pyarrow'",
+        "dl.load_eea_burden.__wrapped__(print_fn=lambda *a: None)",
+    ),
+]
+
+_WORKER = """
+import json, resource, time
+{setup}
+# Warm-up: imports, country alias table
+{timed}
+base_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+times = []
+for _ in range({repeat}):
+    t0 = time.perf_counter()
+{timed_indented}
+    times.append(time.perf_counter() - t0)
+peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": min(times), "peak_mb": peak_kb / 1024, "delta_mb": (peak_kb - base_kb) / 1024}}))
+"""
+
+
+def _measure(setup: str, timed: str, repeat: int, fresh_peak: bool) -> dict:
+    indented = "\n".join("    " + line for line in timed.splitlines())
+    # For the RSS run skip the warm-up so the first (and only) load sets the peak
+    code = _WORKER.format(
+        setup=setup,
+        timed="pass" if fresh_peak else timed,
+        repeat=1 if fresh_peak else repeat,
+        timed_indented=indented,
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark raw-dataset loaders")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per case")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("LOADER BENCHMARK (load time = best of N, peak RSS = single cold load)")
+    print("=" * 70)
+    print(f"{'Case':32} | {'Time':>9} | {'Peak RSS':>9} | {'Δ RSS':>8}")
+    print("-" * 70)
+    for label, setup, timed in CASES:
+        try:
+            timing = _measure(setup, timed, args.repeat, fresh_peak=False)
+            memory = _measure(setup, timed, args.repeat, fresh_peak=True)
+        except subprocess.CalledProcessError as e:
+            print(f"{label:32} | FAILED: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(
+            f"{label:32} | {timing['seconds'] * 1000:7.1f}ms | "
+            f"{memory['peak_mb']:7.1f}MB | {memory['delta_mb']:6.1f}MB"
+        )
+    print("=" * 70)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Parsing Benchmark Script
+
+Compares the per-element leading_number() path against the vectorized
+parsing.parse_numeric() on 1M+ GBD-style values ("12.3 (10.1–14.2)",
+thousands separators, NA tokens), and checks that both agree.
+
+Usage:
+    python benchmark_parsing.py [--n 1255800]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data_loader import leading_number
+from src.parsing import parse_interval, parse_numeric
+
+
+def _sample_values(n: int, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(1, 50_000, n)
+    kind = rng.integers(0, 4, n)
+    values = np.where(
+        kind == 0,
+        [f"{v:,.2f} ({v * 0.9:,.2f}–{v * 1.1:,.2f})" for v in x],
+        np.where(kind == 1, [f"{v:,.3f}" for v in x], np.where(kind == 2, "—", "")),
+    )
+    return pd.Series(values, dtype=object)
+
+
+def _time(fn, values):
+    t0 = time.perf_counter()
+    out = fn(values)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark numeric column parsing")
+    parser.add_argument("--n", type=int, default=1_255_800, help="Number of values")
+    args = parser.parse_args()
+
+    values = _sample_values(args.n)
+
+    print("=" * 70)
+    print(f"PARSING BENCHMARK (N = {args.n:,} values)")
+    print("=" * 70)
+
+    per_element, t_apply = _time(lambda v: v.apply(leading_number), values)
+    vectorized, t_vec = _time(parse_numeric, values)
+    intervals, t_int = _time(parse_interval, values)
+
+    print(f"{'leading_number (apply)':28} | {t_apply:7.2f}s")
+    print(f"{'parse_numeric':28} | {t_vec:7.2f}s | {t_apply / t_vec:5.1f}× faster")
+    print(f"{'parse_interval (+ bounds)':28} | {t_int:7.2f}s")
+
+    same = np.allclose(per_element, vectorized, equal_nan=True) and np.allclose(
+        per_element, intervals["value"], equal_nan=True
+    )
+    print()
+    print("✅ Outputs agree" if same else "❌ Outputs differ")
+    print("=" * 70)
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Specification-Grid Benchmark Script
+
+Fits ~500 specifications on the Panel C estimation sample (outcome in logs
+or levels × every subset of log/level sector regressors × no/entity/time/
+two-way effects) with src/specgrid.py, and checks a sample of them against
+the single-spec fits (statsmodels OLS for "none", PanelOLS otherwise).
+Run AFTER pipeline execution: poetry run python run.py
+
+Usage:
+    python benchmark_spec_grid.py [--check-every 25]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from linearmodels.panel import PanelOLS
+
+from src.specgrid import EFFECTS, SpecGridEstimator, spec_grid
+
+OUTPUT_DIR = Path(__file__).parent / "output"
+
+SECTORS = ["energy", "industry", "transport"]
+
+
+def _panel_c_sample() -> pd.DataFrame:
+    df = pd.read_csv(OUTPUT_DIR / "panel_model_c_estimation.csv").set_index(["iso3", "year"]).sort_index()
+    sample = df[["ln_pm25"] + [f"ln_{s}" for s in SECTORS]].copy()
+    sample["pm25"] = np.exp(sample["ln_pm25"])
+    for s in SECTORS:
+        sample[f"{s}_mt"] = np.exp(sample[f"ln_{s}"]) / 1000  # kt → Mt
+    return sample
+
+
+def _reference_row(sample: pd.DataFrame, spec: dict) -> dict:
+    """Same spec through statsmodels / linearmodels, as fit_ols / fit_panel_fe report it."""
+    y, X = sample[spec["y"]], sample[spec["x"]]
+    if spec["effects"] == "none":
+        res = sm.OLS(y, sm.add_constant(X)).fit()
+        row = {"R2": res.rsquared, "Adj_R2": res.rsquared_adj}
+    else:
+        res = PanelOLS(
+            y, X,
+            entity_effects=spec["effects"] in ("entity", "both"),
+            time_effects=spec["effects"] in ("time", "both"),
+        ).fit(cov_type="clustered", cluster_entity=True)
+        row = {"R2_within": res.rsquared_within, "R2_between": res.rsquared_between,
+               "R2_overall": res.rsquared_overall}
+    for col in spec["x"]:
+        row[f"Coef_{col}"] = res.params[col]
+        row[f"P_{col}"] = res.pvalues[col]
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the batched spec-grid estimator")
+    parser.add_argument("--check-every", type=int, default=25, help="Compare every Nth spec to the reference fit")
+    args = parser.parse_args()
+
+    sample = _panel_c_sample()
+    regressors = [f"ln_{s}" for s in SECTORS] + [f"{s}_mt" for s in SECTORS]
+    specs = spec_grid("ModelC", ["ln_pm25", "pm25"], regressors, effects=EFFECTS)
+
+    print("=" * 70)
+    print(f"SPEC-GRID BENCHMARK ({len(specs)} specs on Panel C, N = {len(sample)})")
+    print("=" * 70)
+
+    t0 = time.perf_counter()
+    rows = SpecGridEstimator(sample).fit_all(specs)
+    t_grid = time.perf_counter() - t0
+    print(f"{'Spec grid (all specs)':28} | {t_grid * 1000:8.1f}ms | {t_grid / len(specs) * 1e6:6.1f}µs/spec")
+
+    checked = specs[:: args.check_every]
+    t0 = time.perf_counter()
+    references = [_reference_row(sample, spec) for spec in checked]
+    t_ref = time.perf_counter() - t0
+    per_ref = t_ref / len(checked)
+    print(
+        f"{'Single-spec fits (sampled)':28} | {per_ref * 1000:8.1f}ms/spec | "
+        f"≈{per_ref * len(specs):.1f}s for all {len(specs)}"
+    )
+
+    by_name = {row["Model"]: row for row in rows}
+    worst = 0.0
+    for spec, expected in zip(checked, references):
+        actual = by_name[spec["name"]]
+        for key, value in expected.items():
+            worst = max(worst, abs(actual[key] - value) / max(abs(value), 1.0))
+
+    ok = worst <= 1e-6
+    print()
+    print(f"Max relative difference over {len(checked)} checked specs: {worst:.2e}")
+    print("✅ Outputs agree" if ok else "❌ Outputs differ")
+    print("=" * 70)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -11,416 +11,1058 @@ Focused analysis with core models:
   J. Quadratic PM2.5 → Health (nonlinear OLS, DALY and YLL)
 
 Usage:
-  poetry run python run.py [--model B|C|D|G|E|J|all]  (default: run all)
+  poetry run python run.py [--model B C D G E J]  (default: run all)
+
+Only the datasets and panels the selected models need are loaded and built
+(src/registry.py).
 
 Examples:
   poetry run python run.py              # Run all models
   poetry run python run.py --model B    # Run only Model B
+  poetry run python run.py --model C G E  # Panel FE models (WHO + UNFCCC only)
   poetry run python run.py --model J    # Run only Model J (quadratic)
   poetry run python run.py --model G    # Run only Model G (total emissions)
 """
 
 from __future__ import annotations
-import sys
 import argparse
-import re
-import numpy as np
-import pandas as pd
+import copy
+import time
+from functools import partial
+from typing import TYPE_CHECKING, Callable
 from pathlib import Path
-import statsmodels.api as sm
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
-from linearmodels.panel import PanelOLS
-
-# Import custom modules
-from src.data_loader import (
-    load_who_pm25,
-    load_unfccc_sectoral,
-    load_eea_burden,
-    load_gbd_yll,
-    merge_nearest_years,
-)
-from src.models import (
-    fit_ols,
-    fit_panel_fe,
-    save_model_outputs,
-    fit_model_j_quadratic,
-    fit_model_g_total_emissions,
-    fit_model_e_lagged,
-)
-from src.audit import audit_panel_balance, check_model_e_gate
+
+# Heavy libraries (pandas, statsmodels, linearmodels, scipy, matplotlib) are
+# imported by the stages that use them, so `run.py --help` and `import run`
+# stay cheap (see benchmark_imports.py). Only light modules are imported here.
+from src.registry import Registry, Step, Unit
+from src.plots import FULL_DPI, PREVIEW_DPI, render_plots, take_queued
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Setup
 OUTPUT_DIR = Path("output")
-OUTPUT_DIR.mkdir(exist_ok=True)
-
-log_path = OUTPUT_DIR / f"run_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-log_file = open(log_path, "w", encoding="utf-8")
-sys_stdout = sys.stdout
+PRIMARY_TOLERANCE = 3  # ±years for the nearest-year merges of Models B, D, J
 
-# Panel materialization log
+# Run log and panel materialization log, opened by open_logs() in main()
+log_path: Path | None = None
+log_file = None
 panel_log_path = OUTPUT_DIR / "panel_materialization_log.txt"
-panel_log = open(panel_log_path, "w", encoding="utf-8")
+panel_log = None
+
+# While a model unit runs, its log lines are recorded as (channel, text) for the
+# artifact cache and, in worker processes (_log_echo False), replayed by the parent
+_log_capture: list | None = None
+_log_echo = True
+
+
+def open_logs():
+    """Create output/, a timestamped run log and a fresh panel materialization log."""
+    global log_path, log_file, panel_log
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    log_path = OUTPUT_DIR / f"run_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+    log_file = open(log_path, "w", encoding="utf-8")
+    panel_log = open(panel_log_path, "w", encoding="utf-8")
+
+
+def close_logs():
+    """Close the run and panel materialization logs (safe to call twice)."""
+    for handle in (log_file, panel_log):
+        if handle is not None:
+            handle.close()
 
 
 def log_print(*args, **kwargs):
     """Print to both console and log file."""
+    if _log_capture is not None:
+        _log_capture.append(("print", kwargs.get("sep", " ").join(str(a) for a in args)))
+    if not _log_echo:
+        return
     print(*args, **kwargs)
-    print(*args, file=log_file, **kwargs)
+    if log_file is not None and not log_file.closed:
+        print(*args, file=log_file, **kwargs)
 
 
 def log_panel_save(message: str):
     """Log panel materialization to dedicated log file."""
+    if _log_capture is not None:
+        _log_capture.append(("panel", message))
+    if not _log_echo:
+        return
+    if panel_log is None or panel_log.closed:
+        return
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     panel_log.write(f"[{timestamp}] {message}\n")
     panel_log.flush()
 
 
-# =====================================================================
-# Main Pipeline
-# =====================================================================
-def main(models_to_run: list[str]):
+def log_tolerance_samples(label: str, panels: dict[int, pd.DataFrame]):
+    """Log matched rows per nearest-year tolerance (console + materialization log)."""
+    counts = ", ".join(f"±{t}: N={len(p)}" for t, p in panels.items())
+    log_print(f"  {label} nearest-year matches: {counts}")
+    log_panel_save(f"{label} nearest-year matches: {counts}")
+
+
+def prepare_health_panel(panel: pd.DataFrame, value_col: str, ln_col: str) -> pd.DataFrame:
+    """Log-transform PM2.5 and a health outcome of a merged panel; drop non-finite rows."""
+    import numpy as np
+    from src.data_loader import widen_values
+
+    panel = widen_values(panel)
+    panel["ln_pm25"] = np.log(panel["pm25"])
+    panel[ln_col] = np.log(panel[value_col])
+    return panel.replace([np.inf, -np.inf], np.nan).dropna(subset=["ln_pm25", ln_col])
+
+
+def tolerance_variants(
+    panels: dict[int, pd.DataFrame], value_col: str, ln_col: str
+) -> dict[int, pd.DataFrame]:
+    """Prepared panels for every non-primary tolerance with enough rows to fit."""
+    return {
+        t: prepare_health_panel(p, value_col, ln_col)
+        for t, p in panels.items()
+        if t != PRIMARY_TOLERANCE and len(p) >= 10
+    }
+
+
+def log_dataset_loaded(label: str, df: pd.DataFrame):
+    """Log record count plus load time and cache status of a loaded dataset."""
+    source = "cache" if df.attrs.get("cache_hit") else "parsed"
+    seconds = df.attrs.get("load_seconds", float("nan"))
+    log_print(f"  ✓ {label}: {len(df)} country-year records ({seconds:.2f}s, {source})")
+
+
+def load_datasets(loaders: dict[str, Callable], jobs: int = 1) -> dict[str, pd.DataFrame]:
     """
-    Execute selected models.
+    Load datasets, optionally concurrently, logging in declaration order.
+
+    Each loader writes its messages to a private buffer; buffers are replayed
+    in declaration order, followed by the dataset's record-count line, so the
+    run log reads the same for any number of jobs.
 
     Args:
-        models_to_run: List of model identifiers: ['B'], ['C'], ['D'], ['G'], ['E'], ['J'], or ['all']
+        loaders: Mapping of dataset label → loader called as loader(print_fn=...)
+        jobs: Number of worker threads (1 = sequential)
+
+    Raises:
+        RuntimeError: naming the dataset whose loader failed
     """
-    log_print(f"🚀 Starting Environmental-Health Pipeline")
-    log_print(f"📋 Models to run: {', '.join(models_to_run)}")
-    log_print(f"📊 Log file: {log_path}")
-    log_print("=" * 70)
 
-    results_summary = []
+    from concurrent.futures import ThreadPoolExecutor
 
-    # Load datasets once
-    log_print("\n📂 Loading datasets...")
-    who_pm25 = load_who_pm25()
-    log_print(f"  ✓ WHO PM2.5: {len(who_pm25)} country-year records")
+    def run(loader: Callable) -> tuple[pd.DataFrame, list[tuple]]:
+        messages = []
+        df = loader(print_fn=lambda *a, **kw: messages.append((a, kw)))
+        return df, messages
 
-    eea_burden = load_eea_burden()
-    log_print(f"  ✓ EEA Burden (DALY): {len(eea_burden)} country-year records")
+    t0 = time.perf_counter()
+    datasets = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = {label: pool.submit(run, loader) for label, loader in loaders.items()}
+        for label, future in futures.items():
+            try:
+                df, messages = future.result()
+            except Exception as e:
+                for pending in futures.values():
+                    pending.cancel()
+                raise RuntimeError(f"Failed to load {label}: {e}") from e
+            for a, kw in messages:
+                log_print(*a, **kw)
+            log_dataset_loaded(label, df)
+            datasets[label] = df
+
+    log_print(
+        f"  ⏱ {len(datasets)} datasets loaded in {time.perf_counter() - t0:.2f}s (jobs={jobs})"
+    )
+    return datasets
 
-    gbd_yll = load_gbd_yll()
-    log_print(f"  ✓ GBD YLL: {len(gbd_yll)} country-year records")
 
-    unfccc_sectoral = load_unfccc_sectoral()
-    log_print(f"  ✓ UNFCCC Sectoral: {len(unfccc_sectoral)} country-year records")
+class RunContext:
+    """
+    State shared by the pipeline steps of one run.
+
+    Attributes:
+        datasets: Dataset label → loaded (compacted) frame
+        panels: Panel name → built panel (None if it could not be built)
+        results_summary: Summary rows appended by the model fits
+        tolerances: Nearest-year tolerances for B, D and J, primary included
+        Remaining attributes mirror the main() options of the same name.
+    """
 
-    # Shared panel construction for Models C, G, E
-    panel_c = None  # Will be built if needed
+    def __init__(
+        self,
+        datasets: dict[str, pd.DataFrame],
+        jobs: int = 1,
+        jackknife: bool = False,
+        bootstrap_reps: int = 2000,
+        seed: int = 42,
+        randomization_draws: int = 0,
+        window: int = 0,
+        window_mode: str = "rolling",
+        max_lag: int = 0,
+        tolerances: list[int] | None = None,
+        force: bool = False,
+        plot_dpi: int | None = FULL_DPI,
+    ):
+        self.datasets = datasets
+        self.panels: dict[str, object] = {}
+        self.results_summary: list[dict] = []
+        self.jobs = jobs
+        self.jackknife = jackknife
+        self.bootstrap_reps = bootstrap_reps
+        self.seed = seed
+        self.randomization_draws = randomization_draws
+        self.window = window
+        self.window_mode = window_mode
+        self.max_lag = max_lag
+        self.tolerances = sorted({PRIMARY_TOLERANCE, *(tolerances or [])})
+        self.force = force
+        self.plot_dpi = plot_dpi
+        # (unit name, cache key, plot jobs) per model unit
+        self.plots: list[tuple[str, str, list]] = []
+
+    def for_worker(self) -> "RunContext":
+        """Copy of the options for a model worker: no datasets/panels, in-process batches."""
+        ctx = copy.copy(self)
+        ctx.datasets, ctx.panels, ctx.results_summary, ctx.plots = {}, {}, [], []
+        ctx.jobs = 1
+        return ctx
+
+
+def log_section(title: str, *notes: str):
+    """Log a section banner followed by its description lines."""
+    log_print("\n" + "=" * 70)
+    log_print(title)
+    log_print("=" * 70)
+    for note in notes:
+        log_print(note)
 
-    # =====================================================================
-    # Model B: PM2.5 → DALY (EEA health burden)
-    # =====================================================================
-    panel_b = None
-    if "B" in models_to_run or "J" in models_to_run:
-        log_print("\n" + "=" * 70)
-        log_print("MODEL B: PM₂.₅ → DALY (EEA Health Burden)")
-        log_print("=" * 70)
-        log_print("Nearest-year merge (±3 years) between WHO PM2.5 and EEA DALY data")
 
-        try:
-            panel_b = merge_nearest_years(who_pm25, eea_burden, "iso3", "year", "year", tolerance=3)
-
-            if len(panel_b) < 10:
-                log_print(f"[WARN] Insufficient data: {len(panel_b)} observations. Skipping.")
-            else:
-                # Log transform
-                panel_b["ln_pm25"] = np.log(panel_b["pm25"])
-                panel_b["ln_daly"] = np.log(panel_b["daly"])
-
-                # Remove infinities
-                panel_b = panel_b.replace([np.inf, -np.inf], np.nan).dropna(
-                    subset=["ln_pm25", "ln_daly"]
-                )
+# =====================================================================
+# Panels
+# =====================================================================
+def build_panel_b(ctx: RunContext):
+    """Panel B: WHO PM2.5 × EEA DALY, nearest-year matched (primary + tolerance variants)."""
+    from src.data_loader import merge_nearest_years_multi
 
-                log_print(
-                    f"✓ Panel B: {len(panel_b)} observations from {panel_b['country'].nunique()} countries"
-                )
+    log_section(
+        "PANEL B: WHO PM₂.₅ × EEA DALY",
+        f"Nearest-year merge (±{PRIMARY_TOLERANCE} years) between WHO PM2.5 and EEA DALY data",
+    )
+    panels_b = merge_nearest_years_multi(
+        ctx.datasets["WHO PM2.5"],
+        ctx.datasets["EEA Burden (DALY)"],
+        "iso3",
+        "year",
+        "year",
+        ctx.tolerances,
+    )
+    log_tolerance_samples("Panel B", panels_b)
+    ctx.panels["variants_b"] = tolerance_variants(panels_b, "daly", "ln_daly")
+
+    if len(panels_b[PRIMARY_TOLERANCE]) < 10:
+        log_print(
+            f"[WARN] Insufficient data: {len(panels_b[PRIMARY_TOLERANCE])} observations. Skipping."
+        )
+        return
+    panel_b = prepare_health_panel(panels_b[PRIMARY_TOLERANCE], "daly", "ln_daly")
+
+    log_print(
+        f"✓ Panel B: {len(panel_b)} observations from {panel_b['country'].nunique()} countries"
+    )
 
-                # Save intermediate panel
-                panel_b.to_csv(OUTPUT_DIR / "panel_b_health.csv", index=False)
-                log_print(f"💾 Saved panel_b_health.csv")
-
-                # Fit regression: ln(DALY) ~ ln(PM2.5)
-                if "B" in models_to_run:
-                    # Ensure clean data before saving estimation panel
-                    clean_panel_b = panel_b[["iso3", "country", "ln_daly", "ln_pm25"]].copy()
-                    clean_panel_b = clean_panel_b.dropna(subset=["ln_daly", "ln_pm25"])
-                    
-                    # Save estimation panel with exact naming convention
-                    clean_panel_b.to_csv(OUTPUT_DIR / "panel_model_b_estimation.csv", index=False)
-                    log_print(f"💾 Saved panel_model_b_estimation.csv (N={len(clean_panel_b)})")
-                    log_panel_save(f"Model B: panel_model_b_estimation.csv (N={len(clean_panel_b)}, countries={clean_panel_b['country'].nunique()})")
-                    
-                    fit_ols(
-                        panel_b["ln_daly"],
-                        panel_b[["ln_pm25"]],
-                        "ModelB_PM25_DALY",
-                        results_summary,
-                        log_print,
-                    )
-                    log_print("✓ Model B complete")
+    # Save intermediate panel
+    panel_b.to_csv(OUTPUT_DIR / "panel_b_health.csv", index=False)
+    log_print(f"💾 Saved panel_b_health.csv")
+    ctx.panels["panel_b"] = panel_b
 
-        except Exception as e:
-            log_print(f"❌ Model B failed: {e}")
 
-    # =====================================================================
-    # Model C: Sectoral Emissions → PM2.5 (Panel with Fixed Effects)
-    # =====================================================================
-    if "C" in models_to_run or "G" in models_to_run or "E" in models_to_run:
-        log_print("\n" + "=" * 70)
-        log_print("MODEL C: Sectoral Emissions → PM₂.₅ (Multivariate Panel FE)")
-        log_print("=" * 70)
-        log_print("Panel regression with country & year fixed effects")
-        log_print("Sectors: Energy, Manufacturing, Transport")
+def build_panel_c(ctx: RunContext):
+    """Panel C: WHO PM2.5 × UNFCCC sectoral emissions, plus its dense cube (shared by C, G, E)."""
+    import numpy as np
+    from src.data_loader import widen_values
+    from src.panel import PanelCube
 
-        try:
-            # Merge WHO PM2.5 with UNFCCC sectoral data
-            panel_c = who_pm25.merge(unfccc_sectoral, on=["iso3", "country", "year"], how="inner")
-
-            if len(panel_c) < 20:
-                log_print(f"[WARN] Insufficient data: {len(panel_c)} observations. Skipping.")
-            else:
-                # Log transform
-                panel_c["ln_pm25"] = np.log(panel_c["pm25"])
-                panel_c["ln_energy"] = np.log(panel_c["energy_emissions"])
-                panel_c["ln_industry"] = np.log(panel_c["industry_emissions"])
-                panel_c["ln_transport"] = np.log(panel_c["transport_emissions"])
-
-                # Remove infinities and missing
-                panel_c = panel_c.replace([np.inf, -np.inf], np.nan).dropna(
-                    subset=["ln_pm25", "ln_energy", "ln_industry", "ln_transport"]
-                )
+    log_section(
+        "PANEL C: WHO PM₂.₅ × UNFCCC Sectoral Emissions",
+        "Sectors: Energy, Manufacturing, Transport",
+    )
+    # Merge WHO PM2.5 with UNFCCC sectoral data
+    panel_c = ctx.datasets["WHO PM2.5"].merge(
+        ctx.datasets["UNFCCC Sectoral"], on=["iso3", "country", "year"], how="inner"
+    )
+    panel_c = widen_values(panel_c)
 
-                log_print(
-                    f"✓ Panel C: {len(panel_c)} observations from {panel_c['country'].nunique()} countries, {panel_c['year'].nunique()} years"
-                )
+    if len(panel_c) < 20:
+        log_print(f"[WARN] Insufficient data: {len(panel_c)} observations. Skipping.")
+        return
 
-                # Save intermediate panel
-                panel_c.to_csv(OUTPUT_DIR / "panel_c_sectoral.csv", index=False)
-                log_print(f"💾 Saved panel_c_sectoral.csv")
-
-                # Fit Model C if requested
-                if "C" in models_to_run:
-                    # Ensure clean data before saving
-                    clean_panel_c = panel_c[["iso3", "country", "year", "ln_pm25", "ln_energy", "ln_industry", "ln_transport"]].copy()
-                    clean_panel_c = clean_panel_c.dropna(subset=["ln_pm25", "ln_energy", "ln_industry", "ln_transport"])
-                    
-                    # Save estimation panel with exact naming convention
-                    clean_panel_c.to_csv(OUTPUT_DIR / "panel_model_c_estimation.csv", index=False)
-                    log_print(f"💾 Saved panel_model_c_estimation.csv (N={len(clean_panel_c)}, countries={clean_panel_c['country'].nunique()}, years={clean_panel_c['year'].nunique()})")
-                    log_panel_save(f"Model C: panel_model_c_estimation.csv (N={len(clean_panel_c)}, countries={clean_panel_c['country'].nunique()}, years={clean_panel_c['year'].nunique()})")
-                    
-                    # Prepare for panel regression (set MultiIndex)
-                    df_panel = clean_panel_c.set_index(["iso3", "year"]).sort_index()
-
-                    # Variables for the model
-                    y = df_panel["ln_pm25"]
-                    X = df_panel[["ln_energy", "ln_industry", "ln_transport"]]
-
-                    # FIXED: Use fit_panel_fe() for consistency
-                    # NOTE: No constant added - absorbed by fixed effects
-                    fit_panel_fe(
-                        y,
-                        X,
-                        "ModelC_Sectoral_PM25",
-                        results_summary,
-                        entity_effects=True,
-                        time_effects=True,
-                        print_fn=log_print,
-                    )
-                    log_print("✓ Model C complete")
+    # Log transform
+    panel_c["ln_pm25"] = np.log(panel_c["pm25"])
+    panel_c["ln_energy"] = np.log(panel_c["energy_emissions"])
+    panel_c["ln_industry"] = np.log(panel_c["industry_emissions"])
+    panel_c["ln_transport"] = np.log(panel_c["transport_emissions"])
 
-        except Exception as e:
-            log_print(f"❌ Model C failed: {e}")
+    # Remove infinities and missing
+    panel_c = panel_c.replace([np.inf, -np.inf], np.nan).dropna(
+        subset=["ln_pm25", "ln_energy", "ln_industry", "ln_transport"]
+    )
 
-    # =====================================================================
-    # Model D: PM2.5 → YLL (GBD mortality)
-    # =====================================================================
-    panel_d = None
-    if "D" in models_to_run or "J" in models_to_run:
-        log_print("\n" + "=" * 70)
-        log_print("MODEL D: PM₂.₅ → YLL (GBD Mortality Burden)")
-        log_print("=" * 70)
-        log_print("Nearest-year merge (±3 years) between WHO PM2.5 and GBD YLL data")
+    log_print(
+        f"✓ Panel C: {len(panel_c)} observations from {panel_c['country'].nunique()} countries, {panel_c['year'].nunique()} years"
+    )
 
-        try:
-            panel_d = merge_nearest_years(who_pm25, gbd_yll, "iso3", "year", "year", tolerance=3)
-
-            if len(panel_d) < 10:
-                log_print(f"[WARN] Insufficient data: {len(panel_d)} observations. Skipping.")
-            else:
-                # Log transform
-                panel_d["ln_pm25"] = np.log(panel_d["pm25"])
-                panel_d["ln_yll"] = np.log(panel_d["yll_asmr"])
-
-                # Remove infinities
-                panel_d = panel_d.replace([np.inf, -np.inf], np.nan).dropna(
-                    subset=["ln_pm25", "ln_yll"]
-                )
+    # Save intermediate panel
+    panel_c.to_csv(OUTPUT_DIR / "panel_c_sectoral.csv", index=False)
+    log_print(f"💾 Saved panel_c_sectoral.csv")
 
-                log_print(
-                    f"✓ Panel D: {len(panel_d)} observations from {panel_d['country'].nunique()} countries"
-                )
+    cube_c = PanelCube.from_frame(panel_c)
+    balance_c = cube_c.balance()
+    log_print(
+        f"  Panel C cube: {balance_c['n_entities']} countries × {balance_c['n_years']} years, "
+        f"coverage {balance_c['coverage']:.1%}, "
+        f"obs/country {balance_c['min_obs_per_entity']}–{balance_c['max_obs_per_entity']}"
+    )
+    ctx.panels["panel_c"] = panel_c
+    ctx.panels["cube_c"] = cube_c
 
-                # Save intermediate panel
-                panel_d.to_csv(OUTPUT_DIR / "panel_d_mortality.csv", index=False)
-                log_print(f"💾 Saved panel_d_mortality.csv")
-
-                # Fit regression: ln(YLL) ~ ln(PM2.5)
-                if "D" in models_to_run:
-                    # Save estimation panel with exact naming convention
-                    estimation_panel_d = panel_d[["iso3", "country", "ln_yll", "ln_pm25"]].copy()
-                    estimation_panel_d.to_csv(OUTPUT_DIR / "panel_model_d_estimation.csv", index=False)
-                    log_print(f"💾 Saved panel_model_d_estimation.csv (N={len(estimation_panel_d)})")
-                    log_panel_save(f"Model D: panel_model_d_estimation.csv (N={len(estimation_panel_d)}, countries={panel_d['country'].nunique()})")
-                    
-                    fit_ols(
-                        panel_d["ln_yll"],
-                        panel_d[["ln_pm25"]],
-                        "ModelD_PM25_YLL",
-                        results_summary,
-                        log_print,
-                    )
-                    log_print("✓ Model D complete")
 
-        except Exception as e:
-            log_print(f"❌ Model D failed: {e}")
+def build_panel_d(ctx: RunContext):
+    """Panel D: WHO PM2.5 × GBD YLL, nearest-year matched (primary + tolerance variants)."""
+    from src.data_loader import merge_nearest_years_multi
 
-    # =====================================================================
-    # Model G: Total Emissions → PM2.5 (Panel FE)
-    # =====================================================================
-    if "G" in models_to_run:
-        log_print("\n" + "=" * 70)
-        log_print("MODEL G: Total Emissions → PM₂.₅ (Panel FE)")
-        log_print("=" * 70)
-        log_print("Aggregated emissions to address sectoral multicollinearity")
+    log_section(
+        "PANEL D: WHO PM₂.₅ × GBD YLL",
+        f"Nearest-year merge (±{PRIMARY_TOLERANCE} years) between WHO PM2.5 and GBD YLL data",
+    )
+    panels_d = merge_nearest_years_multi(
+        ctx.datasets["WHO PM2.5"], ctx.datasets["GBD YLL"], "iso3", "year", "year", ctx.tolerances
+    )
+    log_tolerance_samples("Panel D", panels_d)
+    ctx.panels["variants_d"] = tolerance_variants(panels_d, "yll_asmr", "ln_yll")
+
+    if len(panels_d[PRIMARY_TOLERANCE]) < 10:
+        log_print(
+            f"[WARN] Insufficient data: {len(panels_d[PRIMARY_TOLERANCE])} observations. Skipping."
+        )
+        return
+    panel_d = prepare_health_panel(panels_d[PRIMARY_TOLERANCE], "yll_asmr", "ln_yll")
+
+    log_print(
+        f"✓ Panel D: {len(panel_d)} observations from {panel_d['country'].nunique()} countries"
+    )
 
+    # Save intermediate panel
+    panel_d.to_csv(OUTPUT_DIR / "panel_d_mortality.csv", index=False)
+    log_print(f"💾 Saved panel_d_mortality.csv")
+    ctx.panels["panel_d"] = panel_d
+
+
+# =====================================================================
+# Models
+# =====================================================================
+def run_model_b(ctx: RunContext):
+    """Model B: PM2.5 → DALY (EEA health burden)."""
+    from src.models import fit_ols
+
+    log_section("MODEL B: PM₂.₅ → DALY (EEA Health Burden)")
+    panel_b = ctx.panels.get("panel_b")
+    if panel_b is None:
+        log_print("[WARN] Panel B not available. Skipping Model B.")
+        return
+
+    # Ensure clean data before saving estimation panel
+    clean_panel_b = panel_b[["iso3", "country", "ln_daly", "ln_pm25"]].copy()
+    clean_panel_b = clean_panel_b.dropna(subset=["ln_daly", "ln_pm25"])
+
+    # Save estimation panel with exact naming convention
+    clean_panel_b.to_csv(OUTPUT_DIR / "panel_model_b_estimation.csv", index=False)
+    log_print(f"💾 Saved panel_model_b_estimation.csv (N={len(clean_panel_b)})")
+    log_panel_save(f"Model B: panel_model_b_estimation.csv (N={len(clean_panel_b)}, countries={clean_panel_b['country'].nunique()})")
+
+    # Fit regression: ln(DALY) ~ ln(PM2.5)
+    fit_ols(
+        panel_b["ln_daly"],
+        panel_b[["ln_pm25"]],
+        "ModelB_PM25_DALY",
+        ctx.results_summary,
+        log_print,
+        jackknife_groups=panel_b[["iso3", "year"]] if ctx.jackknife else None,
+    )
+    for t, variant in ctx.panels["variants_b"].items():
+        log_print(f"\n--- Model B: nearest-year tolerance ±{t} (N={len(variant)}) ---")
+        fit_ols(
+            variant["ln_daly"],
+            variant[["ln_pm25"]],
+            f"ModelB_PM25_DALY_tol{t}",
+            ctx.results_summary,
+            log_print,
+        )
+    log_print("✓ Model B complete")
+
+
+def run_model_c(ctx: RunContext):
+    """Model C: Sectoral Emissions → PM2.5 (panel with country & year fixed effects)."""
+    from src.models import fit_panel_fe
+
+    log_section(
+        "MODEL C: Sectoral Emissions → PM₂.₅ (Multivariate Panel FE)",
+        "Panel regression with country & year fixed effects",
+    )
+    panel_c, cube_c = ctx.panels.get("panel_c"), ctx.panels.get("cube_c")
+    if cube_c is None:
+        log_print("[WARN] Panel C not available. Skipping Model C.")
+        return
+
+    # Ensure clean data before saving
+    clean_panel_c = panel_c[["iso3", "country", "year", "ln_pm25", "ln_energy", "ln_industry", "ln_transport"]].copy()
+    clean_panel_c = clean_panel_c.dropna(subset=["ln_pm25", "ln_energy", "ln_industry", "ln_transport"])
+
+    # Save estimation panel with exact naming convention
+    clean_panel_c.to_csv(OUTPUT_DIR / "panel_model_c_estimation.csv", index=False)
+    log_print(f"💾 Saved panel_model_c_estimation.csv (N={len(clean_panel_c)}, countries={clean_panel_c['country'].nunique()}, years={clean_panel_c['year'].nunique()})")
+    log_panel_save(f"Model C: panel_model_c_estimation.csv (N={len(clean_panel_c)}, countries={clean_panel_c['country'].nunique()}, years={clean_panel_c['year'].nunique()})")
+
+    # Prepare for panel regression (sorted MultiIndex from the cube)
+    df_panel = cube_c.to_frame(["ln_pm25", "ln_energy", "ln_industry", "ln_transport"])
+
+    # NOTE: No constant added - absorbed by fixed effects
+    fit_panel_fe(
+        df_panel["ln_pm25"],
+        df_panel[["ln_energy", "ln_industry", "ln_transport"]],
+        "ModelC_Sectoral_PM25",
+        ctx.results_summary,
+        entity_effects=True,
+        time_effects=True,
+        print_fn=log_print,
+        randomization_draws=ctx.randomization_draws,
+        seed=ctx.seed,
+        jobs=ctx.jobs,
+    )
+    log_print("✓ Model C complete")
+
+
+def run_model_d(ctx: RunContext):
+    """Model D: PM2.5 → YLL (GBD mortality burden)."""
+    from src.models import fit_ols
+
+    log_section("MODEL D: PM₂.₅ → YLL (GBD Mortality Burden)")
+    panel_d = ctx.panels.get("panel_d")
+    if panel_d is None:
+        log_print("[WARN] Panel D not available. Skipping Model D.")
+        return
+
+    # Save estimation panel with exact naming convention
+    estimation_panel_d = panel_d[["iso3", "country", "ln_yll", "ln_pm25"]].copy()
+    estimation_panel_d.to_csv(OUTPUT_DIR / "panel_model_d_estimation.csv", index=False)
+    log_print(f"💾 Saved panel_model_d_estimation.csv (N={len(estimation_panel_d)})")
+    log_panel_save(f"Model D: panel_model_d_estimation.csv (N={len(estimation_panel_d)}, countries={panel_d['country'].nunique()})")
+
+    # Fit regression: ln(YLL) ~ ln(PM2.5)
+    fit_ols(
+        panel_d["ln_yll"],
+        panel_d[["ln_pm25"]],
+        "ModelD_PM25_YLL",
+        ctx.results_summary,
+        log_print,
+        jackknife_groups=panel_d[["iso3", "year"]] if ctx.jackknife else None,
+    )
+    for t, variant in ctx.panels["variants_d"].items():
+        log_print(f"\n--- Model D: nearest-year tolerance ±{t} (N={len(variant)}) ---")
+        fit_ols(
+            variant["ln_yll"],
+            variant[["ln_pm25"]],
+            f"ModelD_PM25_YLL_tol{t}",
+            ctx.results_summary,
+            log_print,
+        )
+    log_print("✓ Model D complete")
+
+
+def run_model_g(ctx: RunContext):
+    """Model G: Total Emissions → PM2.5 (panel FE), plus optional year windows."""
+    from src.models import fit_model_g_total_emissions, fit_model_g_windows
+
+    log_section(
+        "MODEL G: Total Emissions → PM₂.₅ (Panel FE)",
+        "Aggregated emissions to address sectoral multicollinearity",
+    )
+    cube_c = ctx.panels.get("cube_c")
+    if cube_c is None or cube_c.n_obs < 20:
+        log_print("[WARN] Panel C not available. Skipping Model G.")
+        return
+
+    fit_model_g_total_emissions(
+        cube_c,
+        "ModelG_TotalEmissions_PM25",
+        ctx.results_summary,
+        log_print,
+        log_panel_save,
+        jackknife=ctx.jackknife,
+        randomization_draws=ctx.randomization_draws,
+        seed=ctx.seed,
+        jobs=ctx.jobs,
+    )
+    log_print("✓ Model G complete")
+    if ctx.window:
+        fit_model_g_windows(
+            cube_c, "ModelG_TotalEmissions_PM25", ctx.window, ctx.window_mode, log_print
+        )
+
+
+def run_model_e(ctx: RunContext):
+    """Model E-lite: Lagged Total Emissions → PM2.5 (panel FE, GATED), plus optional lag grid."""
+    from src.audit import check_lag_grid_gate, check_model_e_gate
+    from src.models import fit_model_e_lag_grid, fit_model_e_lagged
+
+    log_section(
+        "MODEL E-LITE: Lagged Total Emissions → PM₂.₅ (Panel FE)",
+        "Tests temporal precedence with 1-year lag",
+        "GATED: Only runs if panel quality criteria are met",
+    )
+    cube_c = ctx.panels.get("cube_c")
+    if cube_c is None or cube_c.n_obs < 20:
+        log_print("[WARN] Panel C not available. Skipping Model E.")
+        return
+
+    # Check gate criteria BEFORE running model
+    gate_passed, gate_diagnostics = check_model_e_gate(
+        cube_c,
+        max_sample_loss=0.30,
+        min_country_retention=0.67,
+        print_fn=log_print,
+        save_to_file=True,
+    )
+
+    if gate_passed:
+        fit_model_e_lagged(
+            cube_c,
+            "ModelE_LaggedTotalEmissions_PM25",
+            ctx.results_summary,
+            log_print,
+            log_panel_save,
+            randomization_draws=ctx.randomization_draws,
+            seed=ctx.seed,
+            jobs=ctx.jobs,
+        )
+        log_print("✓ Model E-lite complete")
+    else:
+        log_print(f"⚠️ Model E-lite SKIPPED: {gate_diagnostics['reason']}")
+
+    if ctx.max_lag:
+        log_print(f"\n--- Model E lag grid: lags 0..{ctx.max_lag} ---")
+        specs, _ = check_lag_grid_gate(
+            cube_c,
+            ctx.max_lag,
+            max_sample_loss=0.30,
+            min_country_retention=0.67,
+            print_fn=log_print,
+            save_to_file=True,
+        )
+        fit_model_e_lag_grid(cube_c, specs, "ModelE_LagGrid", log_print)
+        log_print("✓ Model E lag grid complete")
+
+
+J_OUTCOMES = (
+    ("DALY", "b", "ln_daly", "ModelJ_PM25_DALY"),
+    ("YLL", "d", "ln_yll", "ModelJ_PM25_YLL"),
+)
+
+
+def run_model_j(ctx: RunContext, outcomes: tuple[str, ...] = ("DALY", "YLL"), banner: bool = True):
+    """Model J: Quadratic PM2.5 → Health (OLS) on Panels B (DALY) and/or D (YLL)."""
+    from src.models import fit_model_j_quadratic
+
+    if banner:
+        log_section(
+            "MODEL J: Quadratic PM₂.₅ → Health (OLS)",
+            "Tests nonlinear dose-response relationship",
+            "Centered specification: z = ln(PM₂.₅) - mean(ln(PM₂.₅))",
+        )
+    for label, panel_key, outcome, name in J_OUTCOMES:
+        if label not in outcomes:
+            continue
+        panel = ctx.panels.get(f"panel_{panel_key}")
+        if panel is None:
+            log_print(
+                f"[WARN] Panel {panel_key.upper()} not available. Skipping Model J ({label})."
+            )
+            continue
         try:
-            if panel_c is not None and len(panel_c) >= 20:
-                fit_model_g_total_emissions(
-                    panel_c,
-                    "ModelG_TotalEmissions_PM25",
-                    results_summary,
+            log_print(f"\n--- Model J: PM₂.₅ → {label} (Quadratic) ---")
+            fit_model_j_quadratic(
+                panel,
+                outcome,
+                name,
+                ctx.results_summary,
+                log_print,
+                log_panel_save,
+                jackknife=ctx.jackknife,
+                bootstrap_reps=ctx.bootstrap_reps,
+                seed=ctx.seed,
+                jobs=ctx.jobs,
+            )
+            for t, variant in ctx.panels[f"variants_{panel_key}"].items():
+                log_print(
+                    f"\n--- Model J ({label}): nearest-year tolerance ±{t} (N={len(variant)}) ---"
+                )
+                fit_model_j_quadratic(
+                    variant,
+                    outcome,
+                    f"{name}_tol{t}",
+                    ctx.results_summary,
                     log_print,
+                    log_panel_save,
+                    bootstrap_reps=ctx.bootstrap_reps,
+                    seed=ctx.seed,
+                    jobs=ctx.jobs,
+                    sample_tag=f"_tol{t}",
                 )
-                log_print("✓ Model G complete")
-            else:
-                log_print("[WARN] Panel C not available. Skipping Model G.")
-
+            log_print(f"✓ Model J ({label}) complete")
         except Exception as e:
-            log_print(f"❌ Model G failed: {e}")
+            log_print(f"❌ Model J ({label}) failed: {e}")
+
+
+def build_registry(gbd_chunksize: int | None = None) -> Registry:
+    """Pipeline steps: datasets, the panels built from them, and the models fitted on the panels."""
+    from src.data_loader import load_eea_burden, load_gbd_yll, load_unfccc_sectoral, load_who_pm25
+
+    return Registry(
+        [
+            Step("WHO PM2.5", "dataset", load_who_pm25),
+            Step("EEA Burden (DALY)", "dataset", load_eea_burden),
+            Step("GBD YLL", "dataset", partial(load_gbd_yll, chunksize=gbd_chunksize)),
+            Step("UNFCCC Sectoral", "dataset", load_unfccc_sectoral),
+            Step("panel_b", "panel", build_panel_b, ("WHO PM2.5", "EEA Burden (DALY)"), "Panel B"),
+            Step("panel_c", "panel", build_panel_c, ("WHO PM2.5", "UNFCCC Sectoral"), "Panel C"),
+            Step("panel_d", "panel", build_panel_d, ("WHO PM2.5", "GBD YLL"), "Panel D"),
+            Step(
+                "B",
+                "model",
+                run_model_b,
+                ("panel_b",),
+                "Model B",
+                units=(
+                    Unit(
+                        "B",
+                        run_model_b,
+                        inputs=("panel_b", "variants_b"),
+                        spec=("jackknife",),
+                        artifacts=("ModelB_*", "panel_model_b_*"),
+                    ),
+                ),
+            ),
+            Step(
+                "C",
+                "model",
+                run_model_c,
+                ("panel_c",),
+                "Model C",
+                units=(
+                    Unit(
+                        "C",
+                        run_model_c,
+                        inputs=("panel_c",),
+                        spec=("randomization_draws", "seed"),
+                        artifacts=("ModelC_*", "panel_model_c_*"),
+                    ),
+                ),
+            ),
+            Step(
+                "D",
+                "model",
+                run_model_d,
+                ("panel_d",),
+                "Model D",
+                units=(
+                    Unit(
+                        "D",
+                        run_model_d,
+                        inputs=("panel_d", "variants_d"),
+                        spec=("jackknife",),
+                        artifacts=("ModelD_*", "panel_model_d_*"),
+                    ),
+                ),
+            ),
+            Step(
+                "G",
+                "model",
+                run_model_g,
+                ("panel_c",),
+                "Model G",
+                units=(
+                    Unit(
+                        "G",
+                        run_model_g,
+                        inputs=("panel_c",),
+                        spec=("jackknife", "randomization_draws", "seed", "window", "window_mode"),
+                        artifacts=("ModelG_*", "panel_model_g_*"),
+                    ),
+                ),
+            ),
+            Step(
+                "E",
+                "model",
+                run_model_e,
+                ("panel_c",),
+                "Model E-lite",
+                units=(
+                    Unit(
+                        "E",
+                        run_model_e,
+                        inputs=("panel_c",),
+                        spec=("randomization_draws", "seed", "max_lag"),
+                        artifacts=("ModelE_*", "panel_model_e_*"),
+                    ),
+                ),
+            ),
+            Step(
+                "J",
+                "model",
+                run_model_j,
+                ("panel_b", "panel_d"),
+                "Model J",
+                units=(
+                    Unit(
+                        "J_DALY",
+                        partial(run_model_j, outcomes=("DALY",)),
+                        inputs=("panel_b", "variants_b"),
+                        spec=("jackknife", "bootstrap_reps", "seed"),
+                        artifacts=("ModelJ_PM25_DALY*", "panel_model_j_daly*"),
+                    ),
+                    Unit(
+                        "J_YLL",
+                        partial(run_model_j, outcomes=("YLL",), banner=False),
+                        inputs=("panel_d", "variants_d"),
+                        spec=("jackknife", "bootstrap_reps", "seed"),
+                        artifacts=("ModelJ_PM25_YLL*", "panel_model_j_yll*"),
+                    ),
+                ),
+            ),
+        ]
+    )
 
-    # =====================================================================
-    # Model E-lite: Lagged Total Emissions → PM2.5 (Panel FE, GATED)
-    # =====================================================================
-    if "E" in models_to_run:
-        log_print("\n" + "=" * 70)
-        log_print("MODEL E-LITE: Lagged Total Emissions → PM₂.₅ (Panel FE)")
-        log_print("=" * 70)
-        log_print("Tests temporal precedence with 1-year lag")
-        log_print("GATED: Only runs if panel quality criteria are met")
 
-        try:
-            if panel_c is not None and len(panel_c) >= 20:
-                # Check gate criteria BEFORE running model
-                gate_passed, gate_diagnostics = check_model_e_gate(
-                    panel_c,
-                    max_sample_loss=0.30,
-                    min_country_retention=0.67,
-                    print_fn=log_print,
-                    save_to_file=True,
-                )
+# =====================================================================
+# Execution
+# =====================================================================
+def run_step(title: str, run: Callable, ctx: RunContext) -> bool:
+    """Run one panel/model callable, logging (not raising) its failure."""
+    try:
+        run(ctx)
+        return True
+    except Exception as e:
+        log_print(f"❌ {title} failed: {e}")
+        return False
 
-                if gate_passed:
-                    fit_model_e_lagged(
-                        panel_c,
-                        "ModelE_LaggedTotalEmissions_PM25",
-                        results_summary,
-                        log_print,
-                    )
-                    log_print("✓ Model E-lite complete")
-                else:
-                    log_print(f"⚠️ Model E-lite SKIPPED: {gate_diagnostics['reason']}")
-            else:
-                log_print("[WARN] Panel C not available. Skipping Model E.")
 
-        except Exception as e:
-            log_print(f"❌ Model E-lite failed: {e}")
+def unit_title(step: Step, unit: Unit) -> str:
+    """Log title of a model unit: the step title, plus the unit name for multi-unit steps."""
+    return step.title if len(step.units) == 1 else f"{step.title} ({unit.name})"
 
-    # =====================================================================
-    # Model J: Quadratic PM2.5 → Health (OLS)
-    # =====================================================================
-    if "J" in models_to_run:
-        log_print("\n" + "=" * 70)
-        log_print("MODEL J: Quadratic PM₂.₅ → Health (OLS)")
+
+def execute_unit(
+    title: str, unit: Unit, ctx: RunContext, echo: bool = True
+) -> tuple[list, list, tuple]:
+    """
+    Fit one model unit, or restore it from the artifact cache if its panels,
+    specification and the pipeline code are unchanged (unless ctx.force).
+
+    Args:
+        echo: Print log lines as they happen (False in worker processes)
+
+    Returns:
+        (log lines as (channel, text), summary rows,
+         (unit name, cache key, plot jobs still to render))
+    """
+    from src.artifacts import (
+        artifact_key,
+        load_artifacts,
+        load_plot_jobs,
+        restore_artifacts,
+        save_artifacts,
+        snapshot,
+        written_since,
+    )
+
+    global _log_capture, _log_echo
+    _log_capture, _log_echo = [], echo
+    unit_ctx = copy.copy(ctx)
+    unit_ctx.results_summary = []
+    take_queued()
+    try:
+        key, key_parts = artifact_key(
+            unit.name,
+            {name: ctx.panels.get(name) for name in unit.inputs},
+            {opt: getattr(ctx, opt) for opt in unit.spec},
+            unit.version,
+        )
+        cached = None if ctx.force else load_artifacts(unit.name, key)
+        if cached is not None:
+            restore_artifacts(cached, OUTPUT_DIR)
+            log_print(
+                f"\n♻ {title}: inputs unchanged, "
+                f"restored {len(cached['files'])} artifacts from cache ({key})"
+            )
+            log_panel_save(f"{title}: restored from artifact cache ({key})")
+            for channel, text in cached["messages"]:
+                (log_print if channel == "print" else log_panel_save)(text)
+            stale_plots = ctx.plot_dpi is not None and cached.get("plot_dpi") != ctx.plot_dpi
+            plots = load_plot_jobs(cached) if stale_plots else []
+            return _log_capture, cached["rows"], (unit.name, key, plots)
+
+        before = snapshot(OUTPUT_DIR, unit.artifacts)
+        ok = run_step(title, unit.run, unit_ctx)
+        plots = take_queued()
+        if ok:
+            messages = list(_log_capture)
+            files = written_since(before, OUTPUT_DIR, unit.artifacts)
+            save_artifacts(
+                unit.name,
+                key,
+                key_parts,
+                OUTPUT_DIR,
+                files,
+                unit_ctx.results_summary,
+                messages,
+                plots,
+            )
+        return _log_capture, unit_ctx.results_summary, (unit.name, key, plots)
+    finally:
+        _log_capture, _log_echo = None, True
+
+
+def run_unit_in_worker(
+    title: str, unit: Unit, ctx: RunContext, handle: tuple
+) -> tuple[list, list, tuple]:
+    """
+    Worker entry point: fit one model unit on shared-memory panels.
+
+    Returns:
+        execute_unit() results for the parent to replay in order
+    """
+    from src.parallel import attach_panels, release_blocks
+
+    panels, blocks = attach_panels(handle)
+    ctx.panels = panels
+    try:
+        return execute_unit(title, unit, ctx, echo=False)
+    finally:
+        ctx.panels = panels = None
+        release_blocks(blocks)
+
+
+def run_models_parallel(ctx: RunContext, steps: list[Step], jobs: int):
+    """
+    Fit independent model units in worker processes.
+
+    Panels are placed in shared memory once; each worker pins BLAS to one
+    thread and runs bootstrap/randomization batches in-process (results do
+    not depend on the batch scheduling). Logs and summary rows are merged in
+    model order as the units are collected, whatever order they finish in.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from src.parallel import SharedPanels, pin_blas_threads
+
+    units = [(unit_title(step, unit), unit) for step in steps for unit in step.units]
+    t0 = time.perf_counter()
+    with SharedPanels(ctx.panels) as shared:
+        log_print(
+            f"\n⚙ Fitting {len(units)} model units in {jobs} processes "
+            f"(shared panels: {shared.nbytes / 1024:,.1f} KB, BLAS threads/worker: 1)"
+        )
+        worker_ctx = ctx.for_worker()
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=pin_blas_threads, initargs=(1,)
+        ) as pool:
+            futures = [
+                pool.submit(run_unit_in_worker, title, unit, worker_ctx, shared.handle)
+                for title, unit in units
+            ]
+            for (title, _), future in zip(units, futures):
+                try:
+                    messages, rows, plots = future.result()
+                except Exception as e:
+                    log_print(f"❌ {title} failed in worker: {e}")
+                    continue
+                for channel, text in messages:
+                    (log_print if channel == "print" else log_panel_save)(text)
+                ctx.results_summary.extend(rows)
+                ctx.plots.append(plots)
+    log_print(
+        f"\n  ⏱ {len(units)} model units fitted in {time.perf_counter() - t0:.2f}s (jobs={jobs})"
+    )
+
+
+def render_model_plots(ctx: RunContext, jobs: int):
+    """
+    Plot stage: render the diagnostic plots queued by the model units.
+
+    Runs after every fit, CSV and the summary are written. Rendered plots are
+    added to their units' artifact cache entries.
+    """
+    from src.artifacts import add_plot_artifacts
+
+    pending = [(name, key, plots) for name, key, plots in ctx.plots if plots]
+    n_plots = sum(len(plots) for _, _, plots in pending)
+    if ctx.plot_dpi is None:
+        log_print(f"\n🖼 Plots disabled (--no-plots): {n_plots} diagnostic plots skipped")
+        return
+    if not n_plots:
+        log_print("\n🖼 Diagnostic plots up to date (restored from cache)")
+        return
+
+    log_print(f"\n🖼 Rendering {n_plots} diagnostic plots (dpi={ctx.plot_dpi}, jobs={jobs})...")
+    try:
+        written, seconds = render_plots(
+            [job for _, _, plots in pending for job in plots],
+            OUTPUT_DIR,
+            processes=jobs,
+            dpi=ctx.plot_dpi,
+        )
+    except Exception as e:
+        log_print(f"❌ Plot rendering failed: {e}")
+        return
+    for name, key, plots in pending:
+        add_plot_artifacts(
+            name, key, OUTPUT_DIR, [filename for _, filename, _ in plots], ctx.plot_dpi
+        )
+    log_print(f"  ⏱ {len(written)} plots rendered in {seconds:.2f}s")
+
+
+# =====================================================================
+# Main Pipeline
+# =====================================================================
+def main(
+    models_to_run: list[str],
+    gbd_chunksize: int | None = None,
+    jobs: int = 1,
+    float32: bool = False,
+    jackknife: bool = False,
+    bootstrap_reps: int = 2000,
+    seed: int = 42,
+    randomization_draws: int = 0,
+    window: int = 0,
+    window_mode: str = "rolling",
+    max_lag: int = 0,
+    tolerances: list[int] | None = None,
+    parallel: bool = False,
+    force: bool = False,
+    plots: bool = True,
+    plot_preview: bool = False,
+):
+    """
+    Execute selected models.
+
+    Only the datasets and panels the selected models need are loaded and
+    built (see build_registry), each exactly once.
+
+    Args:
+        models_to_run: Model identifiers, any of 'B', 'C', 'D', 'G', 'E', 'J'
+        gbd_chunksize: Stream the GBD YLL file in chunks of this many rows (None = in memory)
+        jobs: Number of datasets to load concurrently / bootstrap and randomization worker processes
+        float32: Store raw dataset values as float32 (panels are widened to float64)
+        jackknife: Write leave-one-country/year-out influence outputs for B, D, G and J
+        bootstrap_reps: Country-cluster bootstrap replicates for Model J CIs (0 = off)
+        seed: Seed for bootstrap and randomization draws
+        randomization_draws: Randomization/placebo draws per scheme for C, G and E (0 = off)
+        window: Also estimate Model G over year windows of this width (0 = off)
+        window_mode: 'rolling' or 'expanding' windows
+        max_lag: Also run the Model E lag grid (individual and distributed lags 0..max_lag; 0 = off)
+        tolerances: Extra nearest-year tolerances for B, D and J (fitted as *_tol{T} variants)
+        parallel: Fit the models in `jobs` worker processes once the panels are built
+        force: Refit every model even if its cached artifacts are up to date
+        plots: Render the diagnostic plots (after all fits and CSVs)
+        plot_preview: Render plots at preview resolution instead of full
+    """
+    import pandas as pd
+    from src.audit import audit_panel_balance
+    from src.data_loader import category_memory, compact_frames, frame_memory
+
+    plan = build_registry(gbd_chunksize).plan(models_to_run)
+    open_logs()
+    try:
+        log_print(f"🚀 Starting Environmental-Health Pipeline")
+        log_print(f"📋 Models to run: {', '.join(s.name for s in plan.models)}")
+        log_print(f"🧭 Plan: {plan.describe()}")
+        log_print(f"📊 Log file: {log_path}")
         log_print("=" * 70)
-        log_print("Tests nonlinear dose-response relationship")
-        log_print("Centered specification: z = ln(PM₂.₅) - mean(ln(PM₂.₅))")
 
-        # Model J for DALY (uses panel_b)
-        if panel_b is not None and len(panel_b) >= 10:
-            try:
-                log_print("\n--- Model J: PM₂.₅ → DALY (Quadratic) ---")
-                fit_model_j_quadratic(
-                    panel_b,
-                    "ln_daly",
-                    "ModelJ_PM25_DALY",
-                    results_summary,
-                    log_print,
-                )
-                log_print("✓ Model J (DALY) complete")
-            except Exception as e:
-                log_print(f"❌ Model J (DALY) failed: {e}")
+        # Load only the datasets the plan needs
+        log_print("\n📂 Loading datasets...")
+        datasets = load_datasets({s.name: s.run for s in plan.datasets}, jobs=jobs)
+
+        # Compact dtypes: shared categoricals for country/iso3, small int years
+        compacted = compact_frames(datasets, float32=float32)
+        log_print("\n🗜 Compact dtypes (memory before → after, shared categories counted once):")
+        shared = category_memory(compacted)
+        total_before, total_after = 0, shared
+        for label, df in compacted.items():
+            before, after = frame_memory(datasets[label]), frame_memory(df, categories=False)
+            total_before += before
+            total_after += after
+            log_print(f"  {label}: {before / 1024:,.1f} KB → {after / 1024:,.1f} KB")
+        log_print(f"  shared country/iso3 categories: {shared / 1024:,.1f} KB")
+        log_print(f"  total: {total_before / 1024:,.1f} KB → {total_after / 1024:,.1f} KB")
+
+        ctx = RunContext(
+            compacted,
+            jobs=jobs,
+            jackknife=jackknife,
+            bootstrap_reps=bootstrap_reps,
+            seed=seed,
+            randomization_draws=randomization_draws,
+            window=window,
+            window_mode=window_mode,
+            max_lag=max_lag,
+            tolerances=tolerances,
+            force=force,
+            plot_dpi=(PREVIEW_DPI if plot_preview else FULL_DPI) if plots else None,
+        )
+
+        # Each shared panel once, then every model in declaration order
+        for step in plan.panels:
+            run_step(step.title, step.run, ctx)
+        if parallel and jobs > 1:
+            run_models_parallel(ctx, plan.models, jobs)
         else:
-            log_print("[WARN] Panel B not available. Skipping Model J (DALY).")
+            for step in plan.models:
+                for unit in step.units:
+                    _, rows, plots = execute_unit(unit_title(step, unit), unit, ctx)
+                    ctx.results_summary.extend(rows)
+                    ctx.plots.append(plots)
+        results_summary = ctx.results_summary
+
+        # =====================================================================
+        # Summary
+        # =====================================================================
+        log_print("\n" + "=" * 70)
+        log_print("SUMMARY")
+        log_print("=" * 70)
 
-        # Model J for YLL (uses panel_d)
-        if panel_d is not None and len(panel_d) >= 10:
-            try:
-                log_print("\n--- Model J: PM₂.₅ → YLL (Quadratic) ---")
-                fit_model_j_quadratic(
-                    panel_d,
-                    "ln_yll",
-                    "ModelJ_PM25_YLL",
-                    results_summary,
-                    log_print,
-                )
-                log_print("✓ Model J (YLL) complete")
-            except Exception as e:
-                log_print(f"❌ Model J (YLL) failed: {e}")
+        if results_summary:
+            summary_df = pd.DataFrame(results_summary)
+            summary_df.to_csv(OUTPUT_DIR / "summary_all_models.csv", index=False)
+            log_print(f"\n✅ Results saved to: output/summary_all_models.csv")
+            log_print(f"\n{summary_df.to_string()}")
         else:
-            log_print("[WARN] Panel D not available. Skipping Model J (YLL).")
+            log_print("\n[WARN] No models were successfully fitted.")
 
-    # =====================================================================
-    # Summary
-    # =====================================================================
-    log_print("\n" + "=" * 70)
-    log_print("SUMMARY")
-    log_print("=" * 70)
-
-    if results_summary:
-        summary_df = pd.DataFrame(results_summary)
-        summary_df.to_csv(OUTPUT_DIR / "summary_all_models.csv", index=False)
-        log_print(f"\n✅ Results saved to: output/summary_all_models.csv")
-        log_print(f"\n{summary_df.to_string()}")
-    else:
-        log_print("\n[WARN] No models were successfully fitted.")
+        render_model_plots(ctx, jobs)
 
-    log_print(f"\n📊 All outputs saved to: {OUTPUT_DIR}")
-    log_print(f"📝 Log saved to: {log_path}")
-    log_print(f"💾 Panel materialization log: {panel_log_path}")
-    log_print("=" * 70)
-
-    # Run post-execution audit to verify what was created
-    log_print("\n📋 Post-execution panel verification...")
-    audit_panel_balance(print_fn=log_print, save_to_file=False)
+        log_print(f"\n📊 All outputs saved to: {OUTPUT_DIR}")
+        log_print(f"📝 Log saved to: {log_path}")
+        log_print(f"💾 Panel materialization log: {panel_log_path}")
+        log_print("=" * 70)
 
-    # Close panel log
-    panel_log.close()
+        # Run post-execution audit to verify what was created
+        log_print("\n📋 Post-execution panel verification...")
+        audit_panel_balance(print_fn=log_print, save_to_file=False)
+    finally:
+        log_print(f"✅ Pipeline finished. Log: {log_path}")
+        close_logs()
 
 
 if __name__ == "__main__":
@@ -441,26 +1083,175 @@ Examples:
   poetry run python run.py --model B    # Run only Model B
   poetry run python run.py --model J    # Run quadratic models
   poetry run python run.py --model G    # Run total emissions model
+  poetry run python run.py --model C G E  # Panel FE models, loads WHO + UNFCCC only
         """,
     )
     parser.add_argument(
         "--model",
+        nargs="+",
         choices=["B", "C", "D", "G", "E", "J"],
         default=None,
-        help="Run specific model. If not specified, runs all models.",
+        help="Run specific model(s), e.g. --model C G E. If not specified, runs all models.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-parse raw datasets and refit every model without reading or writing "
+        "the caches in .cache/",
+    )
+
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Refit every model even if its inputs, specification and code are unchanged "
+        "(refreshes the artifact cache)",
+    )
+
+    parser.add_argument(
+        "--gbd-chunksize",
+        type=int,
+        default=None,
+        metavar="ROWS",
+        help="Stream the GBD YLL file in chunks of ROWS rows (bounded memory for large exports)",
+    )
+
+    parser.add_argument(
+        "--csv-engine",
+        choices=["c", "pyarrow"],
+        default="c",
+        help="CSV parser for schema-driven reads (pyarrow requires the pyarrow package)",
+    )
+
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Load up to N datasets concurrently and run bootstrap/randomization batches "
+        "in N processes (default: 1)",
+    )
+
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Fit independent models in --jobs worker processes over shared-memory panels "
+        "(log and summary stay in model order)",
+    )
+
+    parser.add_argument(
+        "--no-plots",
+        action="store_true",
+        help="Skip the residual / Q-Q / window plots (fits and CSVs are unchanged)",
+    )
+
+    parser.add_argument(
+        "--plot-preview",
+        action="store_true",
+        help=f"Render plots at preview resolution ({PREVIEW_DPI} dpi instead of {FULL_DPI})",
+    )
+
+    parser.add_argument(
+        "--float32",
+        action="store_true",
+        help="Store raw dataset values as float32 (estimation still runs in float64)",
+    )
+
+    parser.add_argument(
+        "--jackknife",
+        action="store_true",
+        help="Write leave-one-country/year-out influence tables and flagged-group reports "
+        "(B, D, G, J)",
+    )
+
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=2000,
+        metavar="REPS",
+        help="Country-cluster bootstrap replicates for the Model J CIs (default: 2000, 0 = off)",
+    )
+
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=42,
+        help="Seed for bootstrap and randomization draws (default: 42)",
+    )
+
+    parser.add_argument(
+        "--randomization",
+        type=int,
+        default=0,
+        metavar="DRAWS",
+        help="Randomization-inference and year-placebo draws for Models C, G, E "
+        "(p-values in coefficient CSVs; default: 0 = off)",
+    )
+
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=0,
+        metavar="YEARS",
+        help="Also estimate Model G over YEARS-wide year windows "
+        "(coefficient-over-time CSV + plot; default: 0 = off)",
+    )
+
+    parser.add_argument(
+        "--window-mode",
+        choices=["rolling", "expanding"],
+        default="rolling",
+        help="Slide a fixed-width window or expand from the first year (default: rolling)",
+    )
+
+    parser.add_argument(
+        "--max-lag",
+        type=int,
+        default=0,
+        metavar="K",
+        help="Also estimate Model E over lags 0..K "
+        "(individual and distributed; one combined gate report)",
+    )
+
+    parser.add_argument(
+        "--tolerances",
+        type=int,
+        nargs="+",
+        default=[],
+        metavar="T",
+        help="Also fit B, D and J on nearest-year matches within ±T years (e.g. 0 1 2); "
+        f"the primary ±{PRIMARY_TOLERANCE} fits always run",
     )
 
     args = parser.parse_args()
+    if args.window and args.window < 2:
+        parser.error("--window must be at least 2 years (two-way FE)")
+    import src.data_loader as data_loader
+    from src.cache import set_cache_enabled
+
+    set_cache_enabled(not args.no_cache)
+    data_loader.CSV_ENGINE = args.csv_engine
 
     # Determine which models to run
     if args.model:
-        models_to_run = [args.model]
+        models_to_run = list(dict.fromkeys(args.model))
     else:
         models_to_run = ["B", "C", "D", "G", "E", "J"]
 
-    try:
-        main(models_to_run)
-    finally:
-        log_print(f"✅ Pipeline finished. Log: {log_path}")
-        sys.stdout = sys_stdout
-        log_file.close()
+    main(
+        models_to_run,
+        gbd_chunksize=args.gbd_chunksize,
+        jobs=args.jobs,
+        float32=args.float32,
+        jackknife=args.jackknife,
+        bootstrap_reps=args.bootstrap,
+        seed=args.seed,
+        randomization_draws=args.randomization,
+        window=args.window,
+        window_mode=args.window_mode,
+        max_lag=args.max_lag,
+        tolerances=args.tolerances,
+        parallel=args.parallel,
+        force=args.force,
+        plots=not args.no_plots,
+        plot_preview=args.plot_preview,
+    )
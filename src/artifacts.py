@@ -0,0 +1,211 @@
+"""
+artifacts.py – Content-Addressed Cache for Model Outputs
+========================================================
+
+Restores a model's outputs instead of refitting it when nothing it depends
+on has changed:
+- Entries are keyed by the content hash of the panels the model consumes,
+  its specification (the options that affect its results), its version and
+  the source code of the pipeline (run.py and src/)
+- An entry holds the files the model wrote to output/ (summaries,
+  coefficient CSVs, estimation panels), its rows for
+  summary_all_models.csv and its log lines, replayed on a hit
+- Plots are rendered after all fits (src/plots.py): the entry keeps the
+  model's plot jobs and gains the PNGs (and their dpi) once rendered, so a
+  hit only re-renders when the plot resolution differs
+- One live entry per model; entries live under .cache/artifacts/
+
+The dataset cache switch (set_cache_enabled / --no-cache) also disables
+this cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import pickle
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.cache import CACHE_DIR, file_digest, is_cache_enabled
+
+ARTIFACT_CACHE_DIR = CACHE_DIR / "artifacts"
+CODE_PATHS = [Path(__file__).parent.parent / "run.py", *sorted(Path(__file__).parent.glob("*.py"))]
+
+# Bump to invalidate every cached artifact (e.g. after a storage format change)
+ARTIFACT_SCHEMA_VERSION = 1
+
+
+# =============================================================================
+# Keys
+# =============================================================================
+def _update_digest(h, value) -> None:
+    if value is None:
+        h.update(b"none;")
+    elif isinstance(value, pd.DataFrame):
+        h.update(f"frame{list(value.columns)}{[str(t) for t in value.dtypes]};".encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(f"array{value.dtype.str}{value.shape};".encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        h.update(b"dict;")
+        for key in sorted(value, key=repr):
+            h.update(repr(key).encode())
+            _update_digest(h, value[key])
+    else:
+        h.update(f"{type(value).__name__}{value!r};".encode())
+
+
+def content_digest(value) -> str:
+    """Hash of panels: DataFrames (values, index, dtypes), arrays, dicts of them, scalars."""
+    h = hashlib.blake2b(digest_size=16)
+    _update_digest(h, value)
+    return h.hexdigest()
+
+
+def code_digest() -> str:
+    """Hash of the pipeline source files (run.py and src/*.py)."""
+    return hashlib.blake2b(
+        "".join(file_digest(p) for p in CODE_PATHS if p.exists()).encode(), digest_size=16
+    ).hexdigest()
+
+
+def artifact_key(name: str, inputs: dict, spec: dict, version: int = 1) -> tuple[str, dict]:
+    """
+    Cache key of a model's outputs.
+
+    Args:
+        name: Model (unit) name
+        inputs: Panels the model consumes (name → panel)
+        spec: Options that affect the model's results
+        version: Fit version; bump to invalidate this model's entries only
+
+    Returns:
+        (key, key_parts) – key_parts is stored with the entry for inspection
+    """
+    key_parts = {
+        "schema": ARTIFACT_SCHEMA_VERSION,
+        "model": name,
+        "version": version,
+        "inputs": {k: content_digest(v) for k, v in sorted(inputs.items())},
+        "spec": {k: repr(v) for k, v in sorted(spec.items())},
+        "code": code_digest(),
+    }
+    key = hashlib.blake2b(
+        json.dumps(key_parts, sort_keys=True).encode(), digest_size=12
+    ).hexdigest()
+    return key, key_parts
+
+
+# =============================================================================
+# Entries
+# =============================================================================
+def snapshot(output_dir: Path, patterns: tuple[str, ...]) -> dict[str, int]:
+    """Modification times (ns) of the files in output_dir matching any pattern."""
+    return {
+        path.name: path.stat().st_mtime_ns
+        for pattern in patterns
+        for path in output_dir.glob(pattern)
+        if path.is_file()
+    }
+
+
+def written_since(before: dict[str, int], output_dir: Path, patterns: tuple[str, ...]) -> list[str]:
+    """Files matching the patterns that are new or modified since `before`."""
+    after = snapshot(output_dir, patterns)
+    return sorted(name for name, mtime in after.items() if before.get(name) != mtime)
+
+
+def load_artifacts(name: str, key: str) -> dict | None:
+    """Entry metadata (messages, rows, files) for a key, or None if absent/incomplete."""
+    if not is_cache_enabled():
+        return None
+    entry = ARTIFACT_CACHE_DIR / f"{name}-{key}"
+    try:
+        meta = json.loads((entry / "meta.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not all((entry / f).is_file() for f in meta["files"]):
+        return None
+    meta["path"] = entry
+    return meta
+
+
+def restore_artifacts(meta: dict, output_dir: Path) -> None:
+    """Copy an entry's files back into output_dir."""
+    output_dir.mkdir(exist_ok=True)
+    for f in meta["files"]:
+        shutil.copy2(meta["path"] / f, output_dir / f)
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def save_artifacts(
+    name: str,
+    key: str,
+    key_parts: dict,
+    output_dir: Path,
+    files: list[str],
+    rows: list[dict],
+    messages: list[tuple[str, str]],
+    plots: list | None = None,
+) -> None:
+    """
+    Store a model's outputs as the live entry for `name` (best-effort).
+
+    Args:
+        files: Names of the files in output_dir the model wrote
+        rows: Its summary_all_models.csv rows
+        messages: Its log lines as (channel, text) pairs
+        plots: Its queued plot jobs (rendered later, see add_plot_artifacts)
+    """
+    if not is_cache_enabled():
+        return
+    entry = ARTIFACT_CACHE_DIR / f"{name}-{key}"
+    try:
+        for stale in ARTIFACT_CACHE_DIR.glob(f"{name}-*"):
+            shutil.rmtree(stale, ignore_errors=True)
+        entry.mkdir(parents=True)
+        for f in files:
+            shutil.copy2(output_dir / f, entry / f)
+        (entry / "plots.pkl").write_bytes(pickle.dumps(plots or []))
+        meta = {**key_parts, "files": files, "rows": rows, "messages": messages, "plot_dpi": None}
+        (entry / "meta.json").write_text(
+            json.dumps(meta, indent=1, default=_json_default), encoding="utf-8"
+        )
+    except Exception:
+        # Caching is best-effort; a failed write must not fail the run
+        shutil.rmtree(entry, ignore_errors=True)
+
+
+def load_plot_jobs(meta: dict) -> list:
+    """Plot jobs stored with an entry (empty if unreadable)."""
+    try:
+        return pickle.loads((meta["path"] / "plots.pkl").read_bytes())
+    except Exception:
+        return []
+
+
+def add_plot_artifacts(name: str, key: str, output_dir: Path, files: list[str], dpi: int) -> None:
+    """Add rendered plot files to an entry and record their resolution (best-effort)."""
+    if not is_cache_enabled():
+        return
+    entry = ARTIFACT_CACHE_DIR / f"{name}-{key}"
+    meta_path = entry / "meta.json"
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        for f in files:
+            shutil.copy2(output_dir / f, entry / f)
+        meta["files"] = sorted(set(meta["files"]) | set(files))
+        meta["plot_dpi"] = dpi
+        meta_path.write_text(json.dumps(meta, indent=1, default=_json_default), encoding="utf-8")
+    except Exception:
+        pass  # Entry replaced or removed meanwhile: the plots are simply re-rendered next time
@@ -13,8 +13,11 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Callable
 
+import numpy as np
 import pandas as pd
 
+from src.panel import PanelCube, as_panel_cube
+
 OUTPUT_DIR = Path(__file__).parent.parent / "output"
 
 
@@ -49,7 +52,7 @@ def audit_panel_balance(
     panel_c_path = OUTPUT_DIR / "panel_c_sectoral.csv"
     if panel_c_path.exists():
         panel_c = pd.read_csv(panel_c_path)
-        obs_per_country = panel_c.groupby("iso3").size()
+        obs_per_country = panel_c.groupby("iso3", observed=True).size()
 
         diagnostics["model_c"] = {
             "n_obs": len(panel_c),
@@ -117,7 +120,7 @@ def audit_panel_balance(
 
 
 def check_model_e_gate(
-    panel_df: pd.DataFrame,
+    panel_df: PanelCube | pd.DataFrame,
     max_sample_loss: float = 0.30,
     min_country_retention: float = 0.67,
     print_fn: Callable = print,
@@ -132,7 +135,7 @@ def check_model_e_gate(
     3. Countries retained ≥ min_country_retention of baseline (default 67%)
 
     Args:
-        panel_df: Panel data with iso3, year, and emissions columns
+        panel_df: PanelCube (or long panel frame with iso3 and year columns)
         max_sample_loss: Maximum acceptable sample loss fraction
         min_country_retention: Minimum acceptable country retention fraction
         print_fn: Print function for logging
@@ -141,35 +144,23 @@ def check_model_e_gate(
     Returns:
         tuple: (gate_passed: bool, diagnostics: dict)
     """
-    df = panel_df.copy()
-
-    # Ensure we have the right structure
-    if "iso3" not in df.columns or "year" not in df.columns:
-        # Try to extract from index
-        if isinstance(df.index, pd.MultiIndex):
-            df = df.reset_index()
+    cube = as_panel_cube(panel_df)
 
     # -------------------------------------------------------------------------
     # Baseline panel statistics
     # -------------------------------------------------------------------------
-    n_baseline = len(df)
-    countries_baseline = df["iso3"].nunique()
-    obs_per_country = df.groupby("iso3").size()
-    median_obs_baseline = float(obs_per_country.median())
+    baseline = cube.balance()
+    n_baseline = baseline["n_obs"]
+    countries_baseline = baseline["n_entities"]
+    median_obs_baseline = baseline["median_obs_per_entity"]
 
     # -------------------------------------------------------------------------
-    # Simulate lagging (drop first observation per country)
+    # Simulate lagging (keep rows whose calendar year t−1 is observed)
     # -------------------------------------------------------------------------
-    df = df.sort_values(["iso3", "year"])
-    df["_lag_valid"] = df.groupby("iso3").cumcount() > 0  # First obs per country = False
-
-    df_after_lag = df[df["_lag_valid"]].copy()
-    n_after_lag = len(df_after_lag)
-    countries_after_lag = df_after_lag["iso3"].nunique()
-    obs_per_country_after = df_after_lag.groupby("iso3").size()
-    median_obs_after = (
-        float(obs_per_country_after.median()) if len(obs_per_country_after) > 0 else 0
-    )
+    after_lag = cube.balance(cube.lag_mask(1))
+    n_after_lag = after_lag["n_obs"]
+    countries_after_lag = after_lag["n_entities"]
+    median_obs_after = after_lag["median_obs_per_entity"]
 
     # -------------------------------------------------------------------------
     # Compute gate metrics
@@ -259,6 +250,126 @@ def check_model_e_gate(
     return gate_passed, diagnostics
 
 
+def check_lag_grid_gate(
+    panel_df: PanelCube | pd.DataFrame,
+    max_lag: int,
+    max_sample_loss: float = 0.30,
+    min_country_retention: float = 0.67,
+    print_fn: Callable = print,
+    save_to_file: bool = True,
+) -> tuple[list[dict], dict]:
+    """
+    Gate criteria of check_model_e_gate for every lag specification 0..max_lag.
+
+    Specifications:
+    - individual lags "lag{k}": x_{t-k} alone (k = 0..max_lag)
+    - distributed lags "dl0-{k}": x_t, …, x_{t-k} jointly (k = 1..max_lag)
+
+    All specification samples come from one stack of lag masks
+    (PanelCube.lag_masks), so the metrics of every lag order are computed in
+    one vectorized pass over the entity × year grid.
+
+    Returns:
+        tuple: (specs: list of dicts with name, structure, lags, passed, reason
+                and sample metrics; diagnostics dict for the combined report)
+    """
+    cube = as_panel_cube(panel_df)
+    baseline = cube.balance()
+
+    specs = [
+        {"name": f"lag{k}", "structure": "individual", "lags": [k]} for k in range(max_lag + 1)
+    ]
+    specs += [
+        {"name": f"dl0-{k}", "structure": "distributed", "lags": list(range(k + 1))}
+        for k in range(1, max_lag + 1)
+    ]
+    masks = np.concatenate([cube.lag_masks(max_lag), cube.lag_masks(max_lag, cumulative=True)[1:]])
+
+    # Per-spec metrics from the (specs × entities × years) mask stack
+    per_entity = masks.sum(axis=2)
+    n_obs = per_entity.sum(axis=1)
+    n_countries = (per_entity > 0).sum(axis=1)
+    with np.errstate(all="ignore"):
+        median_obs = np.nan_to_num(
+            np.nanmedian(np.where(per_entity > 0, per_entity, np.nan), axis=1)
+        )
+    n_baseline, countries_baseline = baseline["n_obs"], baseline["n_entities"]
+    sample_loss = (n_baseline - n_obs) / n_baseline if n_baseline > 0 else np.ones(len(specs))
+    retention = n_countries / countries_baseline if countries_baseline > 0 else np.zeros(len(specs))
+
+    gate_1_pass = baseline["median_obs_per_entity"] >= 3
+    for i, spec in enumerate(specs):
+        gate_2_pass = bool(sample_loss[i] <= max_sample_loss)
+        gate_3_pass = bool(retention[i] >= min_country_retention)
+        spec.update(
+            {
+                "mask": masks[i],
+                "n_obs": int(n_obs[i]),
+                "n_countries": int(n_countries[i]),
+                "median_obs_per_country": float(median_obs[i]),
+                "sample_loss": float(sample_loss[i]),
+                "country_retention": float(retention[i]),
+                "passed": gate_1_pass and gate_2_pass and gate_3_pass,
+                "reason": None
+                if gate_1_pass and gate_2_pass and gate_3_pass
+                else _get_failure_reason(gate_1_pass, gate_2_pass, gate_3_pass),
+            }
+        )
+
+    diagnostics = {
+        "baseline": {
+            "n_obs": n_baseline,
+            "n_countries": countries_baseline,
+            "median_obs_per_country": baseline["median_obs_per_entity"],
+        },
+        "max_lag": max_lag,
+        "max_sample_loss": max_sample_loss,
+        "min_country_retention": min_country_retention,
+        "specs": [{key: value for key, value in spec.items() if key != "mask"} for spec in specs],
+    }
+
+    lines = _lag_grid_lines(diagnostics)
+    print_fn("\n" + "=" * 60)
+    for line in lines:
+        print_fn(line)
+    print_fn("=" * 60)
+
+    if save_to_file:
+        OUTPUT_DIR.mkdir(exist_ok=True)
+        gate_file = OUTPUT_DIR / "ModelE_lag_grid_gate.txt"
+        gate_file.write_text("\n".join(lines), encoding="utf-8")
+        print_fn(f"💾 Saved lag-grid gate diagnostics to {gate_file}")
+
+    return specs, diagnostics
+
+
+def _lag_grid_lines(diagnostics: dict) -> list[str]:
+    """Combined gate report for all lag specifications."""
+    base = diagnostics["baseline"]
+    lines = [
+        f"Model E Lag-Grid Gate Diagnostics (lags 0..{diagnostics['max_lag']})",
+        "=" * 40,
+        "",
+        "Source panel: output/panel_c_sectoral.csv",
+        "",
+        f"Baseline panel: N = {base['n_obs']}, {base['n_countries']} countries, "
+        f"median obs per country {base['median_obs_per_country']:.0f}",
+        f"Criteria: median obs ≥ 3, sample loss ≤ {diagnostics['max_sample_loss']:.0%}, "
+        f"countries retained ≥ {diagnostics['min_country_retention']:.0%}",
+        "",
+        f"{'Spec':10} {'Structure':12} {'N':>5} {'Countries':>9} {'Median':>6} "
+        f"{'Loss':>7} {'Retained':>8}  Decision",
+    ]
+    for spec in diagnostics["specs"]:
+        decision = "ESTIMATED" if spec["passed"] else f"SKIPPED ({spec['reason']})"
+        lines.append(
+            f"{spec['name']:10} {spec['structure']:12} {spec['n_obs']:>5} {spec['n_countries']:>9} "
+            f"{spec['median_obs_per_country']:>6.0f} {spec['sample_loss']:>7.1%} "
+            f"{spec['country_retention']:>8.1%}  {decision}"
+        )
+    return lines
+
+
 def _get_failure_reason(gate_1: bool, gate_2: bool, gate_3: bool) -> str:
     """Generate human-readable failure reason."""
     reasons = []
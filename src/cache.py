@@ -0,0 +1,155 @@
+"""
+cache.py – Content-Hashed Columnar Cache for Parsed Datasets
+=============================================================
+
+Stores the frames returned by the data loaders so unchanged raw files are
+not re-parsed on every run.
+
+- Entries are keyed by the content hash of every source file, the loader
+  name and version, and the loader's keyword arguments
+- Frames are stored as Parquet when pyarrow is available, pickle otherwise
+- Messages printed by the loader on a miss are replayed on a hit, so the
+  run log reads the same warm or cold
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+CACHE_DIR = Path(__file__).parent.parent / ".cache"
+DATASET_CACHE_DIR = CACHE_DIR / "datasets"
+
+# Bump to invalidate every cached dataset (e.g. after a storage format change)
+CACHE_SCHEMA_VERSION = 1
+
+_enabled = True
+_digests: dict[tuple[str, int, int], str] = {}
+
+
+def set_cache_enabled(enabled: bool) -> None:
+    """Globally enable or disable the dataset cache (e.g. for --no-cache)."""
+    global _enabled
+    _enabled = enabled
+
+
+def is_cache_enabled() -> bool:
+    return _enabled
+
+
+def file_digest(path: Path) -> str:
+    """Content hash of a file, memoized per (path, mtime, size) within a process."""
+    stat = path.stat()
+    memo_key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+    if memo_key not in _digests:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        _digests[memo_key] = h.hexdigest()
+    return _digests[memo_key]
+
+
+def _storage_suffix() -> str:
+    try:
+        import pyarrow  # noqa: F401
+
+        return ".parquet"
+    except ImportError:
+        return ".pkl"
+
+
+def _write_frame(df: pd.DataFrame, path: Path) -> None:
+    if path.suffix == ".parquet":
+        df.to_parquet(path)
+    else:
+        df.to_pickle(path)
+
+
+def _read_frame(path: Path) -> pd.DataFrame:
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def cached_loader(name: str, sources: list[Path], version: int = 1):
+    """
+    Decorator: serve a loader's result from the dataset cache when possible.
+
+    The wrapped loader must accept print_fn as a keyword argument. Other
+    keyword arguments are part of the cache key. The returned frame carries
+    attrs["cache_hit"] (bool) and attrs["load_seconds"] (float).
+
+    Args:
+        name: Cache entry name (one live entry per name)
+        sources: Raw files the loader reads
+        version: Loader version; bump whenever the parsing logic changes
+    """
+
+    def decorator(fn: Callable[..., pd.DataFrame]):
+        @functools.wraps(fn)
+        def wrapper(*args, print_fn: Callable = print, **kwargs) -> pd.DataFrame:
+            t0 = time.perf_counter()
+
+            if not _enabled or args or not all(p.exists() for p in sources):
+                df = fn(*args, print_fn=print_fn, **kwargs)
+                df.attrs.update(cache_hit=False, load_seconds=time.perf_counter() - t0)
+                return df
+
+            key_parts = {
+                "schema": CACHE_SCHEMA_VERSION,
+                "loader": name,
+                "version": version,
+                "sources": {p.name: file_digest(p) for p in sources},
+                "kwargs": {k: repr(v) for k, v in sorted(kwargs.items())},
+            }
+            key = hashlib.blake2b(
+                json.dumps(key_parts, sort_keys=True).encode(), digest_size=12
+            ).hexdigest()
+            suffix = _storage_suffix()
+            data_path = DATASET_CACHE_DIR / f"{name}-{key}{suffix}"
+            meta_path = DATASET_CACHE_DIR / f"{name}-{key}.json"
+
+            if data_path.exists() and meta_path.exists():
+                try:
+                    df = _read_frame(data_path)
+                    for line in json.loads(meta_path.read_text(encoding="utf-8"))["messages"]:
+                        print_fn(line)
+                    df.attrs.update(cache_hit=True, load_seconds=time.perf_counter() - t0)
+                    return df
+                except Exception:
+                    pass  # Corrupt or unreadable entry: fall through and rebuild
+
+            messages: list[str] = []
+
+            def capture(*a, **kw):
+                messages.append(" ".join(str(x) for x in a))
+                print_fn(*a, **kw)
+
+            df = fn(print_fn=capture, **kwargs)
+
+            try:
+                DATASET_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                for stale in DATASET_CACHE_DIR.glob(f"{name}-*"):
+                    stale.unlink()
+                _write_frame(df, data_path)
+                meta_path.write_text(
+                    json.dumps({**key_parts, "messages": messages}, indent=1), encoding="utf-8"
+                )
+            except Exception:
+                # Caching is best-effort; a failed write must not fail the load
+                for partial in (data_path, meta_path):
+                    partial.unlink(missing_ok=True)
+
+            df.attrs.update(cache_hit=False, load_seconds=time.perf_counter() - t0)
+            return df
+
+        return wrapper
+
+    return decorator
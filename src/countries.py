@@ -0,0 +1,153 @@
+"""
+countries.py – Country Name → ISO3 Resolution
+==============================================
+
+Resolves the country labels used by WHO, EEA, UNFCCC and GBD to ISO3 codes.
+
+- Each distinct name is resolved once and mapped back to the rows
+- Resolved names are persisted in an on-disk alias table, so warm runs
+  never import the pycountry database
+- UN-style names that pycountry does not know are seeded explicitly
+- Unresolved names are reported in one batch and left as NaN
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from src.cache import CACHE_DIR
+
+ALIAS_TABLE_PATH = CACHE_DIR / "country_aliases.json"
+
+# Bump when _KNOWN_ALIASES changes so persisted tables are rebuilt
+ALIAS_TABLE_VERSION = 1
+
+# UN/WHO/UNFCCC spellings that pycountry.countries.lookup() does not resolve
+_KNOWN_ALIASES = {
+    "bolivia (plurinational state of)": "BOL",
+    "democratic republic of the congo": "COD",
+    "iran (islamic republic of)": "IRN",
+    "micronesia (federated states of)": "FSM",
+    "republic of korea": "KOR",
+    "democratic people's republic of korea": "PRK",
+    "republic of moldova": "MDA",
+    "turkey": "TUR",
+    "united republic of tanzania": "TZA",
+    "venezuela (bolivarian republic of)": "VEN",
+}
+
+_alias_table: dict[str, str | None] | None = None
+_alias_lock = threading.Lock()  # loaders may run concurrently (run.py --jobs)
+
+
+def _alias_key(name: str) -> str:
+    return name.strip().lower()
+
+
+def _load_alias_table() -> dict[str, str | None]:
+    """Load the persisted alias table (seeded with _KNOWN_ALIASES)."""
+    global _alias_table
+    if _alias_table is not None:
+        return _alias_table
+
+    table: dict[str, str | None] = dict(_KNOWN_ALIASES)
+    if ALIAS_TABLE_PATH.exists():
+        try:
+            stored = json.loads(ALIAS_TABLE_PATH.read_text(encoding="utf-8"))
+            if stored.get("version") == ALIAS_TABLE_VERSION:
+                table.update(stored.get("aliases", {}))
+        except (OSError, ValueError):
+            pass
+
+    _alias_table = table
+    return table
+
+
+def _save_alias_table(table: dict[str, str | None]) -> None:
+    try:
+        ALIAS_TABLE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": ALIAS_TABLE_VERSION, "aliases": dict(sorted(table.items()))}
+        ALIAS_TABLE_PATH.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+    except OSError:
+        # The table is only an accelerator; resolution still works without it
+        pass
+
+
+def _lookup_missing(keys: list[str], table: dict[str, str | None]) -> None:
+    """Resolve names absent from the alias table via pycountry and persist them."""
+    import pycountry
+
+    for key in keys:
+        try:
+            table[key] = pycountry.countries.lookup(key).alpha_3
+        except LookupError:
+            table[key] = None
+    _save_alias_table(table)
+
+
+def lookup_iso3(names: list[str] | np.ndarray) -> np.ndarray:
+    """
+    Resolve distinct country names to ISO3 codes.
+
+    Returns:
+        Object array aligned with names; None where the name is unresolved
+    """
+    keys = [_alias_key(n) if isinstance(n, str) else "" for n in names]
+
+    with _alias_lock:
+        table = _load_alias_table()
+        missing = sorted({k for k in keys if k and k not in table})
+        if missing:
+            _lookup_missing(missing, table)
+        codes = [table.get(k) if k else None for k in keys]
+
+    return np.array(codes, dtype=object)
+
+
+def resolve_iso3(
+    names: pd.Series,
+    iso3: pd.Series | None = None,
+    dataset: str = "",
+    print_fn: Callable = print,
+) -> pd.Series:
+    """
+    Map a column of country names to ISO3 codes.
+
+    Args:
+        names: Country names (one per row, typically heavily repeated)
+        iso3: Optional ISO3 codes shipped with the source; used where valid
+        dataset: Dataset label for the unresolved-name report
+        print_fn: Print function for logging
+
+    Returns:
+        Series of ISO3 codes aligned with names (NaN where unresolved)
+    """
+    codes, uniques = pd.factorize(names)
+    resolved = lookup_iso3(np.asarray(uniques, dtype=object))
+    out = np.where(codes >= 0, resolved[np.maximum(codes, 0)], None).astype(object)
+
+    if iso3 is not None:
+        shipped = iso3.to_numpy(dtype=object)
+        valid = np.array(
+            [isinstance(c, str) and len(c) == 3 and c.isalpha() for c in shipped], dtype=bool
+        )
+        out[valid] = [c.upper() for c in shipped[valid]]
+
+    unresolved_mask = pd.isna(out) & (codes >= 0)
+    if unresolved_mask.any():
+        unresolved = sorted(set(np.asarray(names)[unresolved_mask]))
+        shown = ", ".join(unresolved[:10])
+        if len(unresolved) > 10:
+            shown += f", … (+{len(unresolved) - 10} more)"
+        label = f"{dataset}: " if dataset else ""
+        print_fn(
+            f"  ⚠️ {label}{len(unresolved)} unresolved country names dropped "
+            f"({int(unresolved_mask.sum())} rows): {shown}"
+        )
+
+    return pd.Series(out, index=names.index, name="iso3")
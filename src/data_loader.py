@@ -4,6 +4,7 @@ data_loader.py – Data Loading and Preprocessing Module
 
 Handles loading, cleaning, and harmonizing datasets from:
 - WHO Air Quality (PM2.5 concentrations)
+- EEA national GHG inventory (total emissions)
 - UNFCCC (sectoral GHG emissions)
 - EEA Burden of Disease (DALYs)
 - GBD 2021 (YLLs)
@@ -13,24 +14,71 @@ from __future__ import annotations
 import re
 import numpy as np
 import pandas as pd
-import pycountry
 from pathlib import Path
+from typing import Callable
+
+from src.cache import cached_loader
+from src.countries import lookup_iso3, resolve_iso3
+from src.parsing import parse_interval, parse_numeric
 
 DATA_DIR = Path(__file__).parent.parent / "data"
+WHO_PATH = DATA_DIR / "who_air_quality.csv"
+UNFCCC_PATH = DATA_DIR / "unfccc_totals.csv"
+EEA_BURDEN_PATH = DATA_DIR / "eea_burden_disease.csv"
+GBD_YLL_PATH = DATA_DIR / "health_gbd2021_yll_bothsex_asmr.csv"
+EEA_EMISSIONS_PATH = DATA_DIR / "eea_emissions.csv"
+
+# CSV engine for schema-driven reads: "c" (default) or "pyarrow" (optional dependency)
+CSV_ENGINE = "c"
+
+# Declared read schemas (column → dtype). Only these columns are parsed;
+# filter columns are read as categoricals so filtering compares integer codes.
+# "number" marks measure columns parsed with parsing.parse_numeric (thousands
+# separators, NA tokens, UNFCCC notation keys).
+WHO_SCHEMA = {
+    "ISO3": "object",
+    "WHO Country Name": "object",
+    "Measurement Year": "int64",
+    "PM2.5 (μg/m3)": "number",
+}
+
+UNFCCC_SCHEMA = {
+    "Country": "object",
+    "Year": "int64",
+    "Sector_name": "category",
+    "emissions": "number",
+}
+
+# UNFCCC sector → column for the PM2.5-relevant combustion sectors
+UNFCCC_SECTORS = {
+    "1.A.1 - Energy Industries": "energy_emissions",
+    "1.A.2 - Manufacturing Industries and Construction": "industry_emissions",
+    "1.A.3 - Transport": "transport_emissions",
+}
+UNFCCC_TOTAL_SECTOR = "Total emissions (UNFCCC)"
+
+EEA_BURDEN_SCHEMA = {
+    "Country Or Territory": "object",
+    "Degree Of Urbanisation": "category",
+    "Year": "int64",
+    "Air Pollutant": "category",
+    "Health Indicator": "category",
+    "Value": "number",
+}
+
+# GBD YLL point estimate and uncertainty bounds parsed from "value (lower–upper)"
+YLL_COLUMNS = ("yll_asmr", "yll_lower", "yll_upper")
 
 
 def normalize_country(name: str) -> str | None:
-    """Convert country name to ISO3 code."""
+    """Convert a single country name to ISO3 code (None if unresolved)."""
     if not isinstance(name, str) or not name.strip():
         return None
-    try:
-        return pycountry.countries.lookup(name).alpha_3
-    except Exception:
-        return name.strip()
+    return lookup_iso3([name])[0]
 
 
 def leading_number(x) -> float:
-    """Extract first numeric token from mixed strings."""
+    """Extract first numeric token from mixed strings (scalar; see parsing.parse_numeric)."""
     if pd.isna(x):
         return np.nan
     if isinstance(x, (int, float, np.number)):
@@ -39,99 +87,188 @@ def leading_number(x) -> float:
     return float(m.group(0)) if m else np.nan
 
 
-def load_who_pm25() -> pd.DataFrame:
+def read_csv_schema(path: Path, schema: dict[str, str], engine: str | None = None) -> pd.DataFrame:
+    """
+    Read only the columns declared in schema, with their declared dtypes.
+
+    Args:
+        path: CSV file
+        schema: Mapping of column name → pandas dtype (or "number")
+        engine: "c" or "pyarrow" (defaults to CSV_ENGINE)
+    """
+    dtype = {col: ("object" if kind == "number" else kind) for col, kind in schema.items()}
+    df = pd.read_csv(path, usecols=list(schema), dtype=dtype, engine=engine or CSV_ENGINE)
+    for col, kind in schema.items():
+        if kind == "number":
+            df[col] = parse_numeric(df[col])
+    return df
+
+
+@cached_loader("who_pm25", [WHO_PATH], version=3)
+def load_who_pm25(print_fn: Callable = print) -> pd.DataFrame:
     """
     Load WHO Air Quality data.
 
+    ISO3 codes shipped in the WHO file take precedence over name resolution.
+
     Returns:
         DataFrame with columns: country, year, pm25, iso3
     """
-    who = pd.read_csv(DATA_DIR / "who_air_quality.csv").rename(
+    who = read_csv_schema(WHO_PATH, WHO_SCHEMA).rename(
         columns={"WHO Country Name": "country", "Measurement Year": "year", "PM2.5 (μg/m3)": "pm25"}
     )
     # Aggregate city-level to country-year means
-    who_cty = who.groupby(["country", "year"], as_index=False)["pm25"].mean()
-    who_cty["iso3"] = who_cty["country"].apply(normalize_country)
+    who_cty = who.groupby(["country", "year"], as_index=False).agg(
+        pm25=("pm25", "mean"), iso3_shipped=("ISO3", "first")
+    )
+    who_cty["iso3"] = resolve_iso3(
+        who_cty["country"], iso3=who_cty.pop("iso3_shipped"), dataset="WHO PM2.5", print_fn=print_fn
+    )
     who_cty = who_cty.dropna(subset=["iso3", "pm25"])
     return who_cty
 
 
-def load_unfccc_sectoral() -> pd.DataFrame:
+@cached_loader("unfccc", [UNFCCC_PATH], version=2)
+def load_unfccc(
+    print_fn: Callable = print, extra_sectors: dict[str, str] | None = None
+) -> pd.DataFrame:
     """
-    Load UNFCCC emissions with sectoral breakdown.
+    Single-pass UNFCCC ingestion: every requested sector in one wide frame.
 
-    Extracts key combustion sectors that are PM2.5-relevant:
-    - 1.A.1 - Energy Industries (power generation)
-    - 1.A.2 - Manufacturing Industries and Construction
-    - 1.A.3 - Transport
+    The file is read once, Sector_name is read as a categorical (factorized),
+    and one grouped reduction over (country, year, sector) feeds all columns.
+    load_unfccc_sectoral() and load_unfccc_totals() are views of this frame.
+
+    Args:
+        print_fn: Print function for logging
+        extra_sectors: Additional {Sector_name: column} pairs beyond
+            UNFCCC_SECTORS (e.g. {"1.A.4 - Other Sectors": "residential_emissions"})
 
     Returns:
-        DataFrame with columns: country, year, iso3,
-                                energy_emissions, industry_emissions, transport_emissions
+        DataFrame with columns: country, year, <sector columns>,
+                                total_emissions_kt_unfccc, iso3
+        (NaN where a country-year has no record for a sector)
     """
-    unfccc = pd.read_csv(DATA_DIR / "unfccc_totals.csv")
-
-    # Filter for key combustion sectors
     sectors = {
-        "1.A.1 - Energy Industries": "energy_emissions",
-        "1.A.2 - Manufacturing Industries and Construction": "industry_emissions",
-        "1.A.3 - Transport": "transport_emissions",
+        **UNFCCC_SECTORS,
+        **(extra_sectors or {}),
+        UNFCCC_TOTAL_SECTOR: "total_emissions_kt_unfccc",
     }
 
-    # Filter and pivot
-    df = unfccc[unfccc["Sector_name"].isin(sectors.keys())].copy()
-    df["sector_var"] = df["Sector_name"].map(sectors)
+    unfccc = read_csv_schema(UNFCCC_PATH, UNFCCC_SCHEMA)
+    unfccc = unfccc[unfccc["Sector_name"].isin(sectors.keys())]
 
-    # Aggregate by country-year-sector
-    agg = df.groupby(["Country", "Year", "sector_var"], as_index=False)["emissions"].sum()
+    # One reduction for all sectors, then spread sectors to columns
+    wide = (
+        unfccc.groupby(["Country", "Year", "Sector_name"], observed=True)["emissions"]
+        .sum()
+        .unstack("Sector_name")
+    )
+    wide.columns = wide.columns.astype(str)
+    wide = wide.reindex(columns=list(sectors.keys())).rename(columns=sectors)
+    wide.columns.name = None
 
-    # Pivot to wide format
-    pivot = agg.pivot_table(
-        index=["Country", "Year"], columns="sector_var", values="emissions", aggfunc="sum"
-    ).reset_index()
+    wide = wide.reset_index().rename(columns={"Country": "country", "Year": "year"})
+    wide["iso3"] = resolve_iso3(wide["country"], dataset="UNFCCC", print_fn=print_fn)
 
-    pivot = pivot.rename(columns={"Country": "country", "Year": "year"})
-    pivot["iso3"] = pivot["country"].apply(normalize_country)
+    return wide.dropna(subset=["iso3"]).reset_index(drop=True)
 
-    # Fill missing sectors with NaN (some countries may not have all sectors)
-    for col in sectors.values():
-        if col not in pivot.columns:
-            pivot[col] = np.nan
 
-    return pivot.dropna(subset=["iso3"])
+def load_unfccc_sectoral(
+    print_fn: Callable = print, extra_sectors: dict[str, str] | None = None
+) -> pd.DataFrame:
+    """
+    Load UNFCCC emissions with sectoral breakdown.
 
+    Extracts key combustion sectors that are PM2.5-relevant:
+    - 1.A.1 - Energy Industries (power generation)
+    - 1.A.2 - Manufacturing Industries and Construction
+    - 1.A.3 - Transport
+    plus any extra_sectors requested (see load_unfccc).
 
-def load_unfccc_totals() -> pd.DataFrame:
+    Returns:
+        DataFrame with columns: country, year,
+                                energy_emissions, industry_emissions, transport_emissions,
+                                [extra sector columns], iso3
+    """
+    wide = load_unfccc(print_fn=print_fn, extra_sectors=extra_sectors)
+    cols = list(UNFCCC_SECTORS.values()) + list((extra_sectors or {}).values())
+
+    # Keep country-years reporting at least one of the requested sectors
+    sectoral = wide.loc[wide[cols].notna().any(axis=1), ["country", "year", *cols, "iso3"]]
+    sectoral.attrs.update(wide.attrs)
+    return sectoral
+
+
+def load_unfccc_totals(print_fn: Callable = print) -> pd.DataFrame:
     """
     Load UNFCCC total emissions (for reference/comparison).
 
     Returns:
-        DataFrame with columns: country, year, iso3, total_emissions_kt_unfccc
+        DataFrame with columns: country, year, total_emissions_kt_unfccc, iso3
     """
-    unfccc = pd.read_csv(DATA_DIR / "unfccc_totals.csv")
+    wide = load_unfccc(print_fn=print_fn)
+    cols = ["country", "year", "total_emissions_kt_unfccc", "iso3"]
 
-    # Filter for total emissions only
-    totals = unfccc[unfccc["Sector_name"] == "Total emissions (UNFCCC)"].copy()
+    totals = wide.loc[wide["total_emissions_kt_unfccc"].notna(), cols]
+    totals.attrs.update(wide.attrs)
+    return totals
 
-    agg = totals.groupby(["Country", "Year"], as_index=False)["emissions"].sum()
-    agg = agg.rename(
-        columns={"Country": "country", "Year": "year", "emissions": "total_emissions_kt_unfccc"}
+
+@cached_loader("eea_emissions", [EEA_EMISSIONS_PATH])
+def load_eea_emissions(print_fn: Callable = print) -> pd.DataFrame:
+    """
+    Load EEA national GHG inventory (Party × year wide table).
+
+    Year columns ("1990" … "2020") and the "Last Inventory Year (YYYY)" column
+    are reshaped to long format; "Base year" and the change column are
+    dropped. Comma-formatted values are parsed in bulk and ISO3 codes are
+    resolved once per party before the reshape.
+
+    Returns:
+        DataFrame with columns: country, year, total_emissions_kt, iso3
+    """
+    header = pd.read_csv(EEA_EMISSIONS_PATH, nrows=0).columns
+    year_of = {}
+    for col in header:
+        m = re.fullmatch(r"(\d{4})|Last Inventory Year \((\d{4})\)", col)
+        if m:
+            year_of[col] = int(m.group(1) or m.group(2))
+
+    schema = {"Party": "object", **{col: "number" for col in year_of}}
+    wide = read_csv_schema(EEA_EMISSIONS_PATH, schema)
+    wide["iso3"] = resolve_iso3(wide["Party"], dataset="EEA Emissions", print_fn=print_fn)
+    wide = wide.dropna(subset=["iso3"])
+
+    # Wide → long with a single reshape of the value matrix (party-major order)
+    values = wide[list(year_of)].to_numpy(dtype="float64")
+    n_parties, n_years = values.shape
+    emissions = pd.DataFrame(
+        {
+            "country": np.repeat(wide["Party"].to_numpy(), n_years),
+            "year": np.tile(np.fromiter(year_of.values(), dtype="int64"), n_parties),
+            "total_emissions_kt": values.ravel(),
+            "iso3": np.repeat(wide["iso3"].to_numpy(), n_years),
+        }
     )
-    agg["iso3"] = agg["country"].apply(normalize_country)
 
-    return agg.dropna(subset=["iso3"])
+    # A year can appear both as a column and as the last inventory year
+    emissions = emissions.dropna(subset=["total_emissions_kt"])
+    emissions = emissions.drop_duplicates(subset=["iso3", "year"], keep="first")
+    return emissions.reset_index(drop=True)
 
 
-def load_eea_burden() -> pd.DataFrame:
+@cached_loader("eea_burden", [EEA_BURDEN_PATH], version=3)
+def load_eea_burden(print_fn: Callable = print) -> pd.DataFrame:
     """
     Load EEA Burden of Disease data (DALYs attributable to PM2.5).
 
     Returns:
         DataFrame with columns: country, year, daly, iso3
     """
-    burden = pd.read_csv(DATA_DIR / "eea_burden_disease.csv")
+    burden = read_csv_schema(EEA_BURDEN_PATH, EEA_BURDEN_SCHEMA)
 
-    # Filter for relevant records
+    # Filter for relevant records (categorical comparisons)
     burden = burden[
         (burden["Degree Of Urbanisation"] == "All Areas (incl.unclassified)")
         & (burden["Air Pollutant"] == "PM2.5")
@@ -144,33 +281,273 @@ def load_eea_burden() -> pd.DataFrame:
         .sum()
         .rename(columns={"Country Or Territory": "country", "Year": "year", "Value": "daly"})
     )
-    burden_cty["iso3"] = burden_cty["country"].apply(normalize_country)
+    burden_cty["iso3"] = resolve_iso3(
+        burden_cty["country"], dataset="EEA Burden", print_fn=print_fn
+    )
 
     return burden_cty.dropna(subset=["iso3", "daly"])
 
 
-def load_gbd_yll() -> pd.DataFrame:
+@cached_loader("gbd_yll", [GBD_YLL_PATH], version=3)
+def load_gbd_yll(print_fn: Callable = print, chunksize: int | None = None) -> pd.DataFrame:
     """
     Load GBD 2021 Years of Life Lost (YLL) data.
 
+    Args:
+        print_fn: Print function for logging
+        chunksize: If set, stream the file in chunks of this many rows and keep
+            only the first record per country-year (see _stream_gbd_yll).
+            Peak memory is then bounded by the chunk size instead of the file size.
+
     Returns:
-        DataFrame with columns: country, year, yll_asmr, iso3
+        DataFrame with columns: country, year, yll_asmr, yll_lower, yll_upper, iso3
+        (bounds of "value (lower–upper)" entries; NaN where the file gives no interval)
     """
-    gbd = pd.read_csv(DATA_DIR / "health_gbd2021_yll_bothsex_asmr.csv").rename(
-        columns={"location_name": "country"}
-    )
+    if chunksize is not None:
+        gbd_long = _stream_gbd_yll(chunksize)
+    else:
+        gbd = pd.read_csv(GBD_YLL_PATH).rename(columns={"location_name": "country"})
+
+        # Find year columns (e.g., "2019", "2010 estimate")
+        year_cols = [c for c in gbd.columns if re.match(r"^\d{4}", c)]
+
+        gbd_long = gbd.melt(
+            id_vars=["country"], value_vars=year_cols, var_name="year_raw", value_name="yll_asmr"
+        )
+        gbd_long["year"] = gbd_long["year_raw"].str.extract(r"(\d{4})").astype(float)
+        gbd_long = _split_yll_interval(gbd_long)
+
+    gbd_long["iso3"] = resolve_iso3(gbd_long["country"], dataset="GBD YLL", print_fn=print_fn)
 
-    # Find year columns (e.g., "2019", "2010 estimate")
-    year_cols = [c for c in gbd.columns if re.match(r"^\d{4}", c)]
+    return gbd_long[["country", "year", *YLL_COLUMNS, "iso3"]].dropna(subset=["iso3", "yll_asmr"])
 
-    gbd_long = gbd.melt(
-        id_vars=["country"], value_vars=year_cols, var_name="year_raw", value_name="yll_asmr"
+
+def _split_yll_interval(long: pd.DataFrame) -> pd.DataFrame:
+    """Parse raw "value (lower–upper)" YLL entries into yll_asmr, yll_lower and yll_upper."""
+    parts = parse_interval(long["yll_asmr"])
+    long["yll_asmr"] = parts["value"]
+    long["yll_lower"] = parts["lower"]
+    long["yll_upper"] = parts["upper"]
+    return long
+
+
+def _stream_gbd_yll(chunksize: int) -> pd.DataFrame:
+    """
+    Stream the GBD YLL file and reduce it to one record per country-year.
+
+    Only location_name and the year columns are read. Each chunk is melted
+    and parsed with vectorized string ops, then folded into a running
+    reduction that keeps the first valid record per (country, year) in the
+    order the in-memory melt would produce (year column, then file row).
+    merge_nearest_years() picks exactly that record from the full long frame,
+    so nearest-year panels are unchanged while memory stays bounded.
+    """
+    header = pd.read_csv(GBD_YLL_PATH, nrows=0).columns
+    year_cols = [c for c in header if re.match(r"^\d{4}", c)]
+    col_years = {c: float(re.match(r"(\d{4})", c).group(1)) for c in year_cols}
+    col_order = {c: i for i, c in enumerate(year_cols)}
+
+    reduced = None
+    row_offset = 0
+    reader = pd.read_csv(
+        GBD_YLL_PATH,
+        usecols=["location_name", *year_cols],
+        dtype={c: str for c in year_cols},
+        chunksize=chunksize,
     )
-    gbd_long["year"] = gbd_long["year_raw"].str.extract(r"(\d{4})").astype(float)
-    gbd_long["yll_asmr"] = gbd_long["yll_asmr"].apply(leading_number)
-    gbd_long["iso3"] = gbd_long["country"].apply(normalize_country)
+    for chunk in reader:
+        chunk = chunk.rename(columns={"location_name": "country"})
+        chunk["row"] = np.arange(row_offset, row_offset + len(chunk))
+        row_offset += len(chunk)
+
+        long = chunk.melt(
+            id_vars=["country", "row"],
+            value_vars=year_cols,
+            var_name="year_raw",
+            value_name="yll_asmr",
+        )
+        long = _split_yll_interval(long).dropna(subset=["yll_asmr"])
+        long["year"] = long["year_raw"].map(col_years)
+        long["col"] = long["year_raw"].map(col_order)
+        long = long.drop(columns="year_raw")
+
+        if reduced is not None:
+            long = pd.concat([reduced, long], ignore_index=True)
+        reduced = long.sort_values(["col", "row"], kind="stable").drop_duplicates(
+            subset=["country", "year"], keep="first"
+        )
+
+    if reduced is None:
+        return pd.DataFrame(columns=["country", "year", *YLL_COLUMNS])
+
+    reduced = reduced.sort_values(["col", "row"], kind="stable").reset_index(drop=True)
+    return reduced[["country", "year", *YLL_COLUMNS]]
+
+
+# Raw measure columns eligible for float32 storage in compact_frames()
+VALUE_COLUMNS = (
+    "pm25",
+    "daly",
+    "yll_asmr",
+    "yll_lower",
+    "yll_upper",
+    "energy_emissions",
+    "industry_emissions",
+    "transport_emissions",
+    "total_emissions_kt",
+    "total_emissions_kt_unfccc",
+)
+
+
+def frame_memory(df: pd.DataFrame, categories: bool = True) -> int:
+    """
+    Deep memory usage of a frame in bytes (object strings included).
+
+    With categories=False, categorical columns count only their codes; the
+    category sets shared across frames (compact_frames) are then reported
+    once via category_memory instead of being charged to every frame.
+    """
+    usage = df.memory_usage(deep=True)
+    if not categories:
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                usage[col] = df[col].cat.codes.nbytes
+    return int(usage.sum())
+
+
+def category_memory(frames: dict[str, pd.DataFrame]) -> int:
+    """Deep memory of the distinct category sets used by the frames' categorical columns."""
+    seen = {}
+    for df in frames.values():
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                categories = df[col].cat.categories
+                seen[id(categories)] = categories
+    return int(sum(categories.memory_usage(deep=True) for categories in seen.values()))
+
+
+def compact_frames(
+    frames: dict[str, pd.DataFrame], float32: bool = False
+) -> dict[str, pd.DataFrame]:
+    """
+    Convert loader outputs to compact dtypes that survive merges.
+
+    - country / iso3 → categoricals sharing one category set across all
+      frames, so joins on them keep the categorical dtype
+    - year → smallest integer type holding the values (int16 for calendar years)
+    - raw measure columns (VALUE_COLUMNS) → float32 if float32=True
+
+    Args:
+        frames: Mapping of dataset label → loader output
+        float32: Store raw values as float32 (see widen_values for panel use)
 
-    return gbd_long[["country", "year", "yll_asmr", "iso3"]].dropna(subset=["iso3", "yll_asmr"])
+    Returns:
+        Mapping with the same keys and compacted frames
+    """
+    shared = {}
+    for col in ("country", "iso3"):
+        values = [f[col].dropna().unique() for f in frames.values() if col in f.columns]
+        if values:
+            categories = pd.Index(np.concatenate(values)).astype(str).unique().sort_values()
+            shared[col] = pd.CategoricalDtype(categories)
+
+    compacted = {}
+    for name, df in frames.items():
+        dtypes = {col: dtype for col, dtype in shared.items() if col in df.columns}
+        if "year" in df.columns:
+            year = df["year"]
+            if year.notna().all() and (year % 1 == 0).all():
+                dtypes["year"] = pd.to_numeric(year.astype("int64"), downcast="integer").dtype
+        if float32:
+            dtypes.update({col: "float32" for col in VALUE_COLUMNS if col in df.columns})
+
+        out = df.astype(dtypes)
+        out.attrs = dict(df.attrs)
+        compacted[name] = out
+
+    return compacted
+
+
+def widen_values(df: pd.DataFrame) -> pd.DataFrame:
+    """Upcast float32 raw measure columns back to float64 before transforms/estimation."""
+    narrow = {
+        col: "float64" for col in VALUE_COLUMNS if col in df.columns and df[col].dtype == "float32"
+    }
+    return df.astype(narrow) if narrow else df
+
+
+def _nearest_year_positions(
+    left_keys: np.ndarray,
+    left_years: np.ndarray,
+    right_keys: np.ndarray,
+    right_years: np.ndarray,
+    tolerance: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Locate the closest right-hand year for every left-hand row.
+
+    Keys are factorized jointly and every (key, year) pair of the right frame is
+    reduced to its first row position, so duplicate years resolve to the row
+    that appears first in df_right. Candidates are the neighbours on either side
+    of a binary search in the sorted (key, year) index; the smaller year gap
+    wins and equal gaps fall back to the earlier right-hand row.
+
+    Returns:
+        tuple: (right row position or -1 when unmatched, absolute year gap)
+    """
+    codes, _ = pd.factorize(np.concatenate([right_keys, left_keys]))
+    right_codes = codes[: len(right_keys)]
+    left_codes = codes[len(right_keys):]
+
+    right_years = right_years.astype(float)
+    left_years = left_years.astype(float)
+
+    # Sort right rows by (key, year, original position); drop unusable rows
+    valid = (right_codes >= 0) & ~np.isnan(right_years)
+    right_pos = np.flatnonzero(valid)
+    order = np.lexsort((right_pos, right_years[valid], right_codes[valid]))
+    right_pos = right_pos[order]
+    sorted_codes = right_codes[right_pos]
+    sorted_years = right_years[right_pos]
+
+    # Keep the first row for each (key, year) pair
+    first = np.ones(len(right_pos), dtype=bool)
+    first[1:] = (sorted_codes[1:] != sorted_codes[:-1]) | (sorted_years[1:] != sorted_years[:-1])
+    right_pos = right_pos[first]
+    sorted_codes = sorted_codes[first]
+    sorted_years = sorted_years[first]
+
+    positions = np.full(len(left_keys), -1, dtype=np.int64)
+    gaps = np.full(len(left_keys), np.nan)
+    if len(right_pos) == 0 or len(left_keys) == 0:
+        return positions, gaps
+
+    # Composite (key, year) coordinate so one searchsorted covers every key
+    all_years = np.concatenate([sorted_years, left_years[~np.isnan(left_years)]])
+    year_min = all_years.min()
+    stride = all_years.max() - year_min + 2 * abs(tolerance) + 2
+    right_coord = sorted_codes * stride + (sorted_years - year_min)
+    left_coord = left_codes * stride + (left_years - year_min)
+
+    hi = np.searchsorted(right_coord, left_coord, side="left")
+    lo = hi - 1
+
+    best_pos = positions
+    best_gap = gaps
+    for cand in (lo, hi):
+        in_range = (cand >= 0) & (cand < len(right_pos))
+        cand = np.clip(cand, 0, len(right_pos) - 1)
+        gap = np.abs(sorted_years[cand] - left_years)
+        ok = in_range & (sorted_codes[cand] == left_codes) & (left_codes >= 0) & (gap <= tolerance)
+        better = ok & (
+            (best_pos < 0)
+            | (gap < best_gap)
+            | ((gap == best_gap) & (right_pos[cand] < best_pos))
+        )
+        best_pos = np.where(better, right_pos[cand], best_pos)
+        best_gap = np.where(better, gap, best_gap)
+
+    return best_pos, best_gap
 
 
 def merge_nearest_years(
@@ -185,17 +562,69 @@ def merge_nearest_years(
     Nearest-year join with ±tolerance window.
 
     For each row in df_left, finds the closest matching year in df_right
-    within the tolerance window.
-    """
-    merged = []
-    for _, row in df_left.iterrows():
-        subset = df_right[df_right[on_key] == row[on_key]]
-        if subset.empty:
-            continue
-        subset = subset.assign(diff=(subset[right_year] - row[left_year]).abs())
-        subset = subset[subset["diff"] <= tolerance]
-        if len(subset):
-            best = subset.sort_values("diff").iloc[0].to_dict()
-            merged.append({**row.to_dict(), **best})
-
-    return pd.DataFrame(merged)
+    within the tolerance window. Right-hand columns overwrite left-hand
+    columns of the same name and the absolute gap is stored in a "diff" column.
+
+    Tie-break (deliberate behaviour change): equal year gaps resolve to the
+    row that appears first in df_right. The former row-wise join sorted the
+    candidates with numpy's default quicksort, which is not stable, so ties
+    were broken arbitrarily; panels (e.g. Model D) can differ from that
+    version only on such ties.
+
+    Runs in O((n + m) log m) via a sorted per-key year index instead of
+    filtering df_right once per left row.
+    """
+    right_pos, gaps = _nearest_year_positions(
+        df_left[on_key].to_numpy(),
+        df_left[left_year].to_numpy(),
+        df_right[on_key].to_numpy(),
+        df_right[right_year].to_numpy(),
+        tolerance,
+    )
+
+    matched = right_pos >= 0
+    if not matched.any():
+        return pd.DataFrame()
+
+    left = df_left.iloc[np.flatnonzero(matched)].reset_index(drop=True)
+    right = df_right.iloc[right_pos[matched]].reset_index(drop=True)
+
+    merged = left.copy()
+    for col in right.columns:
+        merged[col] = right[col]
+    # Gap has the dtype of the year difference (int years stay int)
+    diff = (right[right_year] - left[left_year]).abs()
+    merged["diff"] = diff
+
+    return merged
+
+
+def merge_nearest_years_multi(
+    df_left: pd.DataFrame,
+    df_right: pd.DataFrame,
+    on_key: str,
+    left_year: str,
+    right_year: str,
+    tolerances: list[int],
+) -> dict[int, pd.DataFrame]:
+    """
+    Nearest-year join for several ±tolerance windows from one sorted index.
+
+    A row's nearest right-hand year does not depend on the window, so matches
+    are located once at the widest tolerance and each tolerance keeps the rows
+    whose "diff" gap fits inside it. Every frame equals merge_nearest_years()
+    with that tolerance.
+
+    Returns:
+        dict: tolerance → merged frame (empty DataFrame when nothing matched)
+    """
+    merged = merge_nearest_years(
+        df_left, df_right, on_key, left_year, right_year, tolerance=max(tolerances)
+    )
+    out = {}
+    for tolerance in sorted(set(tolerances)):
+        subset = (
+            merged[merged["diff"] <= tolerance].reset_index(drop=True) if len(merged) else merged
+        )
+        out[tolerance] = subset if len(subset) else pd.DataFrame()
+    return out
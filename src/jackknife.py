@@ -0,0 +1,236 @@
+"""
+jackknife.py – Leave-One-Country / Leave-One-Year-Out Influence
+================================================================
+
+Computes every leave-one-group-out estimate from the full-sample fit by
+rank-k downdates instead of refitting once per group:
+
+    θ₍₋g₎ = θ − (W'W)⁻¹ W_g' (I − H_gg)⁻¹ e_g,    H_gg = W_g (W'W)⁻¹ W_g'
+
+where W_g, e_g are the rows and residuals of group g (k = rows in the group),
+or equivalently by solving the downdated normal equations (W'W − W_g'W_g)
+when the group has more rows than W has columns. Groups whose removal leaves
+a parameter unidentified (e.g. a country's only year) use a pseudo-inverse.
+
+Two-way FE models are handled by absorbing the effect that is NOT being
+left out: leave-one-country-out works on country-demeaned data with year
+dummies, leave-one-year-out on year-demeaned data with country dummies, so
+dropping a group is a plain row downdate in both cases.
+
+Outputs per model: {name}_jackknife.csv (influence table) and
+{name}_jackknife_report.txt (flagged countries and years).
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from scipy.linalg import cho_solve
+
+OUTPUT_DIR = Path(__file__).parent.parent / "output"
+
+GROUP_TYPES = {"country": "iso3", "year": "year"}
+
+
+def _solve_pd(M: np.ndarray, rhs: np.ndarray) -> np.ndarray | None:
+    """Solve M z = rhs for symmetric positive definite M; None if M is (near) singular."""
+    try:
+        L = np.linalg.cholesky(M)
+    except np.linalg.LinAlgError:
+        return None
+    if np.diag(L).min() ** 2 < 1e-10 * np.diag(M).max():
+        return None
+    return cho_solve((L, True), rhs)
+
+
+def _leave_one_group_out(
+    W: np.ndarray, y: np.ndarray, labels: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Leave-one-group-out coefficients by rank-k downdates of the full fit.
+
+    Small groups (k < columns) use the Woodbury form on the k × k matrix
+    I − H_gg; large groups solve the downdated p × p normal equations
+    (W'W − W_g'W_g) θ = W'y − W_g'y_g. Either way no group is refit from rows.
+
+    Returns:
+        (group labels, rows per group, coefficients (groups × columns of W))
+    """
+    A = W.T @ W
+    b = W.T @ y
+    A_inv = np.linalg.pinv(A)
+    theta = A_inv @ b
+    resid = y - W @ theta
+
+    groups, codes = np.unique(labels, return_inverse=True)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(groups) + 1))
+
+    thetas = np.empty((len(groups), W.shape[1]))
+    for g in range(len(groups)):
+        rows = order[bounds[g]:bounds[g + 1]]
+        W_g = W[rows]
+        step = None
+        if len(rows) < W.shape[1]:
+            AW = A_inv @ W_g.T
+            u = _solve_pd(np.eye(len(rows)) - W_g @ AW, resid[rows])
+            step = None if u is None else theta - AW @ u
+        if step is None:
+            A_g, b_g = A - W_g.T @ W_g, b - W_g.T @ y[rows]
+            step = _solve_pd(A_g, b_g)
+            if step is None:
+                # Dropping the group leaves an effect unidentified (e.g. a country's only year)
+                step = np.linalg.pinv(A_g) @ b_g
+        thetas[g] = step
+
+    return groups, np.diff(bounds), thetas
+
+
+def _dummies_demeaned(target: np.ndarray, within: np.ndarray) -> np.ndarray:
+    """One-hot columns of `target` (last level dropped), demeaned within `within` groups."""
+    levels, t_codes = np.unique(target, return_inverse=True)
+    D = np.zeros((len(target), len(levels)))
+    D[np.arange(len(target)), t_codes] = 1.0
+    return _demean(D, within)[:, :-1]
+
+
+def _demean(values: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    _, codes = np.unique(groups, return_inverse=True)
+    counts = np.bincount(codes)
+    sums = np.zeros((len(counts),) + values.shape[1:])
+    np.add.at(sums, codes, values)
+    return values - (sums / counts.reshape((-1,) + (1,) * (values.ndim - 1)))[codes]
+
+
+def jackknife_ols(df: pd.DataFrame, y: str, x: list[str]) -> pd.DataFrame:
+    """
+    Leave-one-country-out and leave-one-year-out coefficients for OLS with a
+    constant (fit_ols / Model J), one row per dropped group. Group types with
+    fewer than two groups (e.g. a single-year cross-section) are skipped.
+
+    Args:
+        df: Estimation sample with iso3, year, y and x columns
+    """
+    W = np.column_stack([np.ones(len(df)), df[x].to_numpy(dtype=np.float64)])
+    yv = df[y].to_numpy(dtype=np.float64)
+    frames = []
+    for group_type, col in GROUP_TYPES.items():
+        if col not in df.columns or df[col].nunique() < 2:
+            continue
+        groups, counts, thetas = _leave_one_group_out(W, yv, df[col].astype(str).to_numpy())
+        frames.append(_influence_frame(group_type, groups, counts, thetas[:, 1:], x))
+    return pd.concat(frames, ignore_index=True)
+
+
+def jackknife_two_way(df: pd.DataFrame, y: str, x: list[str]) -> pd.DataFrame:
+    """
+    Leave-one-country-out and leave-one-year-out coefficients for a two-way
+    (country + year) FE regression without constant (Models C, G, E).
+
+    Args:
+        df: Estimation sample with an (iso3, year) MultiIndex or columns
+    """
+    if isinstance(df.index, pd.MultiIndex):
+        df = df.reset_index()
+    entity = df["iso3"].astype(str).to_numpy()
+    year = df["year"].to_numpy()
+    data = df[[y] + x].to_numpy(dtype=np.float64)
+
+    frames = []
+    for group_type, labels, absorbed, dummies_of in (
+        ("country", entity, entity, year),
+        ("year", year.astype(str), year, entity),
+    ):
+        if len(np.unique(labels)) < 2:
+            continue
+        demeaned = _demean(data, absorbed)
+        W = np.column_stack([demeaned[:, 1:], _dummies_demeaned(dummies_of, absorbed)])
+        groups, counts, thetas = _leave_one_group_out(W, demeaned[:, 0], labels)
+        frames.append(_influence_frame(group_type, groups, counts, thetas[:, : len(x)], x))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _influence_frame(
+    group_type: str, groups: np.ndarray, counts: np.ndarray, coefs: np.ndarray, x: list[str]
+) -> pd.DataFrame:
+    out = pd.DataFrame({"group_type": group_type, "group": groups.astype(str), "n_dropped": counts})
+    for i, col in enumerate(x):
+        out[f"coef_{col}"] = coefs[:, i]
+    return out
+
+
+def summarize_influence(
+    influence: pd.DataFrame, params: pd.Series, std_errors: pd.Series
+) -> pd.DataFrame:
+    """
+    Add DFBETA (θ₍₋g₎ − θ), DFBETAS (DFBETA / full-sample SE) and flags.
+
+    A group is flagged when any |DFBETAS| exceeds 2/√G (G = groups of that
+    type) or dropping it flips a coefficient's sign.
+    """
+    out = influence.copy()
+    n_groups = out.groupby("group_type")["group"].transform("size")
+    threshold = 2 / np.sqrt(n_groups)
+    flagged = np.zeros(len(out), dtype=bool)
+    for col in params.index:
+        if f"coef_{col}" not in out.columns:
+            continue
+        out[f"dfbeta_{col}"] = out[f"coef_{col}"] - params[col]
+        out[f"dfbetas_{col}"] = out[f"dfbeta_{col}"] / std_errors[col]
+        out[f"sign_flip_{col}"] = np.sign(out[f"coef_{col}"]) != np.sign(params[col])
+        flagged |= (out[f"dfbetas_{col}"].abs() > threshold) | out[f"sign_flip_{col}"]
+    out["threshold"] = threshold
+    out["flagged"] = flagged
+    return out
+
+
+def save_jackknife_outputs(
+    name: str,
+    influence: pd.DataFrame,
+    params: pd.Series,
+    std_errors: pd.Series,
+    print_fn: Callable = print,
+) -> pd.DataFrame:
+    """Write {name}_jackknife.csv and {name}_jackknife_report.txt; returns the influence table."""
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    params = params.drop("const", errors="ignore")
+    table = summarize_influence(influence, params, std_errors)
+    table.to_csv(OUTPUT_DIR / f"{name}_jackknife.csv", index=False)
+
+    lines = [f"Jackknife Influence Report: {name}", "=" * 40, ""]
+    for group_type, part in table.groupby("group_type", sort=False):
+        n_groups = len(part)
+        lines.append(f"Leave-one-{group_type}-out ({n_groups} {group_type} groups, "
+                     f"flag threshold |DFBETAS| > {part['threshold'].iloc[0]:.3f} or sign flip)")
+        for col in params.index:
+            coefs = part[f"coef_{col}"]
+            jack_se = np.sqrt((n_groups - 1) / n_groups * ((coefs - coefs.mean()) ** 2).sum())
+            lines.append(
+                f"  {col}: full {params[col]:.6f} (SE {std_errors[col]:.6f}), "
+                f"range [{coefs.min():.6f}, {coefs.max():.6f}], jackknife SE {jack_se:.6f}"
+            )
+        flagged = part[part["flagged"]]
+        if flagged.empty:
+            lines.append("  Flagged: none")
+        else:
+            lines.append(f"  Flagged ({len(flagged)}):")
+            for _, row in flagged.iterrows():
+                details = ", ".join(
+                    f"{col} {row[f'coef_{col}']:.6f} (DFBETAS {row[f'dfbetas_{col}']:+.2f}"
+                    f"{', sign flip' if row[f'sign_flip_{col}'] else ''})"
+                    for col in params.index
+                )
+                lines.append(f"    - {row['group']} (n={row['n_dropped']}): {details}")
+        lines.append("")
+
+    (OUTPUT_DIR / f"{name}_jackknife_report.txt").write_text("\n".join(lines), encoding="utf-8")
+    n_flagged = int(table["flagged"].sum())
+    print_fn(
+        f"🔍 Jackknife: {(table['group_type'] == 'country').sum()} countries, "
+        f"{(table['group_type'] == 'year').sum()} years, "
+        f"{n_flagged} flagged → {name}_jackknife_report.txt"
+    )
+    return table
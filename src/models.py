@@ -9,29 +9,30 @@ Contains model specifications for the environmental-health analysis:
 - Model G: Total Emissions → PM2.5 (aggregated panel FE)
 - Model E-lite: Lagged Total Emissions → PM2.5 (panel FE, gated)
 - Model J: Quadratic PM2.5 → Health (nonlinear OLS)
+
+statsmodels and linearmodels are imported inside the fits that use them, so
+importing this module (and a fully cached run) does not pay for them.
 """
 
 from __future__ import annotations
 
 from pathlib import Path
 from typing import Callable, Any
-from datetime import datetime
+import time
 
 import numpy as np
 import pandas as pd
-import statsmodels.api as sm
-from linearmodels.panel import PanelOLS
-from scipy.special import logsumexp
-
-OUTPUT_DIR = Path(__file__).parent.parent / "output"
 
+from src.bootstrap import cluster_bootstrap, percentile_ci
+from src.jackknife import jackknife_ols, jackknife_two_way, save_jackknife_outputs
+from src.panel import PanelCube, as_panel_cube
+from src.plots import queue_diagnostic_plots, queue_plot
+from src.randomization import SCHEMES, randomization_pvalues
+from src.rolling import rolling_two_way_fe
+from src.suffstats import SufficientStats
+from src.within import TwoWayWithin
 
-def _log_panel_save(message: str):
-    """Log panel materialization to dedicated log file."""
-    log_path = OUTPUT_DIR / "panel_materialization_log.txt"
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    with open(log_path, "a", encoding="utf-8") as f:
-        f.write(f"[{timestamp}] {message}\n")
+OUTPUT_DIR = Path(__file__).parent.parent / "output"
 
 
 # =============================================================================
@@ -81,6 +82,30 @@ def _as_1d_array(x: Any) -> np.ndarray:
     return arr
 
 
+def _ln_total_emissions(cube: PanelCube) -> tuple[np.ndarray, str]:
+    """
+    ln(Energy + Industry + Transport) as an entity × year array.
+
+    Sums raw emissions when available (preferred); otherwise combines the
+    log-transformed sectors with a numerically stable logsumexp.
+    """
+    from scipy.special import logsumexp
+
+    raw_cols = ["energy_emissions", "industry_emissions", "transport_emissions"]
+    log_cols = ["ln_energy", "ln_industry", "ln_transport"]
+
+    if all(col in cube for col in raw_cols):
+        total = cube["energy_emissions"] + cube["industry_emissions"] + cube["transport_emissions"]
+        return np.log(total), "raw emissions summation"
+    if all(col in cube for col in log_cols):
+        stacked = np.stack([cube[col] for col in log_cols], axis=-1)
+        return logsumexp(stacked, axis=-1), "logsumexp from log-transformed sectors"
+    raise ValueError(
+        "Cannot construct total emissions: missing sector columns. "
+        f"Need {raw_cols} or {log_cols}"
+    )
+
+
 def _safe_getattr(obj: Any, name: str, default: Any = np.nan) -> Any:
     v = getattr(obj, name, default)
     try:
@@ -100,13 +125,15 @@ def save_model_outputs(
     name: str,
     results_list: list[dict],
     is_panel: bool = False,
+    extra_columns: pd.DataFrame | None = None,
 ) -> None:
     """
     Save regression outputs: summary, coefficients, diagnostics.
-    """
-    import matplotlib.pyplot as plt
-    import seaborn as sns
 
+    extra_columns (indexed by parameter name, e.g. randomization p-values)
+    are appended to the coefficients CSV. The residual and Q-Q plots are
+    queued (src/plots.py) and rendered after all fits.
+    """
     OUTPUT_DIR.mkdir(exist_ok=True)
 
     # -------------------------------------------------------------------------
@@ -147,6 +174,9 @@ def save_model_outputs(
             }
         )
 
+    if extra_columns is not None:
+        coef = coef.join(extra_columns)
+
     coef.to_csv(OUTPUT_DIR / f"{name}_coefficients.csv", index=True)
 
     # -------------------------------------------------------------------------
@@ -189,23 +219,8 @@ def save_model_outputs(
         resid = _as_1d_array(model.resid)
         fitted = _as_1d_array(model.fittedvalues)
 
-    # Residuals vs Fitted
-    plt.figure(figsize=(8, 5))
-    sns.scatterplot(x=fitted, y=resid, s=45, alpha=0.7)
-    plt.axhline(0, color="red", linestyle="--", linewidth=1)
-    plt.title(f"{name} – Residuals vs Fitted")
-    plt.xlabel("Fitted Values")
-    plt.ylabel("Residuals")
-    plt.tight_layout()
-    plt.savefig(OUTPUT_DIR / f"{name}_residuals.png", dpi=200)
-    plt.close()
-
-    # Q-Q plot
-    sm.qqplot(resid, line="45", fit=True)
-    plt.title(f"{name} – Normal Q-Q Plot")
-    plt.tight_layout()
-    plt.savefig(OUTPUT_DIR / f"{name}_qqplot.png", dpi=200)
-    plt.close()
+    # Residuals vs Fitted and Q-Q plot
+    queue_diagnostic_plots(name, fitted, resid)
 
 
 # =============================================================================
@@ -219,10 +234,16 @@ def fit_ols(
     name: str,
     results_list: list[dict],
     print_fn: Callable = print,
+    jackknife_groups: pd.DataFrame | None = None,
 ):
     """
     Fit standard OLS regression.
+
+    If jackknife_groups (iso3/year columns aligned with y) is given, also writes
+    the leave-one-country/year-out influence table and flagged-group report.
     """
+    import statsmodels.api as sm
+
     y = _ensure_series(y)
     X = _ensure_dataframe(X)
 
@@ -231,6 +252,12 @@ def fit_ols(
 
     print_fn(model.summary())
     save_model_outputs(model, name, results_list, is_panel=False)
+
+    if jackknife_groups is not None:
+        sample = pd.concat([y, X, jackknife_groups], axis=1).dropna(subset=[y.name, *X.columns])
+        influence = jackknife_ols(sample, y.name, list(X.columns))
+        save_jackknife_outputs(name, influence, model.params, model.bse, print_fn)
+
     return model
 
 
@@ -242,10 +269,18 @@ def fit_panel_fe(
     entity_effects: bool = True,
     time_effects: bool = True,
     print_fn: Callable = print,
+    randomization_draws: int = 0,
+    seed: int = 0,
+    jobs: int = 1,
 ):
     """
     Fit fixed-effects Panel OLS.
+
+    With randomization_draws > 0 (two-way effects only), randomization and
+    placebo p-values are added to the coefficients CSV.
     """
+    from linearmodels.panel import PanelOLS
+
     y = _ensure_series(y)
     X = _ensure_dataframe(X)
 
@@ -263,10 +298,37 @@ def fit_panel_fe(
     )
 
     print_fn(result.summary)
-    save_model_outputs(result, name, results_list, is_panel=True)
+    ri_pvalues = None
+    if entity_effects and time_effects:
+        ri_pvalues = _randomization_inference(y, X, randomization_draws, seed, jobs, print_fn)
+    save_model_outputs(result, name, results_list, is_panel=True, extra_columns=ri_pvalues)
     return result
 
 
+def _randomization_inference(
+    y: pd.Series,
+    X: pd.DataFrame,
+    n_draws: int,
+    seed: int,
+    jobs: int,
+    print_fn: Callable = print,
+) -> pd.DataFrame | None:
+    """Randomization/placebo p-values for a two-way FE fit (None if n_draws is 0)."""
+    if n_draws <= 0:
+        return None
+    t0 = time.perf_counter()
+    pvalues, info = randomization_pvalues(y, X, n_draws, seed=seed, jobs=jobs)
+    print_fn(
+        f"🎲 Randomization inference: {n_draws} draws × {len(SCHEMES)} schemes in "
+        f"{time.perf_counter() - t0:.2f}s (jobs={jobs}, seed={seed}); "
+        f"{info['n_exchangeable']} of {info['n_countries']} countries exchangeable "
+        f"in {info['n_strata']} year patterns"
+    )
+    for param, row in pvalues.iterrows():
+        print_fn("  " + f"{param}: " + ", ".join(f"{col} = {p:.4f}" for col, p in row.items()))
+    return pvalues
+
+
 # =============================================================================
 # NEW MODELS: J, G, E-lite
 # =============================================================================
@@ -278,6 +340,12 @@ def fit_model_j_quadratic(
     name: str,
     results_list: list[dict],
     print_fn: Callable = print,
+    panel_log_fn: Callable | None = None,
+    jackknife: bool = False,
+    bootstrap_reps: int = 0,
+    seed: int = 0,
+    jobs: int = 1,
+    sample_tag: str = "",
 ):
     """
     Model J: Quadratic PM₂.₅ → Health (OLS, centered specification).
@@ -294,6 +362,15 @@ def fit_model_j_quadratic(
         name: Model name for output files
         results_list: List to append summary statistics
         print_fn: Print function for logging
+        panel_log_fn: Records the saved estimation panel in the panel materialization log
+        jackknife: Also write leave-one-country/year-out influence outputs
+            (centering mean held at the full-sample value)
+        bootstrap_reps: Country-cluster bootstrap replicates for β₁, β₂ and the
+            turning point (0 = point estimates only)
+        seed: Bootstrap seed
+        jobs: Worker processes for the bootstrap batches
+        sample_tag: Suffix for the estimation panel file (e.g. '_tol1' for a
+            nearest-year tolerance variant)
 
     Returns:
         tuple: (model, diagnostics_dict)
@@ -302,8 +379,11 @@ def fit_model_j_quadratic(
         - Centers ln(PM₂.₅) to reduce multicollinearity with squared term
         - Interprets β₂ sign: positive = accelerating harm, negative = diminishing returns
         - Turning point only meaningful if concave (β₂ < 0)
-        - Turning point is DESCRIPTIVE only, no confidence interval computed
+        - Turning point is DESCRIPTIVE only unless bootstrap_reps > 0, which adds
+          percentile CIs from a country-cluster bootstrap (src/bootstrap.py)
     """
+    import statsmodels.api as sm
+
     # CRITICAL: Do not mutate input dataframe
     df = df.copy()
 
@@ -327,10 +407,14 @@ def fit_model_j_quadratic(
     # Save estimation panel for Excel replication
     estimation_panel = df[["iso3", "country", outcome, "ln_pm25", "z", "z_sq"]].copy()
     estimation_panel = estimation_panel.reset_index(drop=True)
-    panel_name = f"panel_model_j_{outcome.replace('ln_', '')}_estimation.csv"
+    panel_name = f"panel_model_j_{outcome.replace('ln_', '')}{sample_tag}_estimation.csv"
     estimation_panel.to_csv(OUTPUT_DIR / panel_name, index=False)
     print_fn(f"💾 Saved {panel_name} (N={len(estimation_panel)})")
-    _log_panel_save(f"Model J ({outcome}): {panel_name} (N={len(estimation_panel)}, countries={df['country'].nunique()})")
+    if panel_log_fn is not None:
+        panel_log_fn(
+            f"Model J ({outcome}): {panel_name} "
+            f"(N={len(estimation_panel)}, countries={df['country'].nunique()})"
+        )
 
     Xc = sm.add_constant(X)
     model = sm.OLS(y, Xc, missing="drop").fit()
@@ -370,6 +454,12 @@ def fit_model_j_quadratic(
         "turning_point_note": turning_point_note,
     }
 
+    if bootstrap_reps > 0:
+        diagnostics["bootstrap"] = _bootstrap_model_j(
+            Xc.to_numpy(dtype=np.float64), y.to_numpy(dtype=np.float64), df["iso3"].to_numpy(),
+            pm_mean, bootstrap_reps, seed, jobs, print_fn,
+        )
+
     # Print summary
     print_fn(f"\n{'=' * 60}")
     print_fn(f"MODEL J: Quadratic PM₂.₅ → {outcome.replace('ln_', '').upper()}")
@@ -384,6 +474,14 @@ def fit_model_j_quadratic(
         print_fn(f"Implied turning point: {turning_point_pm25:.1f} μg/m³ (descriptive)")
         print_fn("NOTE: Turning point is a descriptive quantity derived from point estimates")
         print_fn("      and should not be interpreted as a precisely identified threshold.")
+    if "bootstrap" in diagnostics:
+        boot = diagnostics["bootstrap"]
+        print_fn(
+            f"Bootstrap {boot['level']:.0%} CIs ({boot['n_reps']} country-cluster replicates): "
+            f"β₁ [{boot['beta1_ci'][0]:.4f}, {boot['beta1_ci'][1]:.4f}], "
+            f"β₂ [{boot['beta2_ci'][0]:.4f}, {boot['beta2_ci'][1]:.4f}], "
+            f"concave in {boot['share_concave']:.1%} of replicates"
+        )
 
     # Save outputs using standard function
     save_model_outputs(model, name, results_list, is_panel=False)
@@ -391,9 +489,63 @@ def fit_model_j_quadratic(
     # Save additional diagnostics specific to Model J
     _save_model_j_diagnostics(name, diagnostics)
 
+    if jackknife:
+        influence = jackknife_ols(df, outcome, ["z", "z_sq"])
+        concave = influence["coef_z_sq"] < 0
+        influence["turning_point_pm25"] = np.where(
+            concave, np.exp(pm_mean - influence["coef_z"] / (2 * influence["coef_z_sq"])), np.nan
+        )
+        save_jackknife_outputs(name, influence, model.params, model.bse, print_fn)
+
     return model, diagnostics
 
 
+def _bootstrap_model_j(
+    W: np.ndarray,
+    y: np.ndarray,
+    clusters: np.ndarray,
+    pm_mean: float,
+    n_reps: int,
+    seed: int,
+    jobs: int,
+    print_fn: Callable = print,
+    level: float = 0.95,
+) -> dict:
+    """
+    Country-cluster bootstrap of Model J: CIs for β₁, β₂ and the turning point.
+
+    The centering mean stays at the full-sample value; the turning point
+    exp(mean − β₁/(2β₂)) does not depend on it. Turning-point CIs use the
+    replicates that are concave by the same rule as the point estimate.
+    """
+    t0 = time.perf_counter()
+    thetas = cluster_bootstrap(W, y, clusters, n_reps, seed=seed, jobs=jobs)
+    seconds = time.perf_counter() - t0
+    print_fn(
+        f"  ⏱ Bootstrap: {n_reps} country-cluster replicates in {seconds:.2f}s "
+        f"(jobs={jobs}, seed={seed})"
+    )
+
+    beta1, beta2 = thetas[:, 1], thetas[:, 2]
+    concave = (beta2 < 0) & (np.abs(beta2) > 1e-6)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        turning_points = np.exp(pm_mean - beta1[concave] / (2 * beta2[concave]))
+
+    return {
+        "n_reps": n_reps,
+        "seed": seed,
+        "level": level,
+        "n_clusters": len(np.unique(clusters)),
+        "beta1_ci": percentile_ci(beta1, level),
+        "beta2_ci": percentile_ci(beta2, level),
+        "share_concave": float(np.mean(beta2 < 0)),
+        "share_convex": float(np.mean(beta2 > 0)),
+        "n_turning_points": int(concave.sum()),
+        "turning_point_ci": percentile_ci(turning_points, level),
+        "seconds": seconds,
+    }
+
+
 def _save_model_j_diagnostics(name: str, diagnostics: dict) -> None:
     """Save Model J-specific diagnostics (turning point, curvature)."""
     OUTPUT_DIR.mkdir(exist_ok=True)
@@ -420,20 +572,47 @@ def _save_model_j_diagnostics(name: str, diagnostics: dict) -> None:
                 "",
                 "NOTE: The implied turning point is reported as a descriptive quantity",
                 "derived from point estimates and should not be interpreted as a",
-                "precisely identified threshold. No confidence interval is computed.",
+                "precisely identified threshold."
+                + ("" if "bootstrap" in diagnostics else " No confidence interval is computed."),
             ]
         )
     else:
         diag_lines.append("Turning point: Not applicable (curvature is not concave)")
 
+    boot = diagnostics.get("bootstrap")
+    if boot is not None:
+        level = f"{boot['level']:.0%}"
+        tp_low, tp_high = boot["turning_point_ci"]
+        diag_lines.extend(
+            [
+                "",
+                f"Country-cluster bootstrap ({boot['n_reps']} replicates "
+                f"over {boot['n_clusters']} countries, "
+                f"seed {boot['seed']}, percentile {level} CIs):",
+                f"  β₁ (z): [{boot['beta1_ci'][0]:.6f}, {boot['beta1_ci'][1]:.6f}]",
+                f"  β₂ (z²): [{boot['beta2_ci'][0]:.6f}, {boot['beta2_ci'][1]:.6f}]",
+                f"  Curvature: concave in {boot['share_concave']:.1%}, "
+                f"convex in {boot['share_convex']:.1%} of replicates",
+                f"  Turning point: [{tp_low:.1f}, {tp_high:.1f}] μg/m³ "
+                f"(from {boot['n_turning_points']} concave replicates)"
+                if boot["n_turning_points"]
+                else "  Turning point: no concave replicates",
+            ]
+        )
+
     (OUTPUT_DIR / f"{name}_diagnostics.txt").write_text("\n".join(diag_lines), encoding="utf-8")
 
 
 def fit_model_g_total_emissions(
-    panel_df: pd.DataFrame,
+    panel_df: PanelCube | pd.DataFrame,
     name: str,
     results_list: list[dict],
     print_fn: Callable = print,
+    panel_log_fn: Callable | None = None,
+    jackknife: bool = False,
+    randomization_draws: int = 0,
+    seed: int = 0,
+    jobs: int = 1,
 ):
     """
     Model G: Total Emissions → PM₂.₅ (Panel FE).
@@ -446,10 +625,16 @@ def fit_model_g_total_emissions(
         where TotalEmissions = Energy + Industry + Transport
 
     Args:
-        panel_df: Panel data with emissions columns (raw or log-transformed)
+        panel_df: PanelCube (or long panel frame) with emissions columns (raw or log-transformed)
         name: Model name for output files
         results_list: List to append summary statistics
         print_fn: Print function for logging
+        panel_log_fn: Records the saved estimation panel in the panel materialization log
+        jackknife: Also write leave-one-country/year-out influence outputs
+        randomization_draws: Draws per scheme for randomization/placebo
+            p-values in the coefficients CSV (0 = off)
+        seed: Randomization seed
+        jobs: Worker processes for the randomization batches
 
     Returns:
         PanelOLS result object
@@ -461,49 +646,25 @@ def fit_model_g_total_emissions(
         - Clustered SE at country level
         - NO constant added (absorbed by FE)
     """
-    df = panel_df.copy()
+    from linearmodels.panel import PanelOLS
 
-    # -------------------------------------------------------------------------
-    # Construct total emissions (prefer raw values for numerical stability)
-    # -------------------------------------------------------------------------
-    raw_cols = ["energy_emissions", "industry_emissions", "transport_emissions"]
-    log_cols = ["ln_energy", "ln_industry", "ln_transport"]
-
-    if all(col in df.columns for col in raw_cols):
-        # Best: sum raw emissions, then log
-        df["total_emissions"] = (
-            df["energy_emissions"] + df["industry_emissions"] + df["transport_emissions"]
-        )
-        df["ln_total_emissions"] = np.log(df["total_emissions"])
-        construction_method = "raw emissions summation"
-    elif all(col in df.columns for col in log_cols):
-        # Fallback: numerically stable logsumexp
-        df["ln_total_emissions"] = logsumexp(df[log_cols].values, axis=1)
-        construction_method = "logsumexp from log-transformed sectors"
-    else:
-        raise ValueError(
-            "Cannot construct total emissions: missing sector columns. "
-            f"Need {raw_cols} or {log_cols}"
-        )
+    cube = as_panel_cube(panel_df)
+    ln_total, construction_method = _ln_total_emissions(cube)
+    cube = cube.assign(ln_total_emissions=ln_total)
 
     # -------------------------------------------------------------------------
-    # Prepare panel and drop missing
+    # Drop missing and export the PanelOLS frame straight from the cube
     # -------------------------------------------------------------------------
-    df = df.dropna(subset=["ln_total_emissions", "ln_pm25"])
+    valid = cube.valid("ln_total_emissions", "ln_pm25")
 
-    if len(df) < 20:
-        print_fn(f"[WARN] Insufficient data for Model G: {len(df)} observations")
+    if valid.sum() < 20:
+        print_fn(f"[WARN] Insufficient data for Model G: {valid.sum()} observations")
         return None
 
-    # Ensure MultiIndex for panel
-    if not isinstance(df.index, pd.MultiIndex):
-        if "iso3" in df.columns and "year" in df.columns:
-            df = df.set_index(["iso3", "year"]).sort_index()
-        else:
-            raise ValueError("Panel must have iso3 and year columns or MultiIndex")
-
-    n_countries = df.index.get_level_values("iso3").nunique()
-    n_years = df.index.get_level_values("year").nunique()
+    df = cube.to_frame(["country", "ln_pm25", "ln_total_emissions"], mask=valid)
+    balance = cube.balance(valid)
+    n_countries = balance["n_entities"]
+    n_years = balance["n_years"]
 
     # -------------------------------------------------------------------------
     # Estimate: ln(PM₂.₅) ~ ln(TotalEmissions) + FE_i + FE_t
@@ -515,7 +676,11 @@ def fit_model_g_total_emissions(
     estimation_panel = df.reset_index()[["iso3", "country", "year", "ln_pm25", "ln_total_emissions"]]
     estimation_panel.to_csv(OUTPUT_DIR / "panel_model_g_estimation.csv", index=False)
     print_fn(f"💾 Saved panel_model_g_estimation.csv (N={len(estimation_panel)}, countries={n_countries}, years={n_years})")
-    _log_panel_save(f"Model G: panel_model_g_estimation.csv (N={len(estimation_panel)}, countries={n_countries}, years={n_years})")
+    if panel_log_fn is not None:
+        panel_log_fn(
+            f"Model G: panel_model_g_estimation.csv "
+            f"(N={len(estimation_panel)}, countries={n_countries}, years={n_years})"
+        )
 
     # NOTE: Do NOT add constant (absorbed by fixed effects)
     model = PanelOLS(
@@ -540,16 +705,92 @@ def fit_model_g_total_emissions(
     print_fn(result.summary)
 
     # Save outputs
-    save_model_outputs(result, name, results_list, is_panel=True)
+    ri_pvalues = _randomization_inference(y, X, randomization_draws, seed, jobs, print_fn)
+    save_model_outputs(result, name, results_list, is_panel=True, extra_columns=ri_pvalues)
+
+    if jackknife:
+        influence = jackknife_two_way(df, "ln_pm25", ["ln_total_emissions"])
+        save_jackknife_outputs(name, influence, result.params, result.std_errors, print_fn)
 
     return result
 
 
+def fit_model_g_windows(
+    panel_df: PanelCube | pd.DataFrame,
+    name: str,
+    window: int,
+    mode: str = "rolling",
+    print_fn: Callable = print,
+) -> pd.DataFrame | None:
+    """
+    Model G over rolling or expanding year windows (coefficient drift).
+
+    Builds the Model G sample from any WHO × UNFCCC panel, stores its
+    (country, year) sufficient statistics once and slides the window over
+    them (src/rolling.py), so no window is refit from rows.
+
+    Args:
+        panel_df: PanelCube (or long panel frame) with PM₂.₅ and emissions columns
+        name: Model name for output files ({name}_{mode}.csv / .png)
+        window: Window width in calendar years (minimum width for expanding)
+        mode: 'rolling' or 'expanding'
+        print_fn: Print function for logging
+
+    Returns:
+        Coefficient-over-time table, or None if the sample is too small
+    """
+    cube = as_panel_cube(panel_df)
+    if "ln_total_emissions" not in cube:
+        ln_total, _ = _ln_total_emissions(cube)
+        cube = cube.assign(ln_total_emissions=ln_total)
+
+    valid = cube.valid("ln_total_emissions", "ln_pm25")
+    if valid.sum() < 20:
+        print_fn(f"[WARN] Insufficient data for Model G windows: {valid.sum()} observations")
+        return None
+
+    t0 = time.perf_counter()
+    store = SufficientStats.from_frame(
+        cube.to_frame(["ln_pm25", "ln_total_emissions"], mask=valid),
+        ["ln_pm25", "ln_total_emissions"],
+    )
+    table = rolling_two_way_fe(store, "ln_pm25", ["ln_total_emissions"], window, mode)
+    seconds = time.perf_counter() - t0
+
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    table.to_csv(OUTPUT_DIR / f"{name}_{mode}.csv", index=False)
+    _plot_window_coefficients(table, name, mode, window, "ln_total_emissions")
+    print_fn(
+        f"📈 Model G {mode} windows ({window}y): {len(table)} windows in {seconds * 1000:.1f}ms "
+        f"→ {name}_{mode}.csv, {name}_{mode}.png"
+    )
+    return table
+
+
+def _plot_window_coefficients(
+    table: pd.DataFrame, name: str, mode: str, window: int, regressor: str
+) -> None:
+    """Queue the coefficient-per-window plot with a ±1.96·SE band (clustered SEs)."""
+    queue_plot(
+        "window",
+        f"{name}_{mode}.png",
+        title=f"{name} – {mode.capitalize()} {window}-year windows",
+        window_end=table["window_end"].to_numpy(),
+        coef=table[f"coef_{regressor}"].to_numpy(dtype=float),
+        se=table[f"se_{regressor}"].to_numpy(dtype=float),
+        regressor=regressor,
+    )
+
+
 def fit_model_e_lagged(
-    panel_df: pd.DataFrame,
+    panel_df: PanelCube | pd.DataFrame,
     name: str,
     results_list: list[dict],
     print_fn: Callable = print,
+    panel_log_fn: Callable | None = None,
+    randomization_draws: int = 0,
+    seed: int = 0,
+    jobs: int = 1,
 ):
     """
     Model E-lite: Lagged Total Emissions → PM₂.₅ (Panel FE).
@@ -561,60 +802,50 @@ def fit_model_e_lagged(
         ln(PM₂.₅)_it = β·ln(TotalEmissions)_{i,t-1} + α_i + γ_t + ε_it
 
     Args:
-        panel_df: Panel data with total emissions column (or sector columns to construct it)
+        panel_df: PanelCube (or long panel frame) with total emissions or sector columns
         name: Model name for output files
         results_list: List to append summary statistics
         print_fn: Print function for logging
+        panel_log_fn: Records the saved estimation panel in the panel materialization log
+        randomization_draws: Draws per scheme for randomization/placebo
+            p-values in the coefficients CSV (0 = off)
+        seed: Randomization seed
+        jobs: Worker processes for the randomization batches
 
     Returns:
         tuple: (PanelOLS result, sample_diagnostics_dict)
 
     Notes:
-        - Lags total emissions by 1 year within each country
+        - Lags total emissions by one calendar year within each country
+          (no lag when year t−1 is missing from the panel)
         - Two-way FE (entity + time)
         - Clustered SE at country level
         - NO constant added (absorbed by FE)
         - Caller is responsible for gate check before calling this function
     """
-    df = panel_df.copy()
+    from linearmodels.panel import PanelOLS
 
-    # -------------------------------------------------------------------------
-    # Ensure we have total emissions
-    # -------------------------------------------------------------------------
-    raw_cols = ["energy_emissions", "industry_emissions", "transport_emissions"]
-    log_cols = ["ln_energy", "ln_industry", "ln_transport"]
-
-    if "ln_total_emissions" not in df.columns:
-        if all(col in df.columns for col in raw_cols):
-            df["total_emissions"] = (
-                df["energy_emissions"] + df["industry_emissions"] + df["transport_emissions"]
-            )
-            df["ln_total_emissions"] = np.log(df["total_emissions"])
-        elif all(col in df.columns for col in log_cols):
-            df["ln_total_emissions"] = logsumexp(df[log_cols].values, axis=1)
-        else:
-            raise ValueError("Cannot construct total emissions")
+    cube = as_panel_cube(panel_df)
 
     # -------------------------------------------------------------------------
-    # Reset index if needed for groupby operations
+    # Ensure we have total emissions
     # -------------------------------------------------------------------------
-    if isinstance(df.index, pd.MultiIndex):
-        df = df.reset_index()
+    if "ln_total_emissions" not in cube:
+        ln_total, _ = _ln_total_emissions(cube)
+        cube = cube.assign(ln_total_emissions=ln_total)
 
     # -------------------------------------------------------------------------
-    # Create lag within each country
+    # Lag by calendar year within each country
     # -------------------------------------------------------------------------
-    n_before = len(df)
-    countries_before = df["iso3"].nunique()
-
-    df = df.sort_values(["iso3", "year"])
-    df["ln_total_emissions_lag1"] = df.groupby("iso3")["ln_total_emissions"].shift(1)
-
-    # Drop rows with missing lag
-    df = df.dropna(subset=["ln_total_emissions_lag1", "ln_pm25"])
+    cube = cube.assign(ln_total_emissions_lag1=cube.lag("ln_total_emissions", 1))
+    before = cube.balance()
+    valid = cube.valid("ln_total_emissions_lag1", "ln_pm25")
+    after = cube.balance(valid)
 
-    n_after = len(df)
-    countries_after = df["iso3"].nunique()
+    n_before = before["n_obs"]
+    countries_before = before["n_entities"]
+    n_after = after["n_obs"]
+    countries_after = after["n_entities"]
 
     sample_loss = (n_before - n_after) / n_before
     country_retention = countries_after / countries_before
@@ -628,23 +859,27 @@ def fit_model_e_lagged(
         "country_retention": country_retention,
     }
 
-    if len(df) < 20:
-        print_fn(f"[WARN] Insufficient data after lagging: {len(df)} observations")
+    if n_after < 20:
+        print_fn(f"[WARN] Insufficient data after lagging: {n_after} observations")
         return None, sample_diagnostics
 
     # -------------------------------------------------------------------------
-    # Set panel index and estimate
+    # Export the PanelOLS frame and estimate
     # -------------------------------------------------------------------------
-    df = df.set_index(["iso3", "year"]).sort_index()
+    df = cube.to_frame(["country", "ln_pm25", "ln_total_emissions_lag1"], mask=valid)
 
-    n_countries = df.index.get_level_values("iso3").nunique()
-    n_years = df.index.get_level_values("year").nunique()
+    n_countries = countries_after
+    n_years = after["n_years"]
 
     # Save estimation panel for Excel replication
     estimation_panel = df.reset_index()[["iso3", "country", "year", "ln_pm25", "ln_total_emissions_lag1"]]
     estimation_panel.to_csv(OUTPUT_DIR / "panel_model_e_estimation.csv", index=False)
     print_fn(f"💾 Saved panel_model_e_estimation.csv (N={len(estimation_panel)}, countries={n_countries}, years={n_years})")
-    _log_panel_save(f"Model E: panel_model_e_estimation.csv (N={len(estimation_panel)}, countries={n_countries}, years={n_years})")
+    if panel_log_fn is not None:
+        panel_log_fn(
+            f"Model E: panel_model_e_estimation.csv "
+            f"(N={len(estimation_panel)}, countries={n_countries}, years={n_years})"
+        )
 
     y = df["ln_pm25"]
     X = df[["ln_total_emissions_lag1"]]
@@ -675,7 +910,8 @@ def fit_model_e_lagged(
     print_fn(result.summary)
 
     # Save outputs
-    save_model_outputs(result, name, results_list, is_panel=True)
+    ri_pvalues = _randomization_inference(y, X, randomization_draws, seed, jobs, print_fn)
+    save_model_outputs(result, name, results_list, is_panel=True, extra_columns=ri_pvalues)
 
     # Save sample retention info
     _save_model_e_sample_info(name, sample_diagnostics)
@@ -683,6 +919,123 @@ def fit_model_e_lagged(
     return result, sample_diagnostics
 
 
+def fit_model_e_lag_grid(
+    panel_df: PanelCube | pd.DataFrame,
+    specs: list[dict],
+    name: str,
+    print_fn: Callable = print,
+) -> dict[str, pd.DataFrame]:
+    """
+    Model E over a lag grid: individual lags and distributed lags 0..k.
+
+    Specification (distributed lag 0..k; individual lag k keeps one term):
+        ln(PM₂.₅)_it = Σ_j β_j·ln(TotalEmissions)_{i,t-j} + α_i + γ_t + ε_it
+
+    All lag columns are built once on the cube (shared design); each spec is
+    a column subset on its gate sample. Specs with the same sample share one
+    TwoWayWithin, so each lag column is demeaned once per sample.
+
+    Args:
+        panel_df: PanelCube (or long panel frame) with total emissions or sector columns
+        specs: Output of check_lag_grid_gate(); only passing specs are estimated
+        name: Prefix for output files ({name}_individual.csv, {name}_distributed.csv)
+        print_fn: Print function for logging
+
+    Returns:
+        dict: lag structure → coefficient table (one row per spec and term; the
+        distributed table adds a 'cumulative' row Σβ_j per spec)
+
+    Notes:
+        - Two-way FE, country-clustered SEs (PanelOLS rules, src/within.py)
+        - Lags are calendar years within country (no lag across gaps)
+    """
+    from scipy.stats import t as t_dist
+
+    cube = as_panel_cube(panel_df)
+    if "ln_total_emissions" not in cube:
+        ln_total, _ = _ln_total_emissions(cube)
+        cube = cube.assign(ln_total_emissions=ln_total)
+
+    max_lag = max((max(spec["lags"]) for spec in specs), default=0)
+    lag_columns = ["ln_total_emissions"] + [
+        f"ln_total_emissions_lag{k}" for k in range(1, max_lag + 1)
+    ]
+    cube = cube.assign(
+        **{col: cube.lag("ln_total_emissions", k) for k, col in enumerate(lag_columns) if k}
+    )
+
+    samples: dict[bytes, TwoWayWithin] = {}
+    rows = {"individual": [], "distributed": []}
+    for spec in specs:
+        if not spec["passed"]:
+            continue
+        x = [lag_columns[k] for k in spec["lags"]]
+        mask = spec["mask"] & cube.valid("ln_pm25", *lag_columns[: max(spec["lags"]) + 1])
+        key = mask.tobytes()
+        if key not in samples:
+            samples[key] = TwoWayWithin.from_cube(
+                cube, ["ln_pm25"] + lag_columns[: max(spec["lags"]) + 1], mask
+            )
+        within = samples[key]
+        result = within.fit("ln_pm25", x)
+
+        info = {
+            "spec": spec["name"],
+            "N": result.nobs,
+            "n_countries": within.n_entities,
+            "n_years": within.n_times,
+            "R2_within": result.rsquared_within,
+        }
+        for k, col in zip(spec["lags"], x):
+            rows[spec["structure"]].append(
+                {
+                    **info,
+                    "term": col,
+                    "lag": k,
+                    "Coefficient": result.params[col],
+                    "Std_Error": result.std_errors[col],
+                    "t_Stat": result.tstats[col],
+                    "P_value": result.pvalues[col],
+                }
+            )
+        if spec["structure"] == "distributed":
+            total = float(result.params.sum())
+            total_se = float(np.sqrt(result.cov.to_numpy().sum()))
+            rows["distributed"].append(
+                {
+                    **info,
+                    "term": "cumulative",
+                    "lag": max(spec["lags"]),
+                    "Coefficient": total,
+                    "Std_Error": total_se,
+                    "t_Stat": total / total_se,
+                    "P_value": 2 * t_dist.sf(abs(total / total_se), result.df_resid),
+                }
+            )
+
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    tables = {}
+    for structure, structure_rows in rows.items():
+        table = pd.DataFrame(structure_rows)
+        tables[structure] = table
+        if table.empty:
+            continue
+        table.to_csv(OUTPUT_DIR / f"{name}_{structure}.csv", index=False)
+        print_fn(f"\n{structure.capitalize()} lags (two-way FE, clustered SE):")
+        for _, row in table.iterrows():
+            print_fn(
+                f"  {row['spec']:8} {row['term']:28} β = {row['Coefficient']:+.4f} "
+                f"(SE {row['Std_Error']:.4f}, p = {row['P_value']:.3f}, N = {row['N']})"
+            )
+        print_fn(f"💾 Saved {name}_{structure}.csv ({table['spec'].nunique()} specs)")
+
+    n_passed = sum(spec["passed"] for spec in specs)
+    print_fn(
+        f"  Lag grid: {n_passed} of {len(specs)} specs estimated on {len(samples)} distinct samples"
+    )
+    return tables
+
+
 def _save_model_e_sample_info(name: str, diagnostics: dict) -> None:
     """Save Model E sample retention information."""
     OUTPUT_DIR.mkdir(exist_ok=True)
@@ -691,7 +1044,8 @@ def _save_model_e_sample_info(name: str, diagnostics: dict) -> None:
         f"Model E-lite Sample Retention: {name}",
         "=" * 40,
         "",
-        "Lagging drops the first observation per country.",
+        "Lags are by calendar year: a country-year is dropped when year t−1 "
+        "is not observed for that country.",
         "",
         f"Before lagging: {diagnostics['n_before']} observations, {diagnostics['countries_before']} countries",
         f"After lagging:  {diagnostics['n_after']} observations, {diagnostics['countries_after']} countries",
@@ -0,0 +1,257 @@
+"""
+panel.py – Dense Country × Year Panel Cube
+===========================================
+
+Integer-coded panel container for the fixed-effects models (C, G, E):
+- Entities (iso3) and calendar years are mapped once to dense codes
+- Every column is a 2-D (entity × year) NumPy array, NaN where unobserved
+- A boolean validity mask records which (entity, year) cells exist
+
+Lags and leads are array shifts along the year axis, so t−k always means
+the calendar year t−k (a missing year gives NaN, never the previous
+available one). Export to the sorted (iso3, year) MultiIndex used by
+PanelOLS is built directly from the cube codes, without re-sorting.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+class PanelCube:
+    """
+    Dense entity × year panel backed by 2-D arrays and a validity mask.
+
+    Attributes:
+        entities: Sorted entity labels (row axis)
+        years: Consecutive calendar years first..last (column axis)
+        mask: Boolean (n_entities × n_years) array of observed cells
+        data: Column name → (n_entities × n_years) array
+    """
+
+    def __init__(
+        self,
+        entities: pd.Index,
+        years: np.ndarray,
+        mask: np.ndarray,
+        data: dict[str, np.ndarray],
+        entity: str = "iso3",
+        time: str = "year",
+    ):
+        self.entities = entities
+        self.years = years
+        self.mask = mask
+        self.data = data
+        self.entity = entity
+        self.time = time
+
+    # -------------------------------------------------------------------------
+    # Construction
+    # -------------------------------------------------------------------------
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        entity: str = "iso3",
+        time: str = "year",
+        columns: list[str] | None = None,
+    ) -> "PanelCube":
+        """
+        Build a cube from a long panel (one row per entity-year).
+
+        Args:
+            df: Long panel with entity and time columns (or a MultiIndex of them)
+            entity: Entity column name
+            time: Calendar year column name
+            columns: Columns to keep (default: all other columns)
+
+        Raises:
+            ValueError: On missing entity/year values or duplicate entity-years
+        """
+        if isinstance(df.index, pd.MultiIndex):
+            df = df.reset_index()
+
+        labels = np.asarray(df[entity], dtype=object)
+        codes, entities = pd.factorize(labels, sort=True)
+        if (codes < 0).any() or df[time].isna().any():
+            raise ValueError(f"Panel has missing {entity}/{time} values")
+
+        year = df[time].to_numpy(dtype="int64")
+        first = int(year.min()) if len(year) else 0
+        offsets = year - first
+        n_years = int(offsets.max()) + 1 if len(year) else 0
+        shape = (len(entities), n_years)
+
+        flat = codes * n_years + offsets
+        if len(np.unique(flat)) != len(flat):
+            raise ValueError(f"Panel has duplicate ({entity}, {time}) rows")
+
+        mask = np.zeros(shape, dtype=bool)
+        mask[codes, offsets] = True
+
+        if columns is None:
+            columns = [c for c in df.columns if c not in (entity, time)]
+        data = {}
+        for col in columns:
+            values = df[col]
+            if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+                arr = np.full(shape, np.nan)
+                arr[codes, offsets] = values.to_numpy(dtype="float64", na_value=np.nan)
+            else:
+                arr = np.full(shape, None, dtype=object)
+                arr[codes, offsets] = values.to_numpy(dtype=object)
+            data[col] = arr
+
+        return cls(
+            pd.Index(entities, name=entity),
+            np.arange(first, first + n_years, dtype="int64"),
+            mask,
+            data,
+            entity=entity,
+            time=time,
+        )
+
+    def assign(self, **arrays: np.ndarray) -> "PanelCube":
+        """Return a cube with extra/replaced (n_entities × n_years) columns; arrays are shared."""
+        for name, arr in arrays.items():
+            if arr.shape != self.mask.shape:
+                raise ValueError(f"Column {name} has shape {arr.shape}, expected {self.mask.shape}")
+        return PanelCube(
+            self.entities, self.years, self.mask, {**self.data, **arrays}, self.entity, self.time
+        )
+
+    # -------------------------------------------------------------------------
+    # Access
+    # -------------------------------------------------------------------------
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.data[column]
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.data
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self.data)
+
+    @property
+    def n_obs(self) -> int:
+        return int(self.mask.sum())
+
+    def valid(self, *columns: str) -> np.ndarray:
+        """Mask of observed cells where all given numeric columns are non-NaN."""
+        mask = self.mask.copy()
+        for col in columns:
+            mask &= ~np.isnan(self.data[col])
+        return mask
+
+    # -------------------------------------------------------------------------
+    # Lags / leads by calendar year
+    # -------------------------------------------------------------------------
+    def shift(self, column: str, periods: int = 1) -> np.ndarray:
+        """
+        Value of a numeric column at year t−periods (NaN if that year is unobserved).
+
+        Positive periods are lags, negative periods are leads.
+        """
+        values = np.where(self.mask, self.data[column], np.nan)
+        out = np.full(values.shape, np.nan)
+        if periods == 0:
+            out[:] = values
+        elif 0 < periods < values.shape[1]:
+            out[:, periods:] = values[:, :-periods]
+        elif 0 < -periods < values.shape[1]:
+            out[:, :periods] = values[:, -periods:]
+        return out
+
+    def lag(self, column: str, k: int = 1) -> np.ndarray:
+        return self.shift(column, k)
+
+    def lead(self, column: str, k: int = 1) -> np.ndarray:
+        return self.shift(column, -k)
+
+    def lag_mask(self, k: int = 1) -> np.ndarray:
+        """Observed cells whose year t−k is also observed for the same entity."""
+        out = np.zeros_like(self.mask)
+        if 0 < k < self.mask.shape[1]:
+            out[:, k:] = self.mask[:, k:] & self.mask[:, :-k]
+        return out
+
+    def lag_masks(self, max_lag: int, cumulative: bool = False) -> np.ndarray:
+        """
+        lag_mask(k) for every k = 0..max_lag at once, shape (max_lag + 1, entities, years).
+
+        With cumulative=True, [k] instead marks cells whose years t, t−1, …, t−k
+        are ALL observed (the sample of a distributed lag 0..k).
+        """
+        padded = np.pad(self.mask, ((0, 0), (max_lag, 0)), constant_values=False)
+        # windows[i, t, j] = observed at year t − j
+        windows = np.lib.stride_tricks.sliding_window_view(padded, max_lag + 1, axis=1)[:, :, ::-1]
+        if cumulative:
+            out = np.logical_and.accumulate(windows, axis=2)
+        else:
+            out = windows & self.mask[:, :, None]
+        return np.moveaxis(out, 2, 0).copy()
+
+    # -------------------------------------------------------------------------
+    # Balance statistics
+    # -------------------------------------------------------------------------
+    def balance(self, mask: np.ndarray | None = None) -> dict:
+        """
+        Panel balance statistics for the cube (or a sub-mask of it).
+
+        Returns:
+            dict with n_obs, n_entities, n_years, min/median/max observations
+            per entity, coverage (share of entity × year cells observed) and
+            balanced (every entity observed in every year)
+        """
+        mask = self.mask if mask is None else mask
+        per_entity = mask.sum(axis=1)
+        per_entity = per_entity[per_entity > 0]
+        n_entities = len(per_entity)
+        n_years = int(mask.any(axis=0).sum())
+        n_obs = int(per_entity.sum())
+        return {
+            "n_obs": n_obs,
+            "n_entities": n_entities,
+            "n_years": n_years,
+            "min_obs_per_entity": int(per_entity.min()) if n_entities else 0,
+            "median_obs_per_entity": float(np.median(per_entity)) if n_entities else 0.0,
+            "max_obs_per_entity": int(per_entity.max()) if n_entities else 0,
+            "coverage": n_obs / (n_entities * n_years) if n_entities and n_years else 0.0,
+            "balanced": bool(n_entities) and n_obs == n_entities * n_years,
+        }
+
+    # -------------------------------------------------------------------------
+    # Export
+    # -------------------------------------------------------------------------
+    def to_frame(
+        self, columns: list[str] | None = None, mask: np.ndarray | None = None
+    ) -> pd.DataFrame:
+        """
+        Export observed cells as a long frame with the sorted (entity, year)
+        MultiIndex expected by PanelOLS.
+
+        The index is assembled from the cube codes (entity-major, years
+        ascending), so no sort or hashing of labels is needed.
+
+        Args:
+            columns: Columns to export (default: all)
+            mask: Sub-mask of cells to export (default: all observed cells)
+        """
+        mask = self.mask if mask is None else mask & self.mask
+        entity_codes, year_codes = np.nonzero(mask)
+        index = pd.MultiIndex(
+            levels=[self.entities, pd.Index(self.years, name=self.time)],
+            codes=[entity_codes, year_codes],
+            names=[self.entity, self.time],
+            verify_integrity=False,
+        ).remove_unused_levels()
+
+        columns = self.columns if columns is None else columns
+        return pd.DataFrame({col: self.data[col][mask] for col in columns}, index=index)
+
+
+def as_panel_cube(panel: PanelCube | pd.DataFrame) -> PanelCube:
+    """Return panel as a PanelCube, building one from a long frame if needed."""
+    return panel if isinstance(panel, PanelCube) else PanelCube.from_frame(panel)
@@ -0,0 +1,203 @@
+"""
+parallel.py – Shared-Memory Panels for Process-Pool Model Fits
+==============================================================
+
+Hands the built panels to worker processes without pickling DataFrames per
+task:
+- SharedPanels copies every numeric array of the panels (DataFrame
+  columns and index, categorical codes, PanelCube data and mask) once into
+  multiprocessing.shared_memory blocks and returns a small picklable handle
+- attach_panels() rebuilds the panels in a worker as read-only views on
+  those blocks; only labels (categories, object columns) travel inline
+- pin_blas_threads() caps BLAS/OpenMP threads in each worker so N workers
+  do not oversubscribe the machine
+
+Supported panel values are DataFrames, PanelCubes, dicts of them and None;
+anything else is passed inline.
+"""
+
+from __future__ import annotations
+
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from src.panel import PanelCube
+
+BLAS_THREAD_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+def pin_blas_threads(n_threads: int = 1):
+    """
+    Limit BLAS/OpenMP threads of the current process (pool initializer).
+
+    The environment variables cover libraries loaded later and processes
+    started from here; threadpoolctl (optional) also resizes pools that are
+    already loaded.
+    """
+    for var in BLAS_THREAD_VARS:
+        os.environ[var] = str(n_threads)
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(n_threads)
+
+
+# =============================================================================
+# Arrays
+# =============================================================================
+def _share_array(arr: np.ndarray, blocks: list) -> tuple:
+    arr = np.asarray(arr)
+    if arr.dtype.hasobject:
+        return ("inline", arr)
+    arr = np.ascontiguousarray(arr)
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, arr.dtype, buffer=shm.buf)[...] = arr
+    blocks.append(shm)
+    return ("shm", shm.name, arr.dtype.str, arr.shape)
+
+
+def _attach_array(spec: tuple, blocks: list) -> np.ndarray:
+    if spec[0] == "inline":
+        return spec[1]
+    _, name, dtype, shape = spec
+    shm = shared_memory.SharedMemory(name=name)
+    blocks.append(shm)
+    arr = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+    arr.flags.writeable = False
+    return arr
+
+
+def _share_column(values, blocks: list) -> tuple:
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return ("category", _share_array(values.cat.codes.to_numpy(), blocks), values.dtype)
+    if isinstance(values.dtype, np.dtype):
+        return ("array", _share_array(values.to_numpy(), blocks))
+    return ("inline", values.to_numpy())  # extension dtypes
+
+
+def _attach_column(spec: tuple, blocks: list):
+    if spec[0] == "category":
+        return pd.Categorical.from_codes(_attach_array(spec[1], blocks), dtype=spec[2])
+    if spec[0] == "array":
+        return _attach_array(spec[1], blocks)
+    return spec[1]
+
+
+# =============================================================================
+# Panels
+# =============================================================================
+def _share_value(value, blocks: list) -> tuple:
+    if isinstance(value, pd.DataFrame):
+        index = value.index
+        index_spec = (
+            ("range", index.start, index.stop, index.step, index.name)
+            if isinstance(index, pd.RangeIndex)
+            else ("index", _share_column(index.to_series(), blocks), index.name)
+        )
+        columns = [(col, _share_column(value[col], blocks)) for col in value.columns]
+        return ("frame", columns, index_spec, dict(value.attrs))
+    if isinstance(value, PanelCube):
+        data = {col: _share_array(arr, blocks) for col, arr in value.data.items()}
+        return (
+            "cube",
+            value.entities,
+            value.years,
+            _share_array(value.mask, blocks),
+            data,
+            value.entity,
+            value.time,
+        )
+    if isinstance(value, dict):
+        return ("dict", {key: _share_value(v, blocks) for key, v in value.items()})
+    return ("value", value)
+
+
+def _attach_value(handle: tuple, blocks: list):
+    kind = handle[0]
+    if kind == "frame":
+        _, columns, index_spec, attrs = handle
+        if index_spec[0] == "range":
+            index = pd.RangeIndex(*index_spec[1:4], name=index_spec[4])
+        else:
+            index = pd.Index(_attach_column(index_spec[1], blocks), name=index_spec[2])
+        frame = pd.DataFrame(
+            {col: _attach_column(spec, blocks) for col, spec in columns}, index=index, copy=False
+        )
+        frame.attrs = attrs
+        return frame
+    if kind == "cube":
+        _, entities, years, mask, data, entity, time = handle
+        return PanelCube(
+            entities,
+            years,
+            _attach_array(mask, blocks),
+            {col: _attach_array(spec, blocks) for col, spec in data.items()},
+            entity=entity,
+            time=time,
+        )
+    if kind == "dict":
+        return {key: _attach_value(v, blocks) for key, v in handle[1].items()}
+    return handle[1]
+
+
+class SharedPanels:
+    """
+    Panels copied into shared memory for the lifetime of a `with` block.
+
+    Attributes:
+        handle: Picklable description of the panels for attach_panels()
+        nbytes: Total size of the shared blocks
+    """
+
+    def __init__(self, panels: dict):
+        self._blocks: list[shared_memory.SharedMemory] = []
+        try:
+            self.handle = _share_value(panels, self._blocks)
+        except Exception:
+            self.close()
+            raise
+        self.nbytes = sum(shm.size for shm in self._blocks)
+
+    def close(self):
+        """Release and unlink every shared block."""
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+
+    def __enter__(self) -> "SharedPanels":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_panels(handle: tuple) -> tuple[dict, list]:
+    """
+    Rebuild panels from a SharedPanels handle as read-only shared views.
+
+    Returns:
+        (panels, blocks); call release_blocks(blocks) once the panels are
+        no longer referenced
+    """
+    blocks: list[shared_memory.SharedMemory] = []
+    return _attach_value(handle, blocks), blocks
+
+
+def release_blocks(blocks: list):
+    """Close attached blocks (ones still referenced by live arrays stay mapped until exit)."""
+    for shm in blocks:
+        try:
+            shm.close()
+        except BufferError:
+            pass
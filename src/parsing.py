@@ -0,0 +1,132 @@
+"""
+parsing.py – Vectorized Parsing of Messy Numeric Columns
+=========================================================
+
+Column-at-once replacements for per-element parsing of raw dataset values:
+- Leading-number extraction ("12.3 (10.1–14.2)" → 12.3)
+- Thousands separators ("626,253.79" → 626253.79)
+- "value (lower–upper)" interval strings → value, lower, upper
+- NA tokens ("—", "NA", "n/a", UNFCCC notation keys, ...) → NaN
+
+All functions operate on whole columns: through pyarrow compute kernels
+(RE2 regex, C++ string ops) when pyarrow is installed, otherwise through the
+pandas str accessor. Both paths return identical results.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# Tokens treated as missing (compared after stripping whitespace)
+NA_TOKENS = frozenset(
+    {"", "-", "—", "–", "..", "NA", "N/A", "n/a", "na", "NaN", "nan", "None", "null",
+     # UNFCCC notation keys: not occurring, not estimated, included elsewhere, confidential
+     "NO", "NE", "IE", "C", "NA,NO", "NO,NE"}
+)
+
+NUMBER_PATTERN = r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?"
+
+_INTERVAL_PATTERN = (
+    rf"^\s*(?P<value>{NUMBER_PATTERN})\s*\(\s*(?P<lower>{NUMBER_PATTERN})"
+    rf"\s*(?:–|—|to|-)\s*(?P<upper>{NUMBER_PATTERN})\s*\)"
+)
+
+
+def _is_numeric(values: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+
+
+def _clean_text(values: pd.Series, na_tokens: frozenset[str]) -> pd.Series:
+    """Stringify, strip, blank out NA tokens, drop thousands separators."""
+    text = values.astype(object).where(values.notna(), "").astype(str).str.strip()
+    text = text.mask(text.isin(na_tokens), "")
+    return text.str.replace(",", "", regex=False).str.replace("−", "-", regex=False)
+
+
+def _clean_text_arrow(values: pd.Series, na_tokens: frozenset[str]):
+    """pyarrow version of _clean_text (NA tokens become nulls); None without pyarrow."""
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        return None
+
+    try:
+        arr = pa.array(values.to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed objects (e.g. floats among strings): stringify first
+        strings = values.astype(str).where(values.notna()).to_numpy(dtype=object)
+        arr = pa.array(strings, type=pa.string(), from_pandas=True)
+
+    text = pc.utf8_trim_whitespace(arr)
+    is_na = pc.is_in(text, value_set=pa.array(sorted(na_tokens), type=pa.string()))
+    text = pc.if_else(is_na, pa.scalar(None, pa.string()), text)
+    return pc.replace_substring(pc.replace_substring(text, ",", ""), "−", "-")
+
+
+def _arrow_groups_to_frame(text, pattern: str, index: pd.Index) -> pd.DataFrame:
+    """Run an RE2 pattern with named groups and return the groups as float64 columns."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    groups = pc.extract_regex(text, pattern)
+    return pd.DataFrame(
+        {
+            field.name: pc.cast(pc.struct_field(groups, [i]), pa.float64()).to_numpy(
+                zero_copy_only=False
+            )
+            for i, field in enumerate(groups.type)
+        },
+        index=index,
+    )
+
+
+def parse_numeric(values: pd.Series, na_tokens: frozenset[str] = NA_TOKENS) -> pd.Series:
+    """
+    Parse a column to float64 by extracting the first numeric token.
+
+    Equivalent to applying data_loader.leading_number() element-wise, plus
+    explicit NA tokens, in a single vectorized pass.
+
+    Args:
+        values: Raw column (numeric columns are returned as float64 directly)
+        na_tokens: Strings treated as missing
+
+    Returns:
+        float64 Series aligned with values
+    """
+    if _is_numeric(values):
+        return values.astype("float64")
+
+    text = _clean_text_arrow(values, na_tokens)
+    if text is not None:
+        return _arrow_groups_to_frame(text, f"(?P<value>{NUMBER_PATTERN})", values.index)["value"]
+
+    text = _clean_text(values, na_tokens)
+    return text.str.extract(f"({NUMBER_PATTERN})", expand=False).astype("float64")
+
+
+def parse_interval(values: pd.Series, na_tokens: frozenset[str] = NA_TOKENS) -> pd.DataFrame:
+    """
+    Parse "value (lower–upper)" strings into point value and bounds.
+
+    Entries without an interval keep their leading number as value and get
+    NaN bounds. En dash, em dash, hyphen and "to" are accepted separators.
+
+    Returns:
+        DataFrame with float64 columns: value, lower, upper
+    """
+    if _is_numeric(values):
+        value = values.astype("float64")
+        return pd.DataFrame({"value": value, "lower": np.nan, "upper": np.nan}, index=values.index)
+
+    text = _clean_text_arrow(values, na_tokens)
+    if text is not None:
+        parts = _arrow_groups_to_frame(text, _INTERVAL_PATTERN, values.index)
+    else:
+        text = _clean_text(values, na_tokens)
+        parts = text.str.extract(_INTERVAL_PATTERN).astype("float64")
+
+    parts["value"] = parts["value"].fillna(parse_numeric(values, na_tokens))
+    return parts[["value", "lower", "upper"]]
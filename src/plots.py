@@ -0,0 +1,155 @@
+"""
+plots.py – Deferred Diagnostic Plot Rendering
+=============================================
+
+Model fits no longer draw their figures inline. They queue a plot job
+holding only the arrays the figure needs (fitted values and residuals, or a
+coefficient-per-window table), and the pipeline renders every queued job in
+a separate stage once all fits, CSVs and the summary are written:
+- Rendering runs in a process pool (or in-process for one job slot) on the
+  non-interactive Agg backend
+- Each worker draws on one reused Figure object (cleared between jobs)
+  instead of creating a pyplot figure per plot
+- Full resolution is 200 dpi; previews render at PREVIEW_DPI
+
+Jobs are (kind, filename, data) tuples and are picklable, so worker
+processes and the artifact cache can carry them.
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+FULL_DPI = 200
+PREVIEW_DPI = 72
+FIGSIZE = (8, 5)
+
+_queue: list[tuple[str, str, dict]] = []
+_figure = None
+
+
+# =============================================================================
+# Queue
+# =============================================================================
+def queue_plot(kind: str, filename: str, **data) -> None:
+    """Queue a plot job (see DRAWERS for kinds) to be written to output/filename."""
+    if kind not in DRAWERS:
+        raise ValueError(f"Unknown plot kind '{kind}', expected one of {list(DRAWERS)}")
+    _queue.append((kind, filename, data))
+
+
+def queue_diagnostic_plots(name: str, fitted: np.ndarray, resid: np.ndarray) -> None:
+    """Queue the residuals-vs-fitted and normal Q-Q plots of a model."""
+    queue_plot("residuals", f"{name}_residuals.png", name=name, fitted=fitted, resid=resid)
+    queue_plot("qqplot", f"{name}_qqplot.png", name=name, resid=resid)
+
+
+def take_queued() -> list[tuple[str, str, dict]]:
+    """Return and clear the queued plot jobs."""
+    jobs = list(_queue)
+    _queue.clear()
+    return jobs
+
+
+# =============================================================================
+# Drawing
+# =============================================================================
+def _draw_residuals(ax, name: str, fitted: np.ndarray, resid: np.ndarray) -> None:
+    import seaborn as sns
+
+    sns.scatterplot(x=fitted, y=resid, s=45, alpha=0.7, ax=ax)
+    ax.axhline(0, color="red", linestyle="--", linewidth=1)
+    ax.set_title(f"{name} – Residuals vs Fitted")
+    ax.set_xlabel("Fitted Values")
+    ax.set_ylabel("Residuals")
+
+
+def _draw_qqplot(ax, name: str, resid: np.ndarray) -> None:
+    import statsmodels.api as sm
+
+    sm.qqplot(resid, line="45", fit=True, ax=ax)
+    ax.set_title(f"{name} – Normal Q-Q Plot")
+
+
+def _draw_window(
+    ax, title: str, window_end: np.ndarray, coef: np.ndarray, se: np.ndarray, regressor: str
+) -> None:
+    ax.plot(window_end, coef, marker="o")
+    ax.fill_between(window_end, coef - 1.96 * se, coef + 1.96 * se, alpha=0.2)
+    ax.axhline(0, color="red", linestyle="--", linewidth=1)
+    ax.set_title(title)
+    ax.set_xlabel("Window end year")
+    ax.set_ylabel(f"β ({regressor}), 95% CI")
+
+
+DRAWERS = {"residuals": _draw_residuals, "qqplot": _draw_qqplot, "window": _draw_window}
+
+
+def _init_renderer() -> None:
+    """Select the non-interactive Agg backend (pool initializer)."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def _render(job: tuple[str, str, dict], dpi: int, output_dir: Path) -> str:
+    """Draw one job on this process's reused figure and save it."""
+    global _figure
+    if _figure is None:
+        from matplotlib.figure import Figure
+
+        _figure = Figure(figsize=FIGSIZE)
+    kind, filename, data = job
+    _figure.clear()
+    DRAWERS[kind](_figure.add_subplot(), **data)
+    _figure.tight_layout()
+    _figure.savefig(output_dir / filename, dpi=dpi)
+    return filename
+
+
+def _render_chunk(jobs: list[tuple[str, str, dict]], dpi: int, output_dir: Path) -> list[str]:
+    return [_render(job, dpi, output_dir) for job in jobs]
+
+
+def render_plots(
+    jobs: list[tuple[str, str, dict]],
+    output_dir: Path,
+    processes: int = 1,
+    dpi: int = FULL_DPI,
+) -> tuple[list[str], float]:
+    """
+    Render plot jobs to output_dir.
+
+    Args:
+        jobs: Queued plot jobs
+        output_dir: The run's output directory (run.OUTPUT_DIR), where the
+            artifact cache picks the rendered files up
+        processes: Worker processes (1 = in-process)
+        dpi: FULL_DPI, or PREVIEW_DPI for cheap previews
+
+    Returns:
+        (written filenames in job order, seconds)
+    """
+    t0 = time.perf_counter()
+    output_dir.mkdir(exist_ok=True)
+    processes = max(1, min(processes, len(jobs)))
+    if processes == 1:
+        _init_renderer()
+        written = _render_chunk(jobs, dpi, output_dir)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # One chunk per worker, so each worker reuses its figure across jobs
+        chunks = [jobs[i::processes] for i in range(processes)]
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_renderer) as pool:
+            done = list(
+                pool.map(_render_chunk, chunks, [dpi] * processes, [output_dir] * processes)
+            )
+        order = {job[1]: i for i, job in enumerate(jobs)}
+        written = sorted((f for chunk in done for f in chunk), key=order.get)
+    return written, time.perf_counter() - t0
@@ -0,0 +1,158 @@
+"""
+registry.py – Declarative Pipeline Registry and Dependency Resolution
+=====================================================================
+
+Pipeline steps declare what they consume instead of run.py hard-coding
+which panels each model needs:
+- "dataset" steps load one raw dataset
+- "panel" steps build a shared panel from datasets (and/or other panels)
+- "model" steps fit a model from the panels they require
+
+A model step is made of one or more units: independently runnable parts
+(e.g. Model J's DALY and YLL fits) that declare the panels they read, the
+options that shape their results and the output files they write, so they
+can be dispatched to worker processes and restored from the artifact cache.
+
+Registry.plan() resolves the minimal dependency DAG for a set of requested
+models: only steps reachable from them are kept, each exactly once, in
+declaration order. Requirements must be declared before the step that
+uses them, so declaration order is a topological order and plans (and with
+them logs and summary rows) are the same for any request order.
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+
+STEP_KINDS = ("dataset", "panel", "model")
+
+
+class Unit:
+    """
+    Independently runnable part of a model step.
+
+    Args:
+        name: Unique unit name (artifact cache entry name)
+        run: Callable taking the run context
+        inputs: Run-context panel names the unit reads
+        spec: Run-context option names that affect its results
+        artifacts: Glob patterns (in output/) of the files it writes
+        version: Fit version; bump when the unit's outputs change for the same inputs
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable,
+        inputs: tuple[str, ...] = (),
+        spec: tuple[str, ...] = (),
+        artifacts: tuple[str, ...] = (),
+        version: int = 1,
+    ):
+        self.name = name
+        self.run = run
+        self.inputs = tuple(inputs)
+        self.spec = tuple(spec)
+        self.artifacts = tuple(artifacts)
+        self.version = version
+
+    def __repr__(self) -> str:
+        return f"Unit({self.name})"
+
+
+class Step:
+    """
+    One pipeline node.
+
+    Args:
+        name: Unique step name (dataset label, panel name or model key)
+        kind: 'dataset', 'panel' or 'model'
+        run: Loader (datasets) or callable taking the run context (panels, models)
+        requires: Names of the steps this one consumes
+        title: Human-readable description for logs and --help
+        units: Units of a model step (default: one unit running `run` on the required panels)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        run: Callable,
+        requires: tuple[str, ...] = (),
+        title: str = "",
+        units: tuple[Unit, ...] | None = None,
+    ):
+        if kind not in STEP_KINDS:
+            raise ValueError(f"Unknown step kind '{kind}', expected one of {STEP_KINDS}")
+        self.name = name
+        self.kind = kind
+        self.run = run
+        self.requires = tuple(requires)
+        self.title = title or name
+        self.units = tuple(units) if units else (Unit(name, run, inputs=requires),)
+
+    def __repr__(self) -> str:
+        return f"Step({self.kind}:{self.name})"
+
+
+class Plan:
+    """Steps needed for a request, by kind, each list in execution order."""
+
+    def __init__(self, steps: list[Step]):
+        self.steps = steps
+        self.datasets = [s for s in steps if s.kind == "dataset"]
+        self.panels = [s for s in steps if s.kind == "panel"]
+        self.models = [s for s in steps if s.kind == "model"]
+
+    def describe(self) -> str:
+        return " → ".join(
+            f"{kind}s [{', '.join(s.name for s in group) or '–'}]"
+            for kind, group in (
+                ("dataset", self.datasets),
+                ("panel", self.panels),
+                ("model", self.models),
+            )
+        )
+
+
+class Registry:
+    """
+    Ordered collection of pipeline steps.
+
+    Raises:
+        ValueError: on duplicate names or requirements that are unknown or
+            declared after the step requiring them
+    """
+
+    def __init__(self, steps: list[Step]):
+        self.steps: dict[str, Step] = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise ValueError(f"Duplicate pipeline step '{step.name}'")
+            missing = [r for r in step.requires if r not in self.steps]
+            if missing:
+                raise ValueError(
+                    f"Step '{step.name}' requires undeclared step(s): {', '.join(missing)}"
+                )
+            self.steps[step.name] = step
+
+    @property
+    def models(self) -> list[str]:
+        return [name for name, step in self.steps.items() if step.kind == "model"]
+
+    def plan(self, models: list[str]) -> Plan:
+        """Minimal plan computing the requested models (unknown keys raise ValueError)."""
+        unknown = [m for m in models if self.steps.get(m) is None or self.steps[m].kind != "model"]
+        if unknown:
+            raise ValueError(
+                f"Unknown model(s): {', '.join(unknown)}; expected one of {', '.join(self.models)}"
+            )
+
+        needed: set[str] = set()
+        stack = list(models)
+        while stack:
+            name = stack.pop()
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.steps[name].requires)
+        return Plan([step for name, step in self.steps.items() if name in needed])
@@ -0,0 +1,103 @@
+"""
+rolling.py – Rolling and Expanding Window Two-Way FE
+====================================================
+
+Re-estimates a two-way FE regression over year windows from a
+SufficientStats store (src/suffstats.py) without revisiting rows:
+- rolling: fixed-width windows [s, s + w − 1] sliding one calendar year
+- expanding: windows [first year, e] growing one calendar year
+
+As the window moves, the per-country totals (row counts, sums and
+cross-products) are updated incrementally: the entering year's cells are
+added and the leaving year's cells subtracted. Each window then only needs
+the year-effect Schur complement on its own cells (two_way_fe).
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from src.suffstats import SufficientStats, two_way_fe
+
+WINDOW_MODES = ("rolling", "expanding")
+
+
+def window_bounds(years: np.ndarray, window: int, mode: str = "rolling") -> list[tuple[int, int]]:
+    """(start, end) calendar-year windows, `window` years wide (rolling) or wider (expanding)."""
+    if mode not in WINDOW_MODES:
+        raise ValueError(f"Unknown window mode '{mode}', expected one of {WINDOW_MODES}")
+    first, last = int(np.min(years)), int(np.max(years))
+    ends = range(first + window - 1, last + 1)
+    if mode == "rolling":
+        return [(end - window + 1, end) for end in ends]
+    return [(first, end) for end in ends]
+
+
+def rolling_two_way_fe(
+    store: SufficientStats,
+    y: str,
+    x: list[str],
+    window: int,
+    mode: str = "rolling",
+) -> pd.DataFrame:
+    """
+    Two-way FE coefficients (country-clustered SEs, as PanelOLS) per year window.
+
+    Returns:
+        One row per window: window_start, window_end, n_years, n_countries, N,
+        coef_/se_/p_ per regressor and R2_within. Windows whose design is not
+        identified (e.g. too few years) have NaN estimates.
+    """
+    v = store.variable_index(y, x)
+    e_labels, e_codes = np.unique(store.entities, return_inverse=True)
+    years = store.years
+    counts, sums, cross = store.blocks[:, 0, 0], store.blocks[:, 0, v], store.blocks[:, v][:, :, v]
+
+    n_i = np.zeros(len(e_labels))
+    s_i = np.zeros((len(e_labels), len(v)))
+    m_i = np.zeros((len(e_labels), len(v), len(v)))
+    in_window = np.zeros(len(years), dtype=bool)
+
+    rows = []
+    for start, end in window_bounds(years, window, mode):
+        now = (years >= start) & (years <= end)
+        changed = np.flatnonzero(now != in_window)
+        sign = np.where(now[changed], 1.0, -1.0)
+        n_i += np.bincount(
+            e_codes[changed], weights=sign * counts[changed], minlength=len(e_labels)
+        )
+        np.add.at(s_i, e_codes[changed], sign[:, None] * sums[changed])
+        np.add.at(m_i, e_codes[changed], sign[:, None, None] * cross[changed])
+        in_window = now
+
+        cells = np.flatnonzero(in_window)
+        active = n_i > 0.5
+        remap = np.cumsum(active) - 1
+        t_labels, t_codes = np.unique(years[cells], return_inverse=True)
+
+        row = {
+            "window_start": start,
+            "window_end": end,
+            "n_years": len(t_labels),
+            "n_countries": int(active.sum()),
+            "N": int(round(counts[cells].sum())),
+        }
+        try:
+            fit = two_way_fe(
+                remap[e_codes[cells]], t_codes, len(t_labels),
+                counts[cells], sums[cells], cross[cells],
+                n_i[active], s_i[active], m_i[active],
+            )
+            if fit["df_resid"] <= 0:
+                raise np.linalg.LinAlgError("no residual degrees of freedom")
+        except np.linalg.LinAlgError:
+            fit = None
+        for i, col in enumerate(x):
+            row[f"coef_{col}"] = fit["params"][i] if fit else np.nan
+            row[f"se_{col}"] = fit["std_errors"][i] if fit else np.nan
+            row[f"p_{col}"] = fit["pvalues"][i] if fit else np.nan
+        row["R2_within"] = fit["rsquared_within"] if fit else np.nan
+        rows.append(row)
+
+    return pd.DataFrame(rows)
@@ -0,0 +1,244 @@
+"""
+specgrid.py – Batched Specification-Grid Estimator
+===================================================
+
+Fits many linear specifications on one sample from shared cross-products:
+- Each effects type (none / entity / time / both) transforms the sample once
+  (constant, one-way demeaning, or the two-way within transformation)
+- One Gram matrix Z'Z, plus per-country Gram blocks for clustered scores,
+  serves every spec: a spec only slices rows/columns and solves a k × k system
+- Output rows have exactly the keys save_model_outputs() appends to
+  summary_all_models.csv (OLS rows for "none", panel rows otherwise)
+
+Statistics follow the single-spec fits:
+- effects="none": statsmodels OLS with a constant (fit_ols), nonrobust SEs
+- otherwise: linearmodels PanelOLS without constant, country-clustered SEs
+  (fit_panel_fe), with PanelOLS's degrees-of-freedom rules
+"""
+
+from __future__ import annotations
+
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from src.within import TwoWayWithin
+
+EFFECTS = ("none", "entity", "time", "both")
+
+
+def spec_grid(
+    prefix: str,
+    outcomes: list[str],
+    regressors: list[str],
+    effects: tuple[str, ...] = ("both",),
+    max_regressors: int | None = None,
+) -> list[dict]:
+    """
+    Enumerate outcome × non-empty regressor subset × effects specifications.
+
+    Returns:
+        List of spec dicts: {"name", "y", "x", "effects"}
+    """
+    max_regressors = len(regressors) if max_regressors is None else max_regressors
+    specs = []
+    for y in outcomes:
+        for size in range(1, max_regressors + 1):
+            for x in combinations(regressors, size):
+                for fx in effects:
+                    specs.append(
+                        {
+                            "name": f"{prefix}_{y}~{'+'.join(x)}|{fx}",
+                            "y": y,
+                            "x": list(x),
+                            "effects": fx,
+                        }
+                    )
+    return specs
+
+
+class SpecGridEstimator:
+    """
+    Shared-cross-product estimator for a list of specs on one panel sample.
+
+    Args:
+        sample: Frame with an (iso3, year) MultiIndex holding every outcome
+            and regressor used by the specs; must contain no missing values
+    """
+
+    def __init__(self, sample: pd.DataFrame):
+        if sample.isna().to_numpy().any():
+            raise ValueError("Spec-grid sample must not contain missing values")
+
+        self.sample = sample
+        self.columns = list(sample.columns)
+        self.position = {col: i for i, col in enumerate(self.columns)}
+        self.within = TwoWayWithin(sample)
+        self.nobs = self.within.nobs
+        self._grams: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+
+    # -------------------------------------------------------------------------
+    # Shared cross-products
+    # -------------------------------------------------------------------------
+    def _transformed(self, kind: str) -> np.ndarray:
+        """Sample matrix under one transformation (all columns at once)."""
+        raw = self.sample.to_numpy(dtype=np.float64)
+        w = self.within
+        if kind == "none":
+            return np.column_stack([np.ones(self.nobs), raw])  # constant first
+        if kind == "raw":
+            return raw
+        if kind == "between":
+            return w._entity_means(raw)
+        if kind == "entity":
+            return w.entity_demeaned(self.columns)
+        if kind == "time":
+            return raw - w._time_means(raw)[w.time_codes]
+        if kind == "both":
+            return w.demeaned(self.columns)
+        raise ValueError(f"Unknown transformation: {kind}")
+
+    def _gram(self, kind: str, per_entity: bool = False) -> tuple[np.ndarray, np.ndarray | None]:
+        """Z'Z for a transformation, and optionally the per-country Z_g'Z_g blocks."""
+        if kind not in self._grams or (per_entity and self._grams[kind][1] is None):
+            z = self._transformed(kind)
+            blocks = None
+            if per_entity:
+                outer = (z[:, :, None] * z[:, None, :]).reshape(len(z), -1)
+                blocks = (self.within._entity_op @ outer).reshape(-1, z.shape[1], z.shape[1])
+            self._grams[kind] = (z.T @ z, blocks)
+        return self._grams[kind]
+
+    # -------------------------------------------------------------------------
+    # Estimation
+    # -------------------------------------------------------------------------
+    def fit_all(self, specs: list[dict]) -> list[dict]:
+        """Estimate every spec; returns summary_all_models rows in spec order."""
+        return [self.fit(spec) for spec in specs]
+
+    def fit(self, spec: dict) -> dict:
+        effects = spec.get("effects", "both")
+        if effects not in EFFECTS:
+            raise ValueError(f"Unknown effects '{effects}', expected one of {EFFECTS}")
+        x = list(spec["x"])
+        try:
+            if effects == "none":
+                return self._fit_ols(spec["name"], spec["y"], x)
+            return self._fit_panel(spec["name"], spec["y"], x, effects)
+        except np.linalg.LinAlgError:
+            row = {"Model": spec["name"], "N": self.nobs}
+            row.update({f"{key}_{col}": np.nan for col in x for key in ("Coef", "P")})
+            return row
+
+    def _fit_ols(self, name: str, y: str, x: list[str]) -> dict:
+        gram, _ = self._gram("none")
+        return ols_row(name, gram, self.position[y] + 1, [self.position[c] + 1 for c in x], x)
+
+    def _fit_panel(self, name: str, y: str, x: list[str], effects: str) -> dict:
+        gram, blocks = self._gram(effects, per_entity=True)
+        iy = self.position[y]
+        ix = np.array([self.position[c] for c in x])
+
+        xtx_inv = np.linalg.inv(gram[np.ix_(ix, ix)])
+        beta = xtx_inv @ gram[ix, iy]
+
+        # Country scores s_g = Z_g'(ỹ_g − X̃_g β) from the per-country blocks
+        scores = blocks[:, ix, iy] - blocks[:, ix][:, :, ix] @ beta
+        meat = scores.T @ scores
+
+        n, k = self.nobs, len(ix)
+        n_entities, n_times = self.within.n_entities, self.within.n_times
+        n_effects = {"entity": n_entities, "time": n_times, "both": n_entities + n_times - 1}[
+            effects
+        ]
+        df_resid = n - k - n_effects
+        # PanelOLS does not count entity effects nested in the entity clusters
+        extra_df = 0 if effects == "entity" else n_effects
+        cov = n / (n - k - extra_df) * xtx_inv @ meat @ xtx_inv
+
+        se = np.sqrt(np.diag(cov))
+        pvalues = 2 * stats.t.sf(np.abs(beta / se), df_resid)
+
+        return panel_row(
+            name,
+            n,
+            x,
+            beta,
+            pvalues,
+            r2_within=gram_rsquared(self._gram("entity")[0], iy, ix, beta),
+            r2_between=gram_rsquared(self._gram("between")[0], iy, ix, beta),
+            r2_overall=gram_rsquared(self._gram("raw")[0], iy, ix, beta),
+        )
+
+
+# =============================================================================
+# Statistics from cross-products (shared with src/suffstats.py)
+# =============================================================================
+
+
+def gram_ssr(gram: np.ndarray, iy: int, ix, beta: np.ndarray) -> float:
+    """e'e for y − Xβ from the Gram matrix alone."""
+    ix = np.asarray(ix)
+    return float(gram[iy, iy] - 2 * beta @ gram[ix, iy] + beta @ gram[np.ix_(ix, ix)] @ beta)
+
+
+def gram_rsquared(gram: np.ndarray, iy: int, ix, beta: np.ndarray) -> float:
+    """1 − e'e / y'y on a Gram matrix of already-centered data (PanelOLS R² definitions)."""
+    total = gram[iy, iy]
+    return 1 - gram_ssr(gram, iy, ix, beta) / total if total > 0.0 else 0.0
+
+
+def ols_row(name: str, gram: np.ndarray, iy: int, ix: list[int], x: list[str]) -> dict:
+    """
+    fit_ols() summary row from a Gram matrix whose index 0 is the constant.
+
+    OLS with constant and nonrobust standard errors, as statsmodels reports it.
+    """
+    ix = np.array([0] + list(ix))
+    xtx_inv = np.linalg.inv(gram[np.ix_(ix, ix)])
+    beta = xtx_inv @ gram[ix, iy]
+    ssr = gram_ssr(gram, iy, ix, beta)
+
+    n, k = int(round(gram[0, 0])), len(ix)
+    df_resid = n - k
+    tss = gram[iy, iy] - gram[0, iy] ** 2 / n
+    se = np.sqrt(np.diag(xtx_inv) * ssr / df_resid)
+    pvalues = 2 * stats.t.sf(np.abs(beta / se), df_resid)
+
+    r2 = 1 - ssr / tss
+    row = {
+        "Model": name,
+        "R2": float(r2),
+        "Adj_R2": float(1 - (1 - r2) * (n - 1) / df_resid),
+        "N": n,
+    }
+    for col, b, p in zip(x, beta[1:], pvalues[1:]):
+        row[f"Coef_{col}"] = float(b)
+        row[f"P_{col}"] = float(p)
+    return row
+
+
+def panel_row(
+    name: str,
+    n: int,
+    x: list[str],
+    beta: np.ndarray,
+    pvalues: np.ndarray,
+    r2_within: float,
+    r2_between: float,
+    r2_overall: float,
+) -> dict:
+    """Panel summary row in the save_model_outputs(is_panel=True) layout."""
+    row = {
+        "Model": name,
+        "R2_within": float(r2_within),
+        "R2_between": float(r2_between),
+        "R2_overall": float(r2_overall),
+        "N": int(n),
+    }
+    for col, b, p in zip(x, beta, pvalues):
+        row[f"Coef_{col}"] = float(b)
+        row[f"P_{col}"] = float(p)
+    return row
@@ -0,0 +1,320 @@
+"""
+suffstats.py – Sufficient-Statistics Store for Incremental Re-Estimation
+=========================================================================
+
+Keeps, for one estimation panel, the cross-product block Z'Z of
+Z = [1, columns...] for every (country, year) cell:
+- block[0, 0] is the row count, block[0, j] the column sums,
+  block[i, j] the cross-products (X'X, X'y, y'y)
+- per-country blocks are sums of their cells
+
+Every reported linear statistic is assembled from blocks, never from rows:
+- pooled OLS with constant (fit_ols: coefficients, nonrobust SEs, R²)
+- two-way FE with country-clustered SEs (PanelOLS), solved exactly by
+  absorbing the country effects and a Schur complement on the year effects
+
+Changing the sample recombines blocks: refresh() re-derives only the cells
+whose rows changed (e.g. one new WHO data year), select() drops countries or
+years without touching data. save() / load() persist a store as .npz.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse, stats
+
+from src.specgrid import gram_rsquared, ols_row, panel_row
+
+
+class SufficientStats:
+    """
+    Cross-product blocks of [1, columns] per (entity, year) cell.
+
+    Attributes:
+        columns: Variable names (block index j + 1)
+        entities: Cell entity labels, shape (m,)
+        years: Cell years, shape (m,)
+        blocks: Cell cross-products, shape (m, 1 + p, 1 + p)
+        digests: Order-independent hash of each cell's rows, shape (m,)
+    """
+
+    def __init__(
+        self,
+        columns: list[str],
+        entities: np.ndarray,
+        years: np.ndarray,
+        blocks: np.ndarray,
+        digests: np.ndarray,
+    ):
+        self.columns = list(columns)
+        self.entities = np.asarray(entities, dtype=str)
+        self.years = np.asarray(years, dtype=np.int64)
+        self.blocks = blocks
+        self.digests = np.asarray(digests, dtype=np.uint64)
+        self.position = {col: i + 1 for i, col in enumerate(self.columns)}
+
+    # -------------------------------------------------------------------------
+    # Construction
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def _cells(
+        df: pd.DataFrame, columns: list[str], entity: str, time: str | None
+    ) -> tuple[pd.DataFrame, np.ndarray, pd.DataFrame, np.ndarray]:
+        """Complete rows, their cell codes, the cell keys and per-cell digests."""
+        if isinstance(df.index, pd.MultiIndex):
+            df = df.reset_index()
+        df = df.dropna(subset=columns)
+        keys = pd.DataFrame(
+            {
+                "entity": np.asarray(df[entity], dtype=str),
+                "year": df[time].to_numpy(dtype=np.int64) if time else np.zeros(len(df), np.int64),
+            }
+        )
+        codes = keys.groupby(["entity", "year"], sort=True).ngroup().to_numpy()
+        cells = keys.drop_duplicates().sort_values(["entity", "year"]).reset_index(drop=True)
+
+        digests = np.zeros(len(cells), dtype=np.uint64)
+        row_hashes = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+        np.add.at(digests, codes, row_hashes)  # wraps mod 2**64: order-independent
+        return df, codes, cells, digests
+
+    @staticmethod
+    def _blocks(
+        df: pd.DataFrame, columns: list[str], codes: np.ndarray, n_cells: int
+    ) -> np.ndarray:
+        z = np.column_stack([np.ones(len(df)), df[columns].to_numpy(dtype=np.float64)])
+        q = z.shape[1]
+        op = sparse.csr_matrix(
+            (np.ones(len(df)), (codes, np.arange(len(df)))), shape=(n_cells, len(df))
+        )
+        return (op @ (z[:, :, None] * z[:, None, :]).reshape(len(df), -1)).reshape(n_cells, q, q)
+
+    @classmethod
+    def from_frame(
+        cls, df: pd.DataFrame, columns: list[str], entity: str = "iso3", time: str | None = "year"
+    ) -> "SufficientStats":
+        """
+        Build blocks from a long panel (rows with missing columns are dropped).
+
+        With time=None every row of an entity falls in one cell (cross-sections).
+        """
+        df, codes, cells, digests = cls._cells(df, columns, entity, time)
+        blocks = cls._blocks(df, columns, codes, len(cells))
+        return cls(columns, cells["entity"], cells["year"], blocks, digests)
+
+    def refresh(
+        self, df: pd.DataFrame, entity: str = "iso3", time: str | None = "year"
+    ) -> tuple["SufficientStats", int]:
+        """
+        Store for the current rows of df, re-deriving only cells whose rows changed.
+
+        Cells with an unchanged digest keep their stored block; new or changed
+        cells are computed from their own rows; cells absent from df are dropped.
+
+        Returns:
+            (refreshed store, number of cells recomputed)
+        """
+        df, codes, cells, digests = self._cells(df, self.columns, entity, time)
+
+        old = pd.DataFrame(
+            {"entity": self.entities, "year": self.years, "old": np.arange(len(self.years))}
+        )
+        matched = cells.merge(old, on=["entity", "year"], how="left")["old"].to_numpy()
+        reuse = ~np.isnan(matched)
+        reuse[reuse] = self.digests[matched[reuse].astype(int)] == digests[reuse]
+
+        q = len(self.columns) + 1
+        blocks = np.empty((len(cells), q, q))
+        blocks[reuse] = self.blocks[matched[reuse].astype(int)]
+
+        stale = np.flatnonzero(~reuse)
+        if len(stale):
+            rows = np.isin(codes, stale)
+            remap = np.full(len(cells), -1)
+            remap[stale] = np.arange(len(stale))
+            blocks[stale] = self._blocks(df[rows], self.columns, remap[codes[rows]], len(stale))
+
+        return SufficientStats(self.columns, cells["entity"], cells["year"], blocks, digests), len(
+            stale
+        )
+
+    def select(
+        self,
+        entities: list[str] | None = None,
+        years: list[int] | None = None,
+        exclude_entities: list[str] | None = None,
+        exclude_years: list[int] | None = None,
+    ) -> "SufficientStats":
+        """Sub-store restricted to / excluding given countries and years (no row access)."""
+        keep = np.ones(len(self.years), dtype=bool)
+        if entities is not None:
+            keep &= np.isin(self.entities, entities)
+        if years is not None:
+            keep &= np.isin(self.years, years)
+        if exclude_entities is not None:
+            keep &= ~np.isin(self.entities, exclude_entities)
+        if exclude_years is not None:
+            keep &= ~np.isin(self.years, exclude_years)
+        return SufficientStats(
+            self.columns,
+            self.entities[keep],
+            self.years[keep],
+            self.blocks[keep],
+            self.digests[keep],
+        )
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            columns=np.array(self.columns),
+            entities=self.entities,
+            years=self.years,
+            blocks=self.blocks,
+            digests=self.digests,
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "SufficientStats":
+        with np.load(path, allow_pickle=False) as f:
+            columns = [str(c) for c in f["columns"]]
+            return cls(columns, f["entities"], f["years"], f["blocks"], f["digests"])
+
+    # -------------------------------------------------------------------------
+    # Aggregation
+    # -------------------------------------------------------------------------
+    @property
+    def nobs(self) -> int:
+        return int(round(self.blocks[:, 0, 0].sum()))
+
+    def entity_blocks(self) -> tuple[np.ndarray, np.ndarray]:
+        """(entity labels, per-entity blocks) — sums of each entity's cells."""
+        labels, codes = np.unique(self.entities, return_inverse=True)
+        out = np.zeros((len(labels),) + self.blocks.shape[1:])
+        np.add.at(out, codes, self.blocks)
+        return labels, out
+
+    # -------------------------------------------------------------------------
+    # Estimation
+    # -------------------------------------------------------------------------
+    def ols(self, name: str, y: str, x: list[str]) -> dict:
+        """Pooled OLS with constant (fit_ols) summary row."""
+        return ols_row(
+            name, self.blocks.sum(axis=0), self.position[y], [self.position[c] for c in x], x
+        )
+
+    def panel_fe(self, name: str, y: str, x: list[str]) -> dict:
+        """
+        Two-way FE (country + year effects) summary row with country-clustered
+        SEs, matching PanelOLS(entity_effects=True, time_effects=True).
+        """
+        v = self.variable_index(y, x)
+        e_labels, e_codes = np.unique(self.entities, return_inverse=True)
+        t_labels, t_codes = np.unique(self.years, return_inverse=True)
+        cells = (self.blocks[:, 0, 0], self.blocks[:, 0, v], self.blocks[:, v][:, :, v])
+        totals = entity_totals(e_codes, len(e_labels), *cells)
+        fit = two_way_fe(e_codes, t_codes, len(t_labels), *cells, *totals)
+        return panel_row(
+            name, fit["nobs"], x, fit["params"], fit["pvalues"],
+            fit["rsquared_within"], fit["rsquared_between"], fit["rsquared_overall"],
+        )
+
+    def variable_index(self, y: str, x: list[str]) -> np.ndarray:
+        """Block positions of [x..., y]."""
+        return np.array([self.position[c] for c in x] + [self.position[y]])
+
+
+def entity_totals(
+    e_codes: np.ndarray, n_e: int, counts: np.ndarray, sums: np.ndarray, cross: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-entity row counts, sums and cross-products (n_i, s_i, m_i) of cell blocks."""
+    n_i = np.bincount(e_codes, weights=counts, minlength=n_e)
+    s_i = np.zeros((n_e,) + sums.shape[1:])
+    np.add.at(s_i, e_codes, sums)
+    m_i = np.zeros((n_e,) + cross.shape[1:])
+    np.add.at(m_i, e_codes, cross)
+    return n_i, s_i, m_i
+
+
+def two_way_fe(
+    e_codes: np.ndarray,
+    t_codes: np.ndarray,
+    n_t: int,
+    counts: np.ndarray,
+    sums: np.ndarray,
+    cross: np.ndarray,
+    n_i: np.ndarray,
+    s_i: np.ndarray,
+    m_i: np.ndarray,
+) -> dict:
+    """
+    Two-way FE fit from cell blocks of v = [x..., y] and their entity totals.
+
+    Args:
+        e_codes, t_codes: Entity / year code per cell (every entity and year observed)
+        counts, sums, cross: Cell row counts, sums of v and cross-products v'v
+        n_i, s_i, m_i: The same summed per entity (see entity_totals); passed
+            separately so callers can maintain them incrementally
+
+    Returns:
+        dict with params, std_errors, pvalues, nobs, df_resid and the
+        PanelOLS R² definitions (rsquared_within / _between / _overall)
+    """
+    k = sums.shape[1] - 1
+    n_e = len(n_i)
+    n_it = np.zeros((n_e, n_t))
+    n_it[e_codes, t_codes] = counts
+
+    # Entity-absorbed normal equations over [variables, year dummies]
+    g_vv = m_i.sum(axis=0) - (s_i.T / n_i) @ s_i
+    g_vt = np.zeros((k + 1, n_t))
+    np.add.at(g_vt.T, t_codes, sums - s_i[e_codes] * (counts / n_i[e_codes])[:, None])
+    g_tt = np.diag(n_it.sum(axis=0)) - (n_it.T / n_i) @ n_it
+
+    # Last year dummy dropped for identification; Schur complement gives the
+    # two-way demeaned Gram of [x, y] and the year coefficients c_t
+    coef_t = np.zeros((n_t, k + 1))
+    if n_t > 1:
+        coef_t[:-1] = np.linalg.solve(g_tt[:-1, :-1], g_vt[:, :-1].T)
+    within = g_vv - g_vt[:, :-1] @ coef_t[:-1]
+
+    xtx_inv = np.linalg.inv(within[:k, :k])
+    beta = xtx_inv @ within[:k, k]
+
+    # Country scores Σ x̃ ẽ from cell blocks of the two-way residualized data
+    coef_e = (s_i - n_it @ coef_t) / n_i[:, None]
+    d = coef_e[e_codes] + coef_t[t_codes]  # (cells, k + 1)
+    resid_cross = (
+        cross
+        - sums[:, :, None] * d[:, None, :]
+        - d[:, :, None] * sums[:, None, :]
+        + counts[:, None, None] * d[:, :, None] * d[:, None, :]
+    )
+    r_g = np.zeros((n_e, k + 1, k + 1))
+    np.add.at(r_g, e_codes, resid_cross)
+    scores = r_g[:, :k, k] - r_g[:, :k, :k] @ beta
+    meat = scores.T @ scores
+
+    n = int(round(counts.sum()))
+    df_resid = n - k - (n_e + n_t - 1)
+    cov = n / df_resid * xtx_inv @ meat @ xtx_inv
+    std_errors = np.sqrt(np.diag(cov))
+    pvalues = 2 * stats.t.sf(np.abs(beta / std_errors), df_resid)
+
+    ix, iy = np.arange(k), k
+    return {
+        "params": beta,
+        "std_errors": std_errors,
+        "pvalues": pvalues,
+        "nobs": n,
+        "df_resid": df_resid,
+        "rsquared_within": gram_rsquared(g_vv, iy, ix, beta),
+        "rsquared_between": gram_rsquared((s_i.T / n_i**2) @ s_i, iy, ix, beta),
+        "rsquared_overall": gram_rsquared(m_i.sum(axis=0), iy, ix, beta),
+    }
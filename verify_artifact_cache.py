@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Artifact Cache Verification Script
+
+Runs the pipeline twice: cold (--force: every model refitted, cache
+refreshed) and warm (every model restored from .cache/artifacts/), and
+checks that a cached run is indistinguishable from a fitted one:
+- summary_all_models.csv is identical
+- the run log and panel_materialization_log.txt carry the same lines once
+  volatile parts are masked (timestamps, timings, log file names, dataset
+  cache status, the "restored from artifact cache" notices and the plot
+  stage line)
+- every model unit of the warm run was a cache hit
+
+Overwrites output/ like a normal pipeline run.
+
+Usage:
+    python verify_artifact_cache.py [run.py args, e.g. --model G J --parallel --jobs 4]
+"""
+
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+OUTPUT_DIR = ROOT / "output"
+
+TIMESTAMP_RE = re.compile(r"^\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\] ")
+VOLATILE = (
+    (re.compile(r"run_log_\d{8}_\d{6}\.txt"), "run_log_*.txt"),
+    (re.compile(r"\d+\.\d+s\b"), "…s"),
+    (re.compile(r", (parsed|cache)\)"), ", …)"),
+)
+
+
+def _normalize(lines: list[str]) -> list[str]:
+    kept = []
+    for line in lines:
+        line = TIMESTAMP_RE.sub("", line)
+        if not line.strip() or line.startswith(("♻", "🖼")) or "restored from artifact cache" in line:
+            continue
+        for pattern, mask in VOLATILE:
+            line = pattern.sub(mask, line)
+        kept.append(line)
+    return kept
+
+
+def _run(args: list[str]) -> tuple[list[str], list[str], bytes, int]:
+    """Run the pipeline; return its normalized run and panel logs, summary bytes and cache hits."""
+    proc = subprocess.run(
+        [sys.executable, "run.py", "--no-plots", *args], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    match = re.search(r"Log file: (\S+)", proc.stdout)
+    run_log = (ROOT / match.group(1)).read_text(encoding="utf-8").splitlines()
+    panel_log = (OUTPUT_DIR / "panel_materialization_log.txt").read_text(encoding="utf-8").splitlines()
+    summary = (OUTPUT_DIR / "summary_all_models.csv").read_bytes()
+    hits = sum(line.startswith("♻") for line in run_log)
+    return _normalize(run_log), _normalize(panel_log), summary, hits
+
+
+def _compare(label: str, cold: list[str], warm: list[str]) -> bool:
+    if cold == warm:
+        print(f"✅ {label}: {len(cold)} lines match")
+        return True
+    print(f"❌ {label} differs:")
+    for line in sorted(set(cold) ^ set(warm))[:20]:
+        print(f"   {'cold' if line in cold else 'warm'}: {line}")
+    return False
+
+
+def main():
+    args = sys.argv[1:]
+    if "--no-cache" in args or "--force" in args:
+        print("❌ Pass run.py options other than --no-cache/--force (the script sets them)")
+        return 2
+
+    print("=" * 70)
+    print(f"ARTIFACT CACHE VERIFICATION (run.py {' '.join(args) or 'all models'})")
+    print("=" * 70)
+
+    cold_log, cold_panel_log, cold_summary, _ = _run(["--force", *args])
+    warm_log, warm_panel_log, warm_summary, hits = _run(args)
+
+    ok = _compare("Run log", cold_log, warm_log)
+    ok &= _compare("Panel materialization log", cold_panel_log, warm_panel_log)
+    if cold_summary == warm_summary:
+        print("✅ summary_all_models.csv identical")
+    else:
+        print("❌ summary_all_models.csv differs")
+        ok = False
+    if hits:
+        print(f"✅ Warm run restored {hits} model units from cache")
+    else:
+        print("❌ Warm run restored nothing from cache")
+        ok = False
+    print("=" * 70)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Nearest-Year Join Equivalence Script
+
+Compares the vectorized merge_nearest_years() in src/data_loader.py with
+the row-by-row implementation it replaced, on the real Model B (WHO × EEA)
+and Model D (WHO × GBD) inputs and on tie-heavy synthetic frames:
+- Baseline: the unmodified original. Every row must match except where two
+  candidates have the same year gap; those rows are counted and listed
+- Stable ties: the original with a stable sort, i.e. the documented
+  tie-break of the vectorized join (first candidate row in df_right). Must
+  match exactly
+
+The original sorts candidates with the default (unstable) quicksort, so on
+equal gaps its pick depends on the sort implementation rather than on a
+rule; the vectorized join breaks those ties deterministically instead.
+
+Usage:
+    python verify_nearest_year_join.py
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data_loader import (
+    GBD_YLL_PATH,
+    load_who_pm25,
+    load_eea_burden,
+    load_gbd_yll,
+    merge_nearest_years,
+)
+
+
+def merge_nearest_years_baseline(df_left, df_right, on_key, left_year, right_year, tolerance=3):
+    """Original O(n·m) implementation, unmodified."""
+    merged = []
+    for _, row in df_left.iterrows():
+        subset = df_right[df_right[on_key] == row[on_key]]
+        if subset.empty:
+            continue
+        subset = subset.assign(diff=(subset[right_year] - row[left_year]).abs())
+        subset = subset[subset["diff"] <= tolerance]
+        if len(subset):
+            best = subset.sort_values("diff").iloc[0].to_dict()
+            merged.append({**row.to_dict(), **best})
+
+    return pd.DataFrame(merged)
+
+
+def merge_nearest_years_stable_ties(df_left, df_right, on_key, left_year, right_year, tolerance=3):
+    """Original implementation with a stable sort: equal gaps resolve to the first df_right row."""
+    merged = []
+    for _, row in df_left.iterrows():
+        subset = df_right[df_right[on_key] == row[on_key]]
+        if subset.empty:
+            continue
+        subset = subset.assign(diff=(subset[right_year] - row[left_year]).abs())
+        subset = subset[subset["diff"] <= tolerance]
+        if len(subset):
+            best = subset.sort_values("diff", kind="stable").iloc[0].to_dict()
+            merged.append({**row.to_dict(), **best})
+
+    return pd.DataFrame(merged)
+
+
+def _matched_left_years(left: pd.DataFrame, right: pd.DataFrame, tolerance: int) -> np.ndarray:
+    """Years of the left rows that have a candidate within the window (both joins keep these, in order)."""
+    pairs = left.reset_index(drop=True).reset_index().merge(right[["iso3", "year"]], on="iso3")
+    pairs = pairs[(pairs["year_y"] - pairs["year_x"]).abs() <= tolerance]
+    return left["year"].to_numpy()[np.unique(pairs["index"])]
+
+
+def _changed_cells(expected: pd.DataFrame, actual: pd.DataFrame) -> pd.DataFrame:
+    """Row × column mask of differing values (NaN == NaN)."""
+    return pd.DataFrame(
+        {
+            col: ~((a == b) | (a.isna() & b.isna())).to_numpy()
+            for col in expected.columns
+            for a, b in [(expected[col].reset_index(drop=True), actual[col].reset_index(drop=True))]
+        }
+    )
+
+
+def _compare_baseline(label: str, left, right, actual, tolerance: int, max_listed: int = 10) -> bool:
+    """Baseline vs vectorized: identical except on equal-gap ties, which are listed."""
+    baseline = merge_nearest_years_baseline(left, right, "iso3", "year", "year", tolerance)
+    if len(baseline) != len(actual) or set(baseline.columns) != set(actual.columns):
+        print(f"{'':22} | vs baseline: ❌ different rows or columns ({len(baseline)} vs {len(actual)})")
+        return False
+
+    cells = _changed_cells(baseline, actual)
+    changed = np.flatnonzero(cells.any(axis=1).to_numpy())
+    left_years = _matched_left_years(left, right, tolerance)
+    gap_b = baseline["diff"].to_numpy(dtype=float)[changed]
+    gap_a = actual["diff"].to_numpy(dtype=float)[changed]
+    non_ties = int((gap_b != gap_a).sum())
+    ok = non_ties == 0
+    status = "✅" if ok else f"❌ {non_ties} rows with a different year gap"
+    print(f"{'':22} | vs baseline: {len(changed)} of {len(actual)} rows changed (equal-gap ties) {status}")
+    for i in changed[:max_listed]:
+        print(
+            f"{'':22} |   {baseline['iso3'].iloc[i]} {int(left_years[i])}: "
+            f"baseline {int(baseline['year'].iloc[i])} → vectorized {int(actual['year'].iloc[i])} "
+            f"(gap {baseline['diff'].iloc[i]:g} vs {actual['diff'].iloc[i]:g}; "
+            f"changed: {', '.join(cells.columns[cells.iloc[i].to_numpy()])})"
+        )
+    if len(changed) > max_listed:
+        print(f"{'':22} |   ... {len(changed) - max_listed} more")
+    return ok
+
+
+def _compare(label: str, left: pd.DataFrame, right: pd.DataFrame, tolerance: int = 3) -> bool:
+    t0 = time.perf_counter()
+    expected = merge_nearest_years_stable_ties(left, right, "iso3", "year", "year", tolerance)
+    t_rowwise = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    actual = merge_nearest_years(left, right, "iso3", "year", "year", tolerance)
+    t_vectorized = time.perf_counter() - t0
+
+    try:
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+        status = "✅ MATCH"
+        ok = True
+    except AssertionError as e:
+        status = f"❌ MISMATCH\n{e}"
+        ok = False
+
+    print(
+        f"{label:22} | N={len(actual):5} | row-wise {t_rowwise:8.3f}s | "
+        f"vectorized {t_vectorized:8.4f}s | stable ties: {status}"
+    )
+    return _compare_baseline(label, left, right, actual, tolerance) and ok
+
+
+def _synthetic_inputs(seed: int = 0) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Small frames with duplicate and equidistant years to exercise tie-breaks."""
+    rng = np.random.default_rng(seed)
+    keys = np.array(["AAA", "BBB", "CCC", "DDD", None], dtype=object)
+    left = pd.DataFrame(
+        {
+            "iso3": rng.choice(keys, 200),
+            "year": rng.integers(2000, 2021, 200),
+            "pm25": rng.random(200),
+        }
+    )
+    right = pd.DataFrame(
+        {
+            "iso3": rng.choice(keys[:3], 40),
+            "year": rng.integers(2000, 2021, 40),
+            "value": np.arange(40, dtype=float),
+        }
+    )
+    return left, right
+
+
+def main():
+    print("=" * 70)
+    print("NEAREST-YEAR JOIN EQUIVALENCE")
+    print("=" * 70)
+    print()
+
+    all_pass = True
+
+    who = load_who_pm25()
+    all_pass &= _compare("Model B (WHO × EEA)", who, load_eea_burden())
+
+    if GBD_YLL_PATH.exists():
+        all_pass &= _compare("Model D (WHO × GBD)", who, load_gbd_yll())
+    else:
+        print(f"{'Model D (WHO × GBD)':22} | SKIPPED (GBD YLL file not found)")
+
+    for seed in range(5):
+        for tol in (0, 1, 3):
+            left, right = _synthetic_inputs(seed)
+            all_pass &= _compare(f"Synthetic s={seed} ±{tol}", left, right, tolerance=tol)
+
+    print()
+    print("=" * 70)
+    print("✅ ALL CHECKS PASSED" if all_pass else "❌ EQUIVALENCE FAILED")
+    return 0 if all_pass else 1
+
+
+if __name__ == "__main__":
+    exit(main())
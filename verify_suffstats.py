@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Sufficient-Statistics Store Check
+
+Verifies that estimates recombined from src/suffstats.py blocks equal the
+row-level fits on the saved estimation panels, and that sample changes
+recombine blocks instead of refitting:
+- Two-way FE (Models C, G, E) vs linearmodels.PanelOLS, clustered SEs
+- Pooled OLS (Models B, D) vs statsmodels OLS
+- Adding the latest data year recomputes only that year's cells
+- Dropping a country via select() equals a rebuild without it
+- Rolling / expanding Model G windows (src/rolling.py) vs per-window PanelOLS
+Run AFTER pipeline execution: poetry run python run.py
+
+Usage:
+    python verify_suffstats.py
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from linearmodels.panel import PanelOLS
+
+from src.rolling import WINDOW_MODES, rolling_two_way_fe
+from src.suffstats import SufficientStats
+
+OUTPUT_DIR = Path(__file__).parent / "output"
+
+# (label, csv_file, dependent, regressors, kind)
+PANELS = [
+    ("C", "panel_model_c_estimation.csv", "ln_pm25", ["ln_energy", "ln_industry", "ln_transport"], "fe"),
+    ("G", "panel_model_g_estimation.csv", "ln_pm25", ["ln_total_emissions"], "fe"),
+    ("E", "panel_model_e_estimation.csv", "ln_pm25", ["ln_total_emissions_lag1"], "fe"),
+    ("B", "panel_model_b_estimation.csv", "ln_daly", ["ln_pm25"], "ols"),
+    ("D", "panel_model_d_estimation.csv", "ln_yll", ["ln_pm25"], "ols"),
+]
+
+RTOL = 1e-8
+
+WINDOW = 4
+
+
+def _reference_row(df: pd.DataFrame, y: str, x: list[str], kind: str) -> dict:
+    if kind == "fe":
+        panel = df.set_index(["iso3", "year"]).sort_index()
+        res = PanelOLS(panel[y], panel[x], entity_effects=True, time_effects=True).fit(
+            cov_type="clustered", cluster_entity=True
+        )
+        row = {"R2_within": res.rsquared_within, "R2_between": res.rsquared_between,
+               "R2_overall": res.rsquared_overall, "N": res.nobs}
+    else:
+        res = sm.OLS(df[y], sm.add_constant(df[x])).fit()
+        row = {"R2": res.rsquared, "Adj_R2": res.rsquared_adj, "N": res.nobs}
+    for col in x:
+        row[f"Coef_{col}"] = res.params[col]
+        row[f"P_{col}"] = res.pvalues[col]
+    return row
+
+
+def _fit(store: SufficientStats, y: str, x: list[str], kind: str) -> dict:
+    return store.panel_fe("check", y, x) if kind == "fe" else store.ols("check", y, x)
+
+
+def _max_rel_diff(expected: dict, actual: dict) -> float:
+    return max(abs(actual[k] - v) / max(abs(v), 1.0) for k, v in expected.items() if k != "Model")
+
+
+def _report(label: str, worst: float, detail: str = "") -> bool:
+    ok = worst <= RTOL
+    status = "✅ MATCH" if ok else f"❌ MISMATCH (max rel diff {worst:.2e})"
+    print(f"{label:40} | {detail:26} | {status}")
+    return ok
+
+
+def main():
+    print("=" * 70)
+    print("SUFFICIENT-STATISTICS STORE CHECK")
+    print("=" * 70)
+    print()
+
+    all_pass = True
+
+    for model, csv_file, y, x, kind in PANELS:
+        csv_path = OUTPUT_DIR / csv_file
+        if not csv_path.exists():
+            print(f"Model {model:34} | SKIPPED ({csv_file} not found)")
+            continue
+
+        df = pd.read_csv(csv_path)
+        time = "year" if "year" in df.columns else None
+        store = SufficientStats.from_frame(df, [y] + x, time=time)
+
+        expected = _reference_row(df, y, x, kind)
+        all_pass &= _report(
+            f"Model {model}: blocks vs row-level fit", _max_rel_diff(expected, _fit(store, y, x, kind)),
+            f"{len(store.years)} cells, N={store.nobs}",
+        )
+
+        if time is not None:
+            latest = int(df["year"].max())
+            stale = SufficientStats.from_frame(df[df["year"] < latest], [y] + x)
+            refreshed, n_recomputed = stale.refresh(df)
+            n_new = int((store.years == latest).sum())
+            ok_cells = n_recomputed == n_new and np.array_equal(refreshed.blocks, store.blocks)
+            worst = _max_rel_diff(_fit(store, y, x, kind), _fit(refreshed, y, x, kind))
+            ok = _report(
+                f"Model {model}: + year {latest} via refresh()", worst if ok_cells else np.inf,
+                f"{n_recomputed} of {len(refreshed.years)} cells recomputed",
+            )
+            all_pass &= ok
+
+        dropped = df["iso3"].iloc[0]
+        rebuilt = SufficientStats.from_frame(df[df["iso3"] != dropped], [y] + x, time=time)
+        worst = _max_rel_diff(
+            _fit(rebuilt, y, x, kind), _fit(store.select(exclude_entities=[dropped]), y, x, kind)
+        )
+        all_pass &= _report(f"Model {model}: drop {dropped} via select()", worst, "no rows touched")
+
+    csv_path = OUTPUT_DIR / "panel_model_g_estimation.csv"
+    if csv_path.exists():
+        df = pd.read_csv(csv_path)
+        store = SufficientStats.from_frame(df, ["ln_pm25", "ln_total_emissions"])
+        for mode in WINDOW_MODES:
+            table = rolling_two_way_fe(store, "ln_pm25", ["ln_total_emissions"], WINDOW, mode)
+            worst = 0.0
+            for _, window in table.iterrows():
+                rows = df[df["year"].between(window["window_start"], window["window_end"])]
+                expected = _reference_row(rows, "ln_pm25", ["ln_total_emissions"], "fe")
+                actual = {
+                    "R2_within": window["R2_within"],
+                    "N": window["N"],
+                    "Coef_ln_total_emissions": window["coef_ln_total_emissions"],
+                    "P_ln_total_emissions": window["p_ln_total_emissions"],
+                }
+                expected.pop("R2_between"), expected.pop("R2_overall")
+                worst = max(worst, _max_rel_diff(expected, actual))
+            all_pass &= _report(f"Model G: {mode} {WINDOW}-year windows", worst, f"{len(table)} windows")
+
+    print()
+    print("=" * 70)
+    print("✅ ALL CHECKS PASSED" if all_pass else "❌ CHECK FAILED")
+    return 0 if all_pass else 1
+
+
+if __name__ == "__main__":
+    exit(main())
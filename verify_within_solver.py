@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Two-Way FE Solver Parity Script
+
+Verifies that src/within.py reproduces linearmodels.PanelOLS (entity + time
+effects, country-clustered SEs) on the saved estimation panels: every
+regressor subset of Model C, plus Models G and E. Coefficients, standard
+errors, p-values, R² and degrees of freedom must agree to tolerance.
+Run AFTER pipeline execution: poetry run python run.py
+
+Usage:
+    python verify_within_solver.py
+"""
+
+import time
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from linearmodels.panel import PanelOLS
+
+from src.within import TwoWayWithin
+
+OUTPUT_DIR = Path(__file__).parent / "output"
+
+# (label, csv_file, dependent, regressors)
+PANELS = [
+    ("C", "panel_model_c_estimation.csv", "ln_pm25", ["ln_energy", "ln_industry", "ln_transport"]),
+    ("G", "panel_model_g_estimation.csv", "ln_pm25", ["ln_total_emissions"]),
+    ("E", "panel_model_e_estimation.csv", "ln_pm25", ["ln_total_emissions_lag1"]),
+]
+
+RTOL = 1e-8
+STATS = ["params", "std_errors", "pvalues", "rsquared", "rsquared_within",
+         "rsquared_between", "rsquared_overall", "df_resid", "nobs"]
+
+
+def _max_rel_diff(expected, actual) -> float:
+    expected = np.atleast_1d(np.asarray(expected, dtype=float))
+    actual = np.atleast_1d(np.asarray(actual, dtype=float))
+    return float(np.max(np.abs(expected - actual) / np.maximum(np.abs(expected), 1.0)))
+
+
+def _compare(label: str, df: pd.DataFrame, solver: TwoWayWithin, y: str, x: list[str]) -> bool:
+    t0 = time.perf_counter()
+    expected = PanelOLS(df[y], df[x], entity_effects=True, time_effects=True).fit(
+        cov_type="clustered", cluster_entity=True
+    )
+    t_panelols = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    actual = solver.fit(y, x)
+    t_within = time.perf_counter() - t0
+
+    worst = max(_max_rel_diff(getattr(expected, s), getattr(actual, s)) for s in STATS)
+    ok = worst <= RTOL
+    status = "✅ MATCH" if ok else f"❌ MISMATCH (max rel diff {worst:.2e})"
+    print(
+        f"{label:52} | N={actual.nobs:4} | PanelOLS {t_panelols * 1000:7.1f}ms | "
+        f"within {t_within * 1000:6.2f}ms | {status}"
+    )
+    return ok
+
+
+def main():
+    print("=" * 70)
+    print("TWO-WAY FE SOLVER PARITY (vs linearmodels.PanelOLS)")
+    print("=" * 70)
+    print()
+
+    all_pass = True
+
+    for model, csv_file, y, regressors in PANELS:
+        csv_path = OUTPUT_DIR / csv_file
+        if not csv_path.exists():
+            print(f"Model {model:46} | SKIPPED ({csv_file} not found)")
+            continue
+
+        df = pd.read_csv(csv_path).set_index(["iso3", "year"]).sort_index()
+        solver = TwoWayWithin(df)
+
+        subsets = [list(s) for r in range(len(regressors), 0, -1) for s in combinations(regressors, r)]
+        for x in subsets:
+            all_pass &= _compare(f"Model {model}: {y} ~ {' + '.join(x)}", df, solver, y, x)
+        print(f"{'':52} | demeaning converged in {solver.n_iter} sweeps")
+
+    print()
+    print("=" * 70)
+    print("✅ ALL CHECKS PASSED" if all_pass else "❌ PARITY FAILED")
+    return 0 if all_pass else 1
+
+
+if __name__ == "__main__":
+    exit(main())